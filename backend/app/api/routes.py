@@ -1,85 +1,36 @@
 from flask import Blueprint, request, jsonify, send_file
 from werkzeug.utils import secure_filename
+from sqlalchemy import tuple_, func, or_
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime, timedelta
 from pathlib import Path
+import base64
+import json
 import logging
+import uuid
 
 from app.db.session import db_session
-from app.db.models import Certificate, ExtractedField, Student, User
+from app.db.models import Certificate, CertificateSummary, ExtractedField, ProcessingJob, Student, User
 from app.services.images import save_and_process_file, is_allowed_file
-from app.services.ocr import run_ocr
-from app.services.extract import extract_fields_with_ai, generate_ai_summary, verify_certificate_with_university
+from app.services.university import verify_certificate_with_university, portal_breaker_stats
+from app.services.pipeline import compute_mismatch_report, upsert_fields, verification_field_rows
+from app.services.summary import load_summaries, sync_certificate_summary, tabular_data
+from app.services.jobs import enqueue_certificate, get_latest_job, notify_workers
+from app.services.batches import create_batch, batch_progress, BatchTooLarge
+from app.services.reverify import (
+    ReverifyRunActive, create_reverify_run, claim_for_resume, start_reverify_run, reverify_progress
+)
+from app.services.ocr_cache import ocr_cache_stats
+from app.services.llm_cache import llm_cache_stats
+from app.services.verification_cache import invalidate_verifications, verification_cache_stats
 from app.services.auth import generate_token, require_auth, require_user_type, get_current_user
 from app.core.config import settings
+from app.core.constants import CertificateStatus, UserType
 
 logger = logging.getLogger(__name__)
 api_bp = Blueprint("api", __name__)
 
 
-def _normalize_text(s: str) -> str:
-    try:
-        import re
-        s = (s or "").lower().strip()
-        s = re.sub(r"\s+", " ", s)
-        s = re.sub(r"[^a-z0-9\s]", "", s)
-        return s
-    except Exception:
-        return (s or "").strip().lower()
-
-def _parse_float(val):
-    try:
-        if val is None:
-            return None
-        s = str(val).strip()
-        if s == "" or s.lower() in {"na", "n/a", "null", "none", "-"}:
-            return None
-        return float(s)
-    except Exception:
-        return None
-
-def _compute_mismatch_report(extracted_fields: dict, verification: dict) -> dict:
-    """Compare extracted vs university data and compute simple status + per-field mismatches."""
-    report = {
-        "name": "not_available",
-        "cgpa": "not_available",
-        "sgpa": "not_available",
-    }
-
-    if not verification or not verification.get("student_verified"):
-        return {
-            "report": report,
-            "simple_status": "not verified",
-        }
-
-    matched = verification.get("matched_student") or verification.get("matched_certificate") or {}
-
-    # Name comparison
-    ext_name = extracted_fields.get("student_name")
-    uni_name = matched.get("student_name") or matched.get("name")
-    if ext_name and uni_name:
-        report["name"] = "match" if _normalize_text(ext_name) == _normalize_text(uni_name) else "mismatch"
-    else:
-        report["name"] = "not_available"
-
-    # CGPA comparison
-    ext_cgpa = _parse_float(extracted_fields.get("cgpa"))
-    uni_cgpa = _parse_float(matched.get("cgpa"))
-    if ext_cgpa is not None and uni_cgpa is not None:
-        report["cgpa"] = "match" if abs(ext_cgpa - uni_cgpa) <= 0.05 else "mismatch"
-    else:
-        report["cgpa"] = "not_available"
-
-    # SGPA comparison - usually not available in university summary; mark not_available if uni missing
-    ext_sgpa = _parse_float(extracted_fields.get("sgpa"))
-    uni_sgpa = _parse_float(matched.get("sgpa"))
-    if ext_sgpa is not None and uni_sgpa is not None:
-        report["sgpa"] = "match" if abs(ext_sgpa - uni_sgpa) <= 0.05 else "mismatch"
-    else:
-        report["sgpa"] = "not_available"
-
-    any_mismatch = any(v == "mismatch" for v in report.values())
-    simple_status = "mismatch" if any_mismatch else "verified"
-    return {"report": report, "simple_status": simple_status}
-
 # Authentication endpoints
 @api_bp.route("/auth/register", methods=['POST'])
 def register():
@@ -236,6 +187,27 @@ def simple_university_verification(extracted_fields: dict) -> dict:
         logger.error(f"Verification failed: {str(e)}")
         return verification_result
 
+def _cached_upload_response(cert: Certificate, file_type: str):
+    """Build the upload response for a file whose hash matches an existing certificate."""
+    job = None
+    if cert.status == CertificateStatus.FAILED:
+        # Earlier attempt failed (e.g. LLM outage) - give it another run
+        job = enqueue_certificate(db_session, cert)
+        db_session.commit()
+        notify_workers()
+    
+    done = cert.status not in (CertificateStatus.PENDING, CertificateStatus.PROCESSING)
+    logger.info(f"Upload matched existing certificate {cert.id} by content hash")
+    return jsonify({
+        "id": cert.id,
+        "job_id": job.id if job else None,
+        "file_type": file_type,
+        "status": cert.status,
+        "status_url": f"/api/v1/certificates/{cert.id}/status",
+        "message": "Certificate already processed" if done else "Certificate queued for processing",
+        "cache_hit": True
+    }), 200 if done else 202
+
 @api_bp.route("/certificates/upload", methods=['POST'])
 def upload_certificate():
     try:
@@ -251,169 +223,254 @@ def upload_certificate():
 
         filename = secure_filename(file.filename)
         upload_path = Path(settings.UPLOAD_DIR)
-        file_path = upload_path / filename
-        
-        processed_path, file_type = save_and_process_file(file.stream, file_path)
-        ocr_text = run_ocr(processed_path)
+        # Unique on-disk name so a queued file can't be overwritten by a later upload
+        file_path = upload_path / f"{uuid.uuid4().hex[:12]}_{filename}"
         
-        if not ocr_text.strip():
-            return jsonify({"error": "No text could be extracted from the certificate. Please ensure the image is clear and readable."}), 400
+        processed_path, file_type, content_hash = save_and_process_file(file.stream, file_path)
         
-        extracted_fields = extract_fields_with_ai(ocr_text)
-        summary = generate_ai_summary(extracted_fields)
-        
-        # Verify certificate against university database
-        verification = verify_certificate_with_university(extracted_fields)
-
-        # Compute simple status + mismatch report (name, cgpa, sgpa)
-        mismatch = _compute_mismatch_report(extracted_fields, verification)
+        # Identical bytes were uploaded before: reuse that certificate's OCR text,
+        # extraction and summary instead of running the pipeline again
+        existing = db_session.query(Certificate).filter(Certificate.content_hash == content_hash).first()
+        if existing:
+            processed_path.unlink(missing_ok=True)
+            return _cached_upload_response(existing, file_type)
         
         cert = Certificate(
             image_path=str(processed_path), 
-            status='processed',
+            status=CertificateStatus.PENDING,
             user_id=None,  # No authentication required
-            original_filename=filename
+            original_filename=filename,
+            content_hash=content_hash
         )
         db_session.add(cert)
-        db_session.flush()
-        
-        # Store extracted fields with proper typing
-        for key, value in extracted_fields.items():
-            if value and value != "null":
-                field = ExtractedField(
-                    certificate_id=cert.id, 
-                    key=key, 
-                    value=str(value), 
-                    confidence=0.9,  # High confidence for AI extraction
-                    field_type='extracted'
-                )
-                db_session.add(field)
-        
-        # Store AI summary
-        summary_field = ExtractedField(
-            certificate_id=cert.id, 
-            key='ai_summary', 
-            value=summary, 
-            confidence=1.0,
-            field_type='ai_summary'
-        )
-        db_session.add(summary_field)
-        
-        # Store verification results
-        verification_field = ExtractedField(
-            certificate_id=cert.id,
-            key='verification_result',
-            value=str(verification),
-            confidence=verification.get('confidence_score', 0.0),
-            field_type='verification'
-        )
-        db_session.add(verification_field)
-
-        # Store simple status and mismatch report as separate fields for retrieval
-        simple_status_field = ExtractedField(
-            certificate_id=cert.id,
-            key='verification_simple_status',
-            value=mismatch.get('simple_status'),
-            confidence=1.0,
-            field_type='verification'
-        )
-        db_session.add(simple_status_field)
-
-        mismatch_report_field = ExtractedField(
-            certificate_id=cert.id,
-            key='verification_mismatch_report',
-            value=str(mismatch.get('report')),
-            confidence=1.0,
-            field_type='verification'
-        )
-        db_session.add(mismatch_report_field)
-
+        try:
+            db_session.flush()
+        except IntegrityError:
+            # A concurrent upload of the same file won the unique hash index
+            db_session.rollback()
+            processed_path.unlink(missing_ok=True)
+            existing = db_session.query(Certificate).filter(Certificate.content_hash == content_hash).one()
+            return _cached_upload_response(existing, file_type)
+        
+        # OCR, AI extraction and verification run on the background worker pool
+        job = enqueue_certificate(db_session, cert)
         db_session.commit()
-        
-        # Create structured tabular response with enhanced fields
-        tabular_data = {
-            "student_name": extracted_fields.get("student_name", "-"),
-            "enrollment_number": extracted_fields.get("enrollment_number", "-"),
-            "degree": extracted_fields.get("degree", "-"),
-            "branch": extracted_fields.get("branch", "-"),
-            "university_name": extracted_fields.get("university_name", "-"),
-            "graduation_date": extracted_fields.get("graduation_date", "-"),
-            "date_of_birth": extracted_fields.get("date_of_birth", "-"),
-            "grade": extracted_fields.get("grade", "-"),
-            "certificate_type": extracted_fields.get("certificate_type", "-"),
-            "semester": extracted_fields.get("semester", "-"),
-            "academic_year": extracted_fields.get("academic_year", "-"),
-            "sgpa": extracted_fields.get("sgpa", "-"),
-            "cgpa": extracted_fields.get("cgpa", "-"),
-            "total_credits": extracted_fields.get("total_credits", "-"),
-            "earned_credits": extracted_fields.get("earned_credits", "-"),
-            "subjects": extracted_fields.get("subjects", [])
-        }
+        notify_workers()
         
         return jsonify({
             "id": cert.id,
+            "job_id": job.id,
             "file_type": file_type,
-            "summary": summary,
-            "tabular_data": tabular_data,
-            "verification": verification,
-            "mismatch": mismatch.get('report'),
-            "simple_status": mismatch.get('simple_status'),
-            "confidence_score": verification.get('confidence_score', 0.0)
-        }), 201
+            "status": cert.status,
+            "status_url": f"/api/v1/certificates/{cert.id}/status",
+            "message": "Certificate queued for processing",
+            "cache_hit": False
+        }), 202
         
     except Exception as e:
         db_session.rollback()
         logger.error(f"Certificate upload failed: {str(e)}")
         return jsonify({"error": f"Processing failed: {str(e)}"}), 500
 
+@api_bp.route("/certificates/batch", methods=['POST'])
+def upload_certificate_batch():
+    """
+    Upload many certificates at once, as multipart 'files' and/or zip
+    archives. Everything is queued in one transaction and processed
+    concurrently by the worker pool; poll status_url for per-item progress.
+    """
+    try:
+        file_storages = request.files.getlist('files') + request.files.getlist('file')
+        if not any(f.filename for f in file_storages):
+            return jsonify({"error": "No files provided"}), 400
+        archives = [f.filename for f in file_storages if f.filename.lower().endswith('.zip')]
+        source = ", ".join(archives)[:255] or None
+
+        try:
+            batch, items, queued = create_batch(db_session, file_storages, source=source)
+        except BatchTooLarge as e:
+            db_session.rollback()
+            return jsonify({"error": str(e)}), 413
+        db_session.commit()
+        notify_workers()
+
+        return jsonify({
+            "batch_id": batch.id,
+            "total": batch.total,
+            "queued": queued,
+            "cache_hits": sum(1 for item in items if item.cache_hit),
+            "rejected": sum(1 for item in items if item.error),
+            "status_url": f"/api/v1/certificates/batch/{batch.id}",
+            "items": [
+                {"filename": item.filename, "id": item.certificate_id, "cache_hit": item.cache_hit, "error": item.error}
+                for item in items
+            ]
+        }), 202
+
+    except Exception as e:
+        db_session.rollback()
+        logger.error(f"Batch upload failed: {str(e)}")
+        return jsonify({"error": f"Batch upload failed: {str(e)}"}), 500
+
+@api_bp.route("/certificates/batch/<batch_id>", methods=['GET'])
+def get_batch_status(batch_id: str):
+    """Per-item progress of a batch upload."""
+    try:
+        progress = batch_progress(db_session, batch_id)
+        if progress is None:
+            return jsonify({"error": "Batch not found"}), 404
+        return jsonify(progress)
+
+    except Exception as e:
+        logger.error(f"Failed to get batch {batch_id}: {str(e)}")
+        return jsonify({"error": "Failed to fetch batch status"}), 500
+
+@api_bp.route("/certificates/<int:cert_id>/status", methods=['GET'])
+def get_certificate_status(cert_id: int):
+    """Poll the processing status of an uploaded certificate."""
+    try:
+        cert = db_session.get(Certificate, cert_id)
+        if not cert:
+            return jsonify({"error": "Certificate not found"}), 404
+        
+        job = get_latest_job(db_session, cert_id)
+        job_info = None
+        if job:
+            job_info = {
+                "id": job.id,
+                "status": job.status,
+                "attempts": job.attempts,
+                "error": job.error,
+                "created_at": job.created_at.isoformat(),
+                "started_at": job.started_at.isoformat() if job.started_at else None,
+                "finished_at": job.finished_at.isoformat() if job.finished_at else None
+            }
+        
+        return jsonify({
+            "id": cert.id,
+            "status": cert.status,
+            "job": job_info,
+            "result_url": f"/api/v1/certificates/{cert.id}"
+        })
+        
+    except Exception as e:
+        logger.error(f"Failed to get status for certificate {cert_id}: {str(e)}")
+        return jsonify({"error": "Failed to fetch certificate status"}), 500
+
+def _encode_cursor(cert: Certificate) -> str:
+    payload = json.dumps({"created_at": cert.created_at.isoformat(), "id": cert.id})
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return datetime.fromisoformat(payload["created_at"]), int(payload["id"])
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+def _paginate_certificates(query):
+    """
+    Apply newest-first pagination to a Certificate query.
+
+    With ?cursor= (the next_cursor of a previous page) this is keyset
+    pagination on (created_at, id): the cost doesn't grow with depth and
+    uploads arriving meanwhile don't shift rows between pages. Without it
+    the legacy ?offset= mode is used. Both return next_cursor, None on the
+    last page. Returns (certificates, page metadata for the response).
+    Limits above 100 are capped; raises ValueError for a limit below 1 or a
+    negative offset.
+    """
+    limit = min(int(request.args.get('limit', 20)), 100)
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+    cursor = request.args.get('cursor')
+    query = query.order_by(Certificate.created_at.desc(), Certificate.id.desc())
+    if cursor:
+        created_at, cert_id = _decode_cursor(cursor)
+        query = query.filter(tuple_(Certificate.created_at, Certificate.id) < tuple_(created_at, cert_id))
+        page = {"limit": limit, "cursor": cursor}
+    else:
+        offset = int(request.args.get('offset', 0))
+        if offset < 0:
+            raise ValueError("offset must not be negative")
+        query = query.offset(offset)
+        page = {"limit": limit, "offset": offset}
+    # One extra row tells us whether another page exists
+    certs = query.limit(limit + 1).all()
+    has_more = len(certs) > limit
+    certs = certs[:limit]
+    page["next_cursor"] = _encode_cursor(certs[-1]) if has_more and certs else None
+    return certs, page
+
+def _filter_certificates(query):
+    """
+    Narrow a Certificate query with the listing's optional filters:
+    status, simple_status, university, branch, enrollment_prefix,
+    cgpa_min/cgpa_max and created_from/created_to (ISO dates). Everything
+    runs in SQL against indexed columns of certificates/certificate_summary.
+    """
+    args = request.args
+    summary_filters = []
+    if args.get('simple_status'):
+        simple_status = args['simple_status'].strip().lower()
+        if simple_status == 'not verified':
+            # Certificates that haven't been verified yet have no status stored
+            summary_filters.append(or_(CertificateSummary.simple_status == simple_status,
+                                       CertificateSummary.simple_status.is_(None)))
+        else:
+            summary_filters.append(CertificateSummary.simple_status == simple_status)
+    if args.get('university'):
+        summary_filters.append(func.lower(CertificateSummary.university_name) == args['university'].strip().lower())
+    if args.get('branch'):
+        summary_filters.append(func.lower(CertificateSummary.branch) == args['branch'].strip().lower())
+    if args.get('enrollment_prefix'):
+        summary_filters.append(CertificateSummary.enrollment_number.startswith(
+            args['enrollment_prefix'].strip(), autoescape=True
+        ))
+    if args.get('cgpa_min'):
+        summary_filters.append(CertificateSummary.cgpa >= float(args['cgpa_min']))
+    if args.get('cgpa_max'):
+        summary_filters.append(CertificateSummary.cgpa <= float(args['cgpa_max']))
+    if summary_filters:
+        query = query.outerjoin(CertificateSummary).filter(*summary_filters)
+
+    if args.get('status'):
+        query = query.filter(Certificate.status == args['status'].strip().lower())
+    if args.get('created_from'):
+        query = query.filter(Certificate.created_at >= datetime.fromisoformat(args['created_from']))
+    if args.get('created_to'):
+        created_to = datetime.fromisoformat(args['created_to'])
+        if len(args['created_to']) == 10:
+            created_to += timedelta(days=1)  # a bare date includes that whole day
+            query = query.filter(Certificate.created_at < created_to)
+        else:
+            query = query.filter(Certificate.created_at <= created_to)
+    return query
+
 @api_bp.route("/certificates", methods=['GET'])
 def list_certificates():
     try:
-        limit = min(int(request.args.get('limit', 20)), 100)
-        offset = int(request.args.get('offset', 0))
-        
-        certs = db_session.query(Certificate).order_by(Certificate.created_at.desc()).limit(limit).offset(offset).all()
+        try:
+            query = _filter_certificates(db_session.query(Certificate))
+            certs, page = _paginate_certificates(query)
+        except ValueError as e:
+            return jsonify({"error": f"Invalid query parameter: {str(e)}"}), 400
+        summaries = load_summaries(db_session, [cert.id for cert in certs])
         
         result = []
         for cert in certs:
-            # Build map of extracted fields for quick lookup
-            fields_map = {}
-            verification_map = None
-            for f in cert.fields:
-                if f.field_type == 'extracted':
-                    fields_map[f.key] = f.value
-                elif f.field_type == 'verification' and f.key == 'verification_result':
-                    try:
-                        import ast
-                        verification_map = ast.literal_eval(f.value)
-                    except Exception:
-                        verification_map = None
-            
-            # Simple status for listing
-            mismatch = _compute_mismatch_report(fields_map, verification_map or {})
-
-            tabular_data = {
-                "student_name": fields_map.get("student_name", "-"),
-                "degree": fields_map.get("degree", "-"),
-                "branch": fields_map.get("branch", "-"),
-                "university_name": fields_map.get("university_name", "-"),
-                "enrollment_number": fields_map.get("enrollment_number", "-"),
-                "sgpa": fields_map.get("sgpa", "-"),
-                "cgpa": fields_map.get("cgpa", "-"),
-                "semester": fields_map.get("semester", "-"),
-                "academic_year": fields_map.get("academic_year", "-")
-            }
-            
+            row = summaries[cert.id]
             result.append({
                 "id": cert.id,
                 "status": cert.status,
                 "created_at": cert.created_at.isoformat(),
                 "original_filename": cert.original_filename,
-                "tabular_data": tabular_data,
-                "simple_status": mismatch.get('simple_status')
+                "tabular_data": tabular_data(row),
+                # Pending certificates have no verification yet
+                "simple_status": row.simple_status or "not verified"
             })
         
-        return jsonify({"certificates": result, "count": len(result), "limit": limit, "offset": offset})
+        return jsonify({"certificates": result, "count": len(result), **page})
         
     except Exception as e:
         logger.error(f"Failed to list certificates: {str(e)}")
@@ -426,59 +483,29 @@ def get_certificate(cert_id: int):
         if not cert:
             return jsonify({"error": "Certificate not found"}), 404
         
-        # Extract structured data from fields
-        extracted_fields = {}
-        summary = ""
-        verification = {}
-        
-        for field in cert.fields:
-            if field.field_type == 'ai_summary':
-                summary = field.value
-            elif field.field_type == 'verification':
-                if field.key == 'verification_result':
-                    try:
-                        import ast
-                        verification = ast.literal_eval(field.value)
-                    except:
-                        verification = {"student_verified": False, "enrollment_verified": False, "confidence_score": 0.0}
-            elif field.field_type == 'extracted':
-                extracted_fields[field.key] = {"value": field.value, "confidence": field.confidence}
-        
-        # Create structured tabular data with enhanced fields
-        tabular_data = {
-            "student_name": extracted_fields.get("student_name", {}).get("value", "-"),
-            "enrollment_number": extracted_fields.get("enrollment_number", {}).get("value", "-"),
-            "degree": extracted_fields.get("degree", {}).get("value", "-"),
-            "branch": extracted_fields.get("branch", {}).get("value", "-"),
-            "university_name": extracted_fields.get("university_name", {}).get("value", "-"),
-            "graduation_date": extracted_fields.get("graduation_date", {}).get("value", "-"),
-            "date_of_birth": extracted_fields.get("date_of_birth", {}).get("value", "-"),
-            "grade": extracted_fields.get("grade", {}).get("value", "-"),
-            "certificate_type": extracted_fields.get("certificate_type", {}).get("value", "-"),
-            "semester": extracted_fields.get("semester", {}).get("value", "-"),
-            "academic_year": extracted_fields.get("academic_year", {}).get("value", "-"),
-            "sgpa": extracted_fields.get("sgpa", {}).get("value", "-"),
-            "cgpa": extracted_fields.get("cgpa", {}).get("value", "-"),
-            "total_credits": extracted_fields.get("total_credits", {}).get("value", "-"),
-            "earned_credits": extracted_fields.get("earned_credits", {}).get("value", "-"),
-            "subjects": extracted_fields.get("subjects", {}).get("value", [])
-        }
+        row = load_summaries(db_session, [cert.id])[cert.id]
         
-        # Compute mismatch and simple status on the fly
-        flat_extracted = {k: v.get('value') for k, v in extracted_fields.items()}
-        mismatch = _compute_mismatch_report(flat_extracted, verification)
+        verification = row.verification or {}
+        if row.mismatch_report is not None and row.simple_status:
+            mismatch = {"report": row.mismatch_report, "simple_status": row.simple_status}
+        else:
+            # Not verified yet: report every comparison as not_available
+            mismatch = compute_mismatch_report(
+                {"student_name": row.student_name, "cgpa": row.cgpa_text, "sgpa": row.sgpa_text},
+                verification
+            )
 
         return jsonify({
             "id": cert.id,
             "status": cert.status,
             "created_at": cert.created_at.isoformat(),
             "original_filename": cert.original_filename,
-            "summary": summary,
-            "tabular_data": tabular_data,
+            "summary": row.ai_summary or "",
+            "tabular_data": tabular_data(row, detail=True),
             "verification": verification,
             "mismatch": mismatch.get('report'),
             "simple_status": mismatch.get('simple_status'),
-            "field_count": len(extracted_fields)
+            "field_count": row.field_count
         })
         
     except Exception as e:
@@ -575,71 +602,27 @@ def reverify_certificate(cert_id: int):
             return jsonify({"error": "Certificate not found"}), 404
         
         # Get extracted fields from certificate
-        extracted_fields = {}
-        for field in cert.fields:
-            if field.field_type == 'extracted':
-                extracted_fields[field.key] = field.value
-        
-        # Re-verify with university
-        verification = verify_certificate_with_university(extracted_fields)
-        
-        # Update verification field in database
-        verification_field = db_session.query(ExtractedField).filter(
-            ExtractedField.certificate_id == cert_id,
-            ExtractedField.key == 'verification_result'
-        ).first()
-        
-        if verification_field:
-            verification_field.value = str(verification)
-            verification_field.confidence = verification.get('confidence_score', 0.0)
-        else:
-            verification_field = ExtractedField(
-                certificate_id=cert.id,
-                key='verification_result',
-                value=str(verification),
-                confidence=verification.get('confidence_score', 0.0),
-                field_type='verification'
-            )
-            db_session.add(verification_field)
-
-        # Recompute and store simple status + mismatch report
-        extracted_fields_flat = {}
-        for field in cert.fields:
-            if field.field_type == 'extracted':
-                extracted_fields_flat[field.key] = field.value
-        mismatch = _compute_mismatch_report(extracted_fields_flat, verification)
-
-        # simple status
-        simple_status_field = db_session.query(ExtractedField).filter(
-            ExtractedField.certificate_id == cert_id,
-            ExtractedField.key == 'verification_simple_status'
-        ).first()
-        if simple_status_field:
-            simple_status_field.value = mismatch.get('simple_status')
-        else:
-            db_session.add(ExtractedField(
-                certificate_id=cert.id,
-                key='verification_simple_status',
-                value=mismatch.get('simple_status'),
-                confidence=1.0,
-                field_type='verification'
-            ))
-
-        # mismatch report
-        mismatch_field = db_session.query(ExtractedField).filter(
-            ExtractedField.certificate_id == cert_id,
-            ExtractedField.key == 'verification_mismatch_report'
-        ).first()
-        if mismatch_field:
-            mismatch_field.value = str(mismatch.get('report'))
-        else:
-            db_session.add(ExtractedField(
-                certificate_id=cert.id,
-                key='verification_mismatch_report',
-                value=str(mismatch.get('report')),
-                confidence=1.0,
-                field_type='verification'
-            ))
+        extracted_fields = dict(db_session.query(ExtractedField.key, ExtractedField.value).filter(
+            ExtractedField.certificate_id == cert.id,
+            ExtractedField.field_type == 'extracted'
+        ).all())
+        
+        # Re-verify with university, bypassing cached answers
+        verification = verify_certificate_with_university(extracted_fields, use_cache=False)
+        
+        # Recompute simple status + mismatch report
+        mismatch = compute_mismatch_report(extracted_fields, verification)
+
+        # Update verification, simple status and mismatch report in one upsert
+        upsert_fields(db_session, verification_field_rows(cert.id, verification, mismatch))
+
+        sync_certificate_summary(
+            db_session, cert.id,
+            extracted_fields=extracted_fields,
+            simple_status=mismatch.get('simple_status'),
+            verification=verification,
+            mismatch_report=mismatch.get('report')
+        )
         
         db_session.commit()
         
@@ -660,16 +643,16 @@ def reverify_certificate(cert_id: int):
 def get_my_certificates():
     """Get certificates for the current user"""
     try:
-        limit = min(int(request.args.get('limit', 20)), 100)
-        offset = int(request.args.get('offset', 0))
-        
         query = db_session.query(Certificate)  # Return all certificates since no auth
-        certs = query.order_by(Certificate.created_at.desc()).limit(limit).offset(offset).all()
+        try:
+            certs, page = _paginate_certificates(query)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        summaries = load_summaries(db_session, [cert.id for cert in certs])
         
         result = []
         for cert in certs:
-            summary_field = next((f for f in cert.fields if f.key == 'ai_summary'), None)
-            summary = summary_field.value if summary_field else "No summary available"
+            summary = summaries[cert.id].ai_summary or "No summary available"
             
             result.append({
                 "id": cert.id,
@@ -679,7 +662,7 @@ def get_my_certificates():
                 "summary": summary[:200] + "..." if len(summary) > 200 else summary
             })
         
-        return jsonify({"certificates": result, "count": len(result), "limit": limit, "offset": offset})
+        return jsonify({"certificates": result, "count": len(result), **page})
         
     except Exception as e:
         logger.error(f"Failed to get user certificates: {str(e)}")
@@ -696,7 +679,10 @@ def delete_all_certificates():
         if cert_count == 0:
             return jsonify({"message": "No certificates to delete", "deleted": 0})
         
-        # Delete all certificates (cascade will delete extracted fields)
+        # Bulk deletes skip ORM cascades: remove the rows referencing certificates first
+        db_session.query(ProcessingJob).delete(synchronize_session=False)
+        db_session.query(ExtractedField).delete(synchronize_session=False)
+        db_session.query(CertificateSummary).delete(synchronize_session=False)
         db_session.query(Certificate).delete()
         db_session.commit()
         
@@ -713,6 +699,88 @@ def delete_all_certificates():
         logger.error(f"Failed to delete certificates: {str(e)}")
         return jsonify({"error": f"Failed to delete certificates: {str(e)}"}), 500
 
+def _start_reverify(scope: str):
+    try:
+        run = create_reverify_run(db_session, scope)
+        run_id = run.id
+        db_session.commit()
+    except ReverifyRunActive as e:
+        db_session.rollback()
+        return jsonify({"error": "A re-verification run of this scope is already running", "run_id": str(e)}), 409
+    except ValueError as e:
+        db_session.rollback()
+        return jsonify({"error": str(e)}), 400
+    start_reverify_run(run_id)
+    return jsonify({
+        "message": "Re-verification started",
+        "run_id": run_id,
+        "status_url": f"/api/v1/admin/reverify/{run_id}"
+    }), 202
+
+@api_bp.route("/admin/reverify", methods=['POST'])
+def reverify_all_endpoint():
+    """
+    Re-verify every stored certificate (scope 'all', default) or only the
+    mismatches (scope 'mismatch') in the background; poll status_url for
+    progress (admin endpoint - no auth for demo).
+    """
+    data = request.get_json(silent=True) or {}
+    return _start_reverify(data.get('scope', 'all'))
+
+@api_bp.route("/admin/reverify-mismatches", methods=['POST'])
+def reverify_mismatches_endpoint():
+    """Re-verify every certificate currently in 'mismatch' state, in the background (admin endpoint - no auth for demo)."""
+    return _start_reverify('mismatch')
+
+@api_bp.route("/admin/reverify/<run_id>", methods=['GET'])
+def reverify_run_status(run_id: str):
+    progress = reverify_progress(db_session, run_id)
+    if progress is None:
+        return jsonify({"error": "Re-verification run not found"}), 404
+    return jsonify(progress)
+
+@api_bp.route("/admin/reverify/<run_id>/resume", methods=['POST'])
+def resume_reverify_run(run_id: str):
+    """Continue an interrupted or failed run after its last stored chunk."""
+    try:
+        run = claim_for_resume(db_session, run_id)
+        if run is None:
+            return jsonify({"error": "Re-verification run not found"}), 404
+        db_session.commit()
+    except ReverifyRunActive as e:
+        db_session.rollback()
+        return jsonify({"error": "A re-verification run of this scope is still in progress", "run_id": str(e)}), 409
+    except ValueError as e:
+        db_session.rollback()
+        return jsonify({"error": str(e)}), 400
+    start_reverify_run(run_id)
+    return jsonify({
+        "message": "Re-verification resumed",
+        "run_id": run_id,
+        "status_url": f"/api/v1/admin/reverify/{run_id}"
+    }), 202
+
+@api_bp.route("/verification/cache/invalidate", methods=['POST'])
+@require_auth
+@require_user_type([UserType.UNIVERSITY, UserType.ADMIN])
+def invalidate_verification_cache(current_user):
+    """
+    Called by the university portal when its records change (a certificate
+    added, the database reloaded). Invalidates the cached verification
+    results of every backend process; the optional enrollment_number /
+    student_name in the body only say what changed.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        removed = invalidate_verifications()
+    except Exception as e:
+        logger.error(f"Verification cache invalidation failed: {str(e)}")
+        return jsonify({"error": "Failed to invalidate verification cache"}), 500
+    changed = data.get('enrollment_number') or data.get('student_name') or "all records"
+    logger.info(f"{current_user.get('username')} invalidated cached verifications ({changed}); "
+                f"{removed} dropped in this process")
+    return jsonify({"invalidated": True, "removed_locally": removed})
+
 @api_bp.route("/health", methods=['GET'])
 def health_check():
     """Health check endpoint for deployment monitoring."""
@@ -725,6 +793,12 @@ def health_check():
             "service": "University Certificate Verifier API",
             "ai_status": api_key_status,
             "version": "1.0.0",
+            "university_portal": portal_breaker_stats(),
+            "caches": {
+                "ocr": ocr_cache_stats(),
+                "llm": llm_cache_stats(),
+                "verification": verification_cache_stats()
+            },
             "features": [
                 "AI-powered certificate extraction",
                 "OCR text recognition", 
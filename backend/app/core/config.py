@@ -2,15 +2,45 @@ import os
 from pathlib import Path
 from dotenv import load_dotenv
 
+from app.core.constants import DB_ECHO, DB_POOL_SIZE, DB_MAX_OVERFLOW
+
 # Load environment variables from .env file
 load_dotenv()
 
 class Settings:
     def __init__(self) -> None:
         self.DB_URL: str = os.environ.get("DATABASE_URL") or os.environ.get("DB_URL", "sqlite:///./university.db")
+        # Apply pending schema migrations on startup instead of via `python migrate.py` (local dev)
+        self.AUTO_MIGRATE: bool = os.environ.get("AUTO_MIGRATE", "false").lower() in ("1", "true", "yes")
+        # SQLAlchemy connection pool per process (timeouts/recycle in seconds)
+        self.DB_POOL_SIZE: int = int(os.environ.get("DB_POOL_SIZE", str(DB_POOL_SIZE)))
+        self.DB_MAX_OVERFLOW: int = int(os.environ.get("DB_MAX_OVERFLOW", str(DB_MAX_OVERFLOW)))
+        self.DB_POOL_TIMEOUT: float = float(os.environ.get("DB_POOL_TIMEOUT", "30"))
+        self.DB_POOL_RECYCLE: int = int(os.environ.get("DB_POOL_RECYCLE", "3600"))
+        self.DB_ECHO: bool = os.environ.get("DB_ECHO", str(DB_ECHO)).lower() in ("1", "true", "yes")
+        # Compiled SQL statements cached per engine (0 disables)
+        self.DB_STATEMENT_CACHE_SIZE: int = int(os.environ.get("DB_STATEMENT_CACHE_SIZE", "500"))
+        # SQLite only: lock wait, memory-mapped I/O and page cache sizes
+        self.SQLITE_BUSY_TIMEOUT: float = float(os.environ.get("SQLITE_BUSY_TIMEOUT", "30"))  # seconds
+        self.SQLITE_MMAP_SIZE: int = int(os.environ.get("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))  # bytes
+        self.SQLITE_CACHE_SIZE_KB: int = int(os.environ.get("SQLITE_CACHE_SIZE_KB", "65536"))
         self.OPENAI_API_KEY: str | None = os.environ.get("OPENAI_API_KEY")
         # Optional: custom base URL for OpenAI-compatible APIs (e.g., OpenRouter)
         self.OPENAI_BASE_URL: str | None = os.environ.get("OPENAI_BASE_URL")
+        # Cache of LLM extraction responses keyed by normalized OCR text
+        self.LLM_CACHE_ENABLED: bool = os.environ.get("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+        self.LLM_CACHE_TTL_DAYS: int = int(os.environ.get("LLM_CACHE_TTL_DAYS", "30"))
+        self.LLM_CACHE_MAX_ENTRIES: int = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "10000"))
+        # Shared OpenAI HTTP connection pool (seconds for timeouts)
+        self.OPENAI_MAX_CONNECTIONS: int = int(os.environ.get("OPENAI_MAX_CONNECTIONS", "10"))
+        self.OPENAI_KEEPALIVE_EXPIRY: float = float(os.environ.get("OPENAI_KEEPALIVE_EXPIRY", "60"))
+        self.OPENAI_CONNECT_TIMEOUT: float = float(os.environ.get("OPENAI_CONNECT_TIMEOUT", "10"))
+        self.OPENAI_TIMEOUT: float = float(os.environ.get("OPENAI_TIMEOUT", "120"))
+        self.OPENAI_MAX_RETRIES: int = int(os.environ.get("OPENAI_MAX_RETRIES", "2"))
+        # Max chat completions in flight per process, however many job workers run
+        self.LLM_MAX_CONCURRENCY: int = max(1, int(os.environ.get("LLM_MAX_CONCURRENCY", str(self.OPENAI_MAX_CONNECTIONS))))
+        # Extract fields and the one-line summary in a single chat completion (false = two calls)
+        self.AI_COMBINED_EXTRACTION: bool = os.environ.get("AI_COMBINED_EXTRACTION", "true").lower() in ("1", "true", "yes")
         self.UPLOAD_DIR: str = os.environ.get("UPLOAD_DIR", "./uploads")
         self.MAX_FILE_SIZE: int = int(os.environ.get("MAX_FILE_SIZE", "10485760"))  # 10MB
         self.LOG_LEVEL: str = os.environ.get("LOG_LEVEL", "INFO")
@@ -19,6 +49,45 @@ class Settings:
         self.PORT: int = int(os.environ.get("PORT", "5000"))
         self.HOST: str = os.environ.get("HOST", "0.0.0.0")
         
+        # University portal verification API: one pooled keep-alive session per process,
+        # connection errors and 502/503/504 retried with exponential backoff (seconds)
+        self.UNIVERSITY_PORTAL_URL: str = os.environ.get("UNIVERSITY_PORTAL_URL", "http://localhost:3000")
+        self.PORTAL_CONNECT_TIMEOUT: float = float(os.environ.get("PORTAL_CONNECT_TIMEOUT", "3"))
+        self.PORTAL_READ_TIMEOUT: float = float(os.environ.get("PORTAL_READ_TIMEOUT", "10"))
+        self.PORTAL_MAX_RETRIES: int = int(os.environ.get("PORTAL_MAX_RETRIES", "2"))
+        self.PORTAL_BACKOFF_FACTOR: float = float(os.environ.get("PORTAL_BACKOFF_FACTOR", "0.5"))
+        self.PORTAL_POOL_SIZE: int = int(os.environ.get("PORTAL_POOL_SIZE", "10"))
+        # Pairs per POST /api/verify/batch (the portal accepts up to its VERIFY_BATCH_MAX_ITEMS)
+        self.PORTAL_BATCH_SIZE: int = int(os.environ.get("PORTAL_BATCH_SIZE", "200"))
+        # Fail fast after this many consecutive portal failures (0 disables the breaker)
+        # and probe its /health every RESET_TIMEOUT seconds until it recovers
+        self.PORTAL_BREAKER_FAILURE_THRESHOLD: int = int(os.environ.get("PORTAL_BREAKER_FAILURE_THRESHOLD", "5"))
+        self.PORTAL_BREAKER_RESET_TIMEOUT: float = float(os.environ.get("PORTAL_BREAKER_RESET_TIMEOUT", "30"))
+        # In-process cache of portal answers (seconds; 0 entries disables it)
+        self.VERIFICATION_CACHE_TTL: int = int(os.environ.get("VERIFICATION_CACHE_TTL", "3600"))
+        self.VERIFICATION_CACHE_NEGATIVE_TTL: int = int(os.environ.get("VERIFICATION_CACHE_NEGATIVE_TTL", "300"))
+        self.VERIFICATION_CACHE_MAX_ENTRIES: int = int(os.environ.get("VERIFICATION_CACHE_MAX_ENTRIES", "10000"))
+        
+        # Background processing queue (0 workers disables the in-process pool)
+        self.JOB_WORKERS: int = int(os.environ.get("JOB_WORKERS", "2"))
+        self.JOB_POLL_INTERVAL: float = float(os.environ.get("JOB_POLL_INTERVAL", "1.0"))
+        self.JOB_STALE_AFTER: int = int(os.environ.get("JOB_STALE_AFTER", "600"))  # seconds
+        self.JOB_MAX_ATTEMPTS: int = int(os.environ.get("JOB_MAX_ATTEMPTS", "3"))
+        # Bulk re-verification (POST /admin/reverify, reverify_all.py): certificates per
+        # committed chunk and portal batch requests in flight at once
+        self.REVERIFY_CHUNK_SIZE: int = int(os.environ.get("REVERIFY_CHUNK_SIZE", "1000"))
+        self.REVERIFY_WORKERS: int = max(1, int(os.environ.get("REVERIFY_WORKERS", "4")))
+        # Files accepted by one POST /certificates/batch (multipart files + zip entries)
+        self.BATCH_MAX_FILES: int = int(os.environ.get("BATCH_MAX_FILES", "500"))
+        
+        # Parallel OCR of scanned PDF pages (also caps rendered pages held in memory)
+        self.OCR_WORKERS: int = max(1, int(os.environ.get("OCR_WORKERS", str(os.cpu_count() or 2))))
+        self.OCR_DPI: int = int(os.environ.get("OCR_DPI", "300"))
+        self.OCR_LANG: str = os.environ.get("OCR_LANG", "eng")
+        # On-disk OCR result cache; set OCR_CACHE_DIR to an empty string to disable
+        self.OCR_CACHE_DIR: str = os.environ.get("OCR_CACHE_DIR", "./ocr_cache")
+        self.OCR_CACHE_MAX_MB: int = int(os.environ.get("OCR_CACHE_MAX_MB", "256"))
+        
         # Create upload directory
         Path(self.UPLOAD_DIR).mkdir(parents=True, exist_ok=True)
         
@@ -21,6 +21,13 @@ class CertificateStatus:
     COMPLETED = "completed"
     FAILED = "failed"
 
+# Bulk re-verification run states
+class ReverifyRunStatus:
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    INTERRUPTED = "interrupted"
+
 # User Types
 class UserType:
     STUDENT = "student"
@@ -0,0 +1,446 @@
+"""
+Versioned schema migrations.
+
+Each migration is a numbered function applied at most once, in order, in
+its own transaction; applied versions are recorded in the schema_version
+table. Run them at deploy time with `python migrate.py`. App startup only
+compares the recorded version with LATEST_VERSION (one cheap query) instead
+of creating tables and introspecting columns on every boot.
+
+Every step is frozen: explicit DDL and plain SQL against the tables as
+they were at that version, never the ORM models or service code, so changing
+a model cannot change what an old migration does. Version 1 creates the
+tables as they were when versioning started - the original app's tables
+plus those added just before - and each later step brings them forward;
+tests/test_migrations.py checks that the result matches the models.
+
+Databases that predate this runner already hold some of that schema, so
+version 1 only creates missing tables and later steps check before altering
+anything that may already be in place (columns added by the old ad-hoc
+scripts, indexes the old startup code created).
+
+certificate_summary is derived from the field rows, so instead of a
+migration rebuilding it, migrate() refreshes it with the current code once
+the schema has reached the latest version.
+"""
+from datetime import datetime
+import ast
+import json
+import logging
+
+from sqlalchemy import (
+    JSON, Boolean, Column, DateTime, Float, ForeignKey, Index, Integer, MetaData, String, Table, Text,
+    bindparam, column, inspect, select, table, text
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION_TABLE = 'schema_version'
+
+
+class SchemaOutOfDate(RuntimeError):
+    pass
+
+
+def _columns(conn, table: str) -> set[str]:
+    return {c['name'] for c in inspect(conn).get_columns(table)}
+
+
+def _add_column(conn, table: str, column: str, ddl: str) -> bool:
+    if column in _columns(conn, table):
+        return False
+    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+    logger.info(f"Added {table}.{column} column")
+    return True
+
+
+def _json_ddl(conn) -> str:
+    return "JSONB" if conn.dialect.name == 'postgresql' else "JSON"
+
+
+def _datetime_ddl(conn) -> str:
+    return DateTime().compile(dialect=conn.dialect)
+
+
+# --- migrations ---
+
+def _initial_schema(conn):
+    metadata = MetaData()
+    # The original app's tables, columns and indexes
+    Table(
+        'users', metadata,
+        Column('id', Integer, primary_key=True),
+        Column('username', String(100), unique=True, nullable=False),
+        Column('email', String(200), unique=True, nullable=False),
+        Column('password_hash', String(255), nullable=False),
+        Column('user_type', String(20), nullable=False),
+        Column('is_active', Boolean, nullable=False),
+        Column('created_at', DateTime, nullable=False),
+        Column('student_name', String(200), nullable=True),
+        Column('student_reg_no', String(100), unique=True, nullable=True),
+        Column('student_dob', String(10), nullable=True),
+        Column('university_name', String(200), nullable=True),
+        Column('university_code', String(50), unique=True, nullable=True),
+        Index('idx_users_username', 'username'),
+        Index('idx_users_email', 'email'),
+        Index('idx_users_type', 'user_type'),
+        Index('idx_users_student_reg_no', 'student_reg_no'),
+        Index('idx_users_university_code', 'university_code'),
+    )
+    Table(
+        'students', metadata,
+        Column('id', Integer, primary_key=True),
+        Column('name', String(200), nullable=False),
+        Column('dob', String(10), nullable=True),
+        Column('reg_no', String(100), unique=True, nullable=True),
+        Column('created_at', DateTime, nullable=False),
+        Index('idx_students_reg_no', 'reg_no'),
+        Index('idx_students_name', 'name'),
+    )
+    Table(
+        'certificates', metadata,
+        Column('id', Integer, primary_key=True),
+        Column('user_id', Integer, ForeignKey('users.id'), nullable=True),
+        Column('student_id', Integer, ForeignKey('students.id'), nullable=True),
+        Column('image_path', String(500), nullable=False),
+        Column('original_filename', String(255), nullable=True),
+        Column('status', String(50), nullable=False),
+        Column('created_at', DateTime, nullable=False),
+        Index('idx_certificates_user_id', 'user_id'),
+        Index('idx_certificates_student_id', 'student_id'),
+        Index('idx_certificates_created_at', 'created_at'),
+        Index('idx_certificates_status', 'status'),
+    )
+    Table(
+        'extracted_fields', metadata,
+        Column('id', Integer, primary_key=True),
+        Column('certificate_id', Integer, ForeignKey('certificates.id'), nullable=False),
+        Column('key', String(100), nullable=False),
+        Column('value', Text, nullable=True),
+        Column('confidence', Float, nullable=True),
+        Column('field_type', String(50), nullable=False),
+        Index('idx_extracted_fields_certificate_id', 'certificate_id'),
+        Index('idx_extracted_fields_key', 'key'),
+        Index('idx_extracted_fields_type', 'field_type'),
+        Index('idx_extracted_fields_cert_key', 'certificate_id', 'key'),
+    )
+    # Added just before versioning; their indexes come with version 7
+    Table(
+        'certificate_summary', metadata,
+        Column('certificate_id', Integer, ForeignKey('certificates.id', ondelete='CASCADE'), primary_key=True),
+        Column('student_name', String(255), nullable=True),
+        Column('enrollment_number', String(100), nullable=True),
+        Column('degree', String(255), nullable=True),
+        Column('branch', String(255), nullable=True),
+        Column('university_name', String(255), nullable=True),
+        Column('graduation_date', String(50), nullable=True),
+        Column('date_of_birth', String(50), nullable=True),
+        Column('grade', String(50), nullable=True),
+        Column('certificate_type', String(255), nullable=True),
+        Column('semester', String(50), nullable=True),
+        Column('academic_year', String(50), nullable=True),
+        Column('total_credits', String(50), nullable=True),
+        Column('earned_credits', String(50), nullable=True),
+        Column('subjects', Text, nullable=True),
+        Column('cgpa', Float, nullable=True),
+        Column('sgpa', Float, nullable=True),
+        Column('cgpa_text', String(50), nullable=True),
+        Column('sgpa_text', String(50), nullable=True),
+        Column('simple_status', String(20), nullable=True),
+        Column('ai_summary', Text, nullable=True),
+        Column('field_count', Integer, nullable=False),
+        Column('updated_at', DateTime, nullable=False),
+    )
+    Table(
+        'processing_jobs', metadata,
+        Column('id', Integer, primary_key=True),
+        Column('certificate_id', Integer, ForeignKey('certificates.id'), nullable=False),
+        Column('status', String(20), nullable=False),
+        Column('attempts', Integer, nullable=False),
+        Column('error', Text, nullable=True),
+        Column('worker_id', String(100), nullable=True),
+        Column('created_at', DateTime, nullable=False),
+        Column('started_at', DateTime, nullable=True),
+        Column('finished_at', DateTime, nullable=True),
+    )
+    Table(
+        'upload_batches', metadata,
+        Column('id', String(32), primary_key=True),
+        Column('source', String(255), nullable=True),
+        Column('total', Integer, nullable=False),
+        Column('created_at', DateTime, nullable=False),
+    )
+    Table(
+        'upload_batch_items', metadata,
+        Column('id', Integer, primary_key=True),
+        Column('batch_id', String(32), ForeignKey('upload_batches.id', ondelete='CASCADE'), nullable=False),
+        Column('filename', String(255), nullable=False),
+        Column('certificate_id', Integer, ForeignKey('certificates.id', ondelete='SET NULL'), nullable=True),
+        Column('cache_hit', Boolean, nullable=False),
+        Column('error', Text, nullable=True),
+    )
+    Table(
+        'llm_cache', metadata,
+        Column('cache_key', String(64), primary_key=True),
+        Column('model', String(100), nullable=False),
+        Column('prompt_version', String(50), nullable=False),
+        Column('response', Text, nullable=False),
+        Column('hit_count', Integer, nullable=False),
+        Column('created_at', DateTime, nullable=False),
+        Column('last_used_at', DateTime, nullable=False),
+    )
+    metadata.create_all(bind=conn, checkfirst=True)
+
+
+def _certificate_owner_columns(conn):
+    """Formerly migrate_db.py / sqlite_add_missing_columns.py."""
+    added = _add_column(conn, 'certificates', 'user_id', "INTEGER")
+    _add_column(conn, 'certificates', 'original_filename', "VARCHAR(255)")
+    if added and conn.dialect.name == 'postgresql':
+        conn.execute(text(
+            "ALTER TABLE certificates ADD CONSTRAINT fk_certificates_user_id "
+            "FOREIGN KEY (user_id) REFERENCES users(id)"
+        ))
+
+
+def _extracted_field_type(conn):
+    """Formerly add_field_type_column.py."""
+    _add_column(conn, 'extracted_fields', 'field_type', "VARCHAR(50) DEFAULT 'extracted' NOT NULL")
+
+
+def _certificate_dedup_columns(conn):
+    _add_column(conn, 'certificates', 'content_hash', "VARCHAR(64)")
+    _add_column(conn, 'certificates', 'ocr_text', "TEXT")
+
+
+def _summary_verification_json(conn):
+    _add_column(conn, 'certificate_summary', 'verification', _json_ddl(conn))
+    _add_column(conn, 'certificate_summary', 'mismatch_report', _json_ddl(conn))
+
+
+def _unique_field_keys(conn):
+    # Field upserts need (certificate_id, key) to be unique; reprocessed
+    # certificates may have duplicates, keep the newest of each
+    conn.execute(text(
+        "DELETE FROM extracted_fields WHERE id NOT IN "
+        "(SELECT MAX(id) FROM extracted_fields GROUP BY certificate_id, key)"
+    ))
+    conn.execute(text("DROP INDEX IF EXISTS idx_extracted_fields_cert_key"))
+
+
+# (name, table, columns, unique) of the model indexes as of version 7
+_V7_INDEXES = [
+    ("idx_users_email", "users", "email", False),
+    ("idx_users_username", "users", "username", False),
+    ("idx_users_type", "users", "user_type", False),
+    ("idx_users_student_reg_no", "users", "student_reg_no", False),
+    ("idx_users_university_code", "users", "university_code", False),
+    ("idx_students_name", "students", "name", False),
+    ("idx_students_reg_no", "students", "reg_no", False),
+    ("idx_certificates_content_hash", "certificates", "content_hash", True),
+    ("idx_certificates_created_at", "certificates", "created_at", False),
+    ("idx_certificates_created_at_id", "certificates", "created_at, id", False),
+    ("idx_certificates_status", "certificates", "status", False),
+    ("idx_certificates_student_id", "certificates", "student_id", False),
+    ("idx_certificates_user_id", "certificates", "user_id", False),
+    ("idx_extracted_fields_certificate_id", "extracted_fields", "certificate_id", False),
+    ("idx_extracted_fields_key", "extracted_fields", '"key"', False),
+    ("idx_extracted_fields_type", "extracted_fields", "field_type", False),
+    ("uq_extracted_fields_cert_key", "extracted_fields", 'certificate_id, "key"', True),
+    ("idx_certificate_summary_student_name", "certificate_summary", "student_name", False),
+    ("idx_certificate_summary_enrollment", "certificate_summary", "enrollment_number", False),
+    ("idx_certificate_summary_university", "certificate_summary", "university_name", False),
+    ("idx_certificate_summary_university_lower", "certificate_summary", "lower(university_name)", False),
+    ("idx_certificate_summary_branch_lower", "certificate_summary", "lower(branch)", False),
+    ("idx_certificate_summary_cgpa", "certificate_summary", "cgpa", False),
+    ("idx_certificate_summary_sgpa", "certificate_summary", "sgpa", False),
+    ("idx_certificate_summary_simple_status", "certificate_summary", "simple_status", False),
+    ("idx_processing_jobs_certificate_id", "processing_jobs", "certificate_id", False),
+    ("idx_processing_jobs_status_created", "processing_jobs", "status, created_at", False),
+    ("idx_upload_batch_items_batch_id", "upload_batch_items", "batch_id", False),
+    ("idx_upload_batch_items_certificate_id", "upload_batch_items", "certificate_id", False),
+    ("idx_llm_cache_created_at", "llm_cache", "created_at", False),
+    ("idx_llm_cache_last_used_at", "llm_cache", "last_used_at", False),
+]
+# pattern_ops lets Postgres serve enrollment prefix (LIKE 'x%') searches from the index
+_V7_POSTGRES_COLUMNS = {"idx_certificate_summary_enrollment": "enrollment_number varchar_pattern_ops"}
+
+
+def _model_indexes(conn):
+    # Databases from before versioning already have the original app's indexes.
+    # IF NOT EXISTS rather than checkfirst: SQLite can't reflect expression indexes.
+    for name, table_name, columns, unique in _V7_INDEXES:
+        if conn.dialect.name == 'postgresql':
+            columns = _V7_POSTGRES_COLUMNS.get(name, columns)
+        conn.execute(text(
+            f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {name} ON {table_name} ({columns})"
+        ))
+
+
+def _verification_payloads_json(conn):
+    """Formerly migrate_verification_json.py: verification fields stored as a Python repr -> JSON."""
+    fields = table('extracted_fields', column('id', Integer), column('key', String), column('value', Text))
+    rewrite = fields.update().where(fields.c.id == bindparam('field_id')).values(value=bindparam('json_value'))
+    converted = 0
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            select(fields.c.id, fields.c.value)
+            .where(fields.c.id > last_id, fields.c.key.in_(('verification_result', 'verification_mismatch_report')))
+            .order_by(fields.c.id)
+            .limit(500)
+        ).all()
+        if not rows:
+            break
+        updates = []
+        for field_id, value in rows:
+            try:
+                json.loads(value or 'null')
+                continue  # Already JSON
+            except ValueError:
+                pass
+            try:
+                updates.append({"field_id": field_id, "json_value": json.dumps(ast.literal_eval(value))})
+            except (ValueError, SyntaxError, TypeError):
+                logger.warning(f"Field {field_id}: could not decode verification payload, leaving as is")
+        if updates:
+            conn.execute(rewrite, updates)
+        converted += len(updates)
+        last_id = rows[-1][0]
+    logger.info(f"Converted {converted} verification fields to JSON")
+
+
+def _reverify_runs(conn):
+    Table(
+        'reverify_runs', MetaData(),
+        Column('id', String(32), primary_key=True),
+        Column('scope', String(20), nullable=False),
+        Column('status', String(20), nullable=False),
+        Column('total', Integer, nullable=False),
+        Column('processed', Integer, nullable=False),
+        Column('last_certificate_id', Integer, nullable=False),
+        Column('counts', JSON().with_variant(JSONB(), 'postgresql'), nullable=True),
+        Column('error', Text, nullable=True),
+        Column('created_at', DateTime, nullable=False),
+        Column('updated_at', DateTime, nullable=False),
+        Column('finished_at', DateTime, nullable=True),
+    ).create(bind=conn, checkfirst=True)
+
+
+def _job_heartbeat(conn):
+    if _add_column(conn, 'processing_jobs', 'updated_at', _datetime_ddl(conn)):
+        conn.execute(text("UPDATE processing_jobs SET updated_at = COALESCE(started_at, created_at)"))
+
+
+def _cache_generations(conn):
+    generations = Table(
+        'cache_generations', MetaData(),
+        Column('name', String(50), primary_key=True),
+        Column('generation', Integer, nullable=False),
+        Column('updated_at', DateTime, nullable=False),
+    )
+    generations.create(bind=conn, checkfirst=True)
+    if conn.execute(select(generations.c.name).where(generations.c.name == 'verification')).first() is None:
+        conn.execute(generations.insert().values(name='verification', generation=0, updated_at=datetime.utcnow()))
+
+
+def _one_running_reverify_run(conn):
+    # Keep the most recent running run of each scope; older ones died with their process
+    latest = {}
+    for run_id, scope in conn.execute(text(
+        "SELECT id, scope FROM reverify_runs WHERE status = 'running' ORDER BY updated_at"
+    )):
+        if scope in latest:
+            conn.execute(text(
+                "UPDATE reverify_runs SET status = 'interrupted', error = 'Superseded by a newer run' WHERE id = :id"
+            ), {"id": latest[scope]})
+        latest[scope] = run_id
+    conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_reverify_runs_running_scope "
+        "ON reverify_runs (scope) WHERE status = 'running'"
+    ))
+
+
+MIGRATIONS = [
+    (1, "initial schema", _initial_schema),
+    (2, "certificate owner columns", _certificate_owner_columns),
+    (3, "extracted field type", _extracted_field_type),
+    (4, "certificate content hash and OCR text", _certificate_dedup_columns),
+    (5, "summary verification JSON columns", _summary_verification_json),
+    (6, "unique extracted field keys", _unique_field_keys),
+    (7, "model indexes", _model_indexes),
+    (8, "verification payloads as JSON", _verification_payloads_json),
+    (9, "bulk re-verification runs", _reverify_runs),
+    (10, "processing job heartbeat", _job_heartbeat),
+    (11, "shared cache generations", _cache_generations),
+    (12, "one running re-verification run per scope", _one_running_reverify_run),
+]
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+# --- runner ---
+
+def current_version(engine) -> int:
+    """Highest applied migration, 0 for a database the runner has never touched."""
+    with engine.connect() as conn:
+        if not inspect(conn).has_table(SCHEMA_VERSION_TABLE):
+            return 0
+        return conn.execute(text(f"SELECT MAX(version) FROM {SCHEMA_VERSION_TABLE}")).scalar() or 0
+
+
+def migrate(engine, target: int | None = None) -> list[int]:
+    """Apply pending migrations up to target (default: all). Returns the versions applied."""
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {SCHEMA_VERSION_TABLE} ("
+            "version INTEGER PRIMARY KEY, name VARCHAR(200) NOT NULL, applied_at TIMESTAMP NOT NULL)"
+        ))
+    applied = []
+    start = current_version(engine)
+    for version, name, step in MIGRATIONS:
+        if version <= start or (target is not None and version > target):
+            continue
+        logger.info(f"Applying migration {version}: {name}")
+        with engine.begin() as conn:
+            step(conn)
+            # The version row commits with the migration, so a failed step is retried next run
+            conn.execute(
+                text(f"INSERT INTO {SCHEMA_VERSION_TABLE} (version, name, applied_at) VALUES (:v, :n, :t)"),
+                {"v": version, "n": name, "t": datetime.utcnow()}
+            )
+        applied.append(version)
+    if applied and applied[-1] == LATEST_VERSION:
+        refresh_summaries(engine, applied)
+    return applied
+
+
+# Migrations that change what certificate_summary holds: 5 added its
+# verification columns, 8 made their source fields decodable as JSON
+_REBUILD_SUMMARIES_AFTER = {5, 8}
+
+
+def refresh_summaries(engine, applied: list[int]) -> int:
+    """
+    Fill certificate_summary rows missing for existing certificates, and
+    rewrite every row if a migration changed what they derive from.
+    """
+    from app.services.summary import backfill_summaries
+    rebuild = bool(_REBUILD_SUMMARIES_AFTER.intersection(applied))
+    with Session(bind=engine) as session:
+        written = backfill_summaries(session, rebuild=rebuild)
+    if written:
+        logger.info(f"{'Rebuilt' if rebuild else 'Backfilled'} {written} certificate summaries")
+    return written
+
+
+def check_schema_version(engine) -> int:
+    """Raise SchemaOutOfDate unless every migration has been applied."""
+    version = current_version(engine)
+    if version < LATEST_VERSION:
+        raise SchemaOutOfDate(
+            f"Database schema is at version {version}, this code needs {LATEST_VERSION}. "
+            f"Run `python migrate.py` (or set AUTO_MIGRATE=true)."
+        )
+    return version
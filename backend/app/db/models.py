@@ -1,10 +1,15 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Float, Index, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Float, Index, Boolean, JSON, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime
 from app.db.session import Base
+from app.core.constants import CertificateStatus, ReverifyRunStatus
 import hashlib
 import secrets
 
+# JSONB on Postgres (indexable, decoded by the driver), JSON text elsewhere
+JSONType = JSON().with_variant(JSONB(), 'postgresql')
+
 class User(Base):
     __tablename__ = 'users'
     
@@ -74,17 +79,23 @@ class Certificate(Base):
     image_path = Column(String(500), nullable=False)
     original_filename = Column(String(255), nullable=True)
     status = Column(String(50), default='processed', nullable=False)
+    content_hash = Column(String(64), nullable=True)  # SHA-256 of the uploaded bytes
+    ocr_text = deferred(Column(Text, nullable=True))  # Not needed by list/detail reads
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     
     user = relationship('User', back_populates='certificates')
     student = relationship('Student', back_populates='certificates')
     fields = relationship('ExtractedField', back_populates='certificate', cascade='all, delete-orphan')
+    jobs = relationship('ProcessingJob', back_populates='certificate', cascade='all, delete-orphan')
+    summary = relationship('CertificateSummary', back_populates='certificate', uselist=False, cascade='all, delete-orphan')
     
     __table_args__ = (
         Index('idx_certificates_user_id', 'user_id'),
         Index('idx_certificates_student_id', 'student_id'),
         Index('idx_certificates_created_at', 'created_at'),
+        Index('idx_certificates_created_at_id', 'created_at', 'id'),  # Keyset pagination order
         Index('idx_certificates_status', 'status'),
+        Index('idx_certificates_content_hash', 'content_hash', unique=True),
     )
 
 class ExtractedField(Base):
@@ -103,5 +114,148 @@ class ExtractedField(Base):
         Index('idx_extracted_fields_certificate_id', 'certificate_id'),
         Index('idx_extracted_fields_key', 'key'),
         Index('idx_extracted_fields_type', 'field_type'),
-        Index('idx_extracted_fields_cert_key', 'certificate_id', 'key'),  # Composite index for faster lookups
-    )
\ No newline at end of file
+        # One row per certificate and key; field writes are upserts on this pair
+        Index('uq_extracted_fields_cert_key', 'certificate_id', 'key', unique=True),
+    )
+
+class CertificateSummary(Base):
+    """
+    One typed row per certificate, denormalized from the ExtractedField
+    key/value rows so list/detail reads and filters don't have to pivot them.
+    """
+    __tablename__ = 'certificate_summary'
+    
+    certificate_id = Column(Integer, ForeignKey('certificates.id', ondelete='CASCADE'), primary_key=True)
+    student_name = Column(String(255), nullable=True)
+    enrollment_number = Column(String(100), nullable=True)
+    degree = Column(String(255), nullable=True)
+    branch = Column(String(255), nullable=True)
+    university_name = Column(String(255), nullable=True)
+    graduation_date = Column(String(50), nullable=True)
+    date_of_birth = Column(String(50), nullable=True)
+    grade = Column(String(50), nullable=True)
+    certificate_type = Column(String(255), nullable=True)
+    semester = Column(String(50), nullable=True)
+    academic_year = Column(String(50), nullable=True)
+    total_credits = Column(String(50), nullable=True)
+    earned_credits = Column(String(50), nullable=True)
+    subjects = Column(Text, nullable=True)
+    cgpa = Column(Float, nullable=True)  # Parsed for range filters; None when not numeric
+    sgpa = Column(Float, nullable=True)
+    cgpa_text = Column(String(50), nullable=True)  # As extracted, for display
+    sgpa_text = Column(String(50), nullable=True)
+    simple_status = Column(String(20), nullable=True)
+    verification = Column(JSONType, nullable=True)  # Latest university verification payload
+    mismatch_report = Column(JSONType, nullable=True)  # {"name": ..., "cgpa": ..., "sgpa": ...}
+    ai_summary = Column(Text, nullable=True)
+    field_count = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    certificate = relationship('Certificate', back_populates='summary')
+    
+    __table_args__ = (
+        Index('idx_certificate_summary_student_name', 'student_name'),
+        # pattern_ops lets Postgres serve enrollment prefix (LIKE 'x%') searches from the index
+        Index('idx_certificate_summary_enrollment', 'enrollment_number',
+              postgresql_ops={'enrollment_number': 'varchar_pattern_ops'}),
+        Index('idx_certificate_summary_university', 'university_name'),
+        Index('idx_certificate_summary_university_lower', func.lower(university_name)),
+        Index('idx_certificate_summary_branch_lower', func.lower(branch)),
+        Index('idx_certificate_summary_cgpa', 'cgpa'),
+        Index('idx_certificate_summary_sgpa', 'sgpa'),
+        Index('idx_certificate_summary_simple_status', 'simple_status'),
+    )
+
+class ProcessingJob(Base):
+    __tablename__ = 'processing_jobs'
+    
+    id = Column(Integer, primary_key=True)
+    certificate_id = Column(Integer, ForeignKey('certificates.id'), nullable=False)
+    status = Column(String(20), default=CertificateStatus.PENDING, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    error = Column(Text, nullable=True)
+    worker_id = Column(String(100), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, nullable=True)  # Heartbeat: bumped while a worker runs the job
+    finished_at = Column(DateTime, nullable=True)
+    
+    certificate = relationship('Certificate', back_populates='jobs')
+    
+    __table_args__ = (
+        Index('idx_processing_jobs_certificate_id', 'certificate_id'),
+        Index('idx_processing_jobs_status_created', 'status', 'created_at'),  # Queue polling order
+    )
+
+class UploadBatch(Base):
+    __tablename__ = 'upload_batches'
+    
+    id = Column(String(32), primary_key=True)  # Opaque uuid4 hex handed to the client
+    source = Column(String(255), nullable=True)  # Zip file name, if the batch came as an archive
+    total = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    items = relationship('UploadBatchItem', back_populates='batch', cascade='all, delete-orphan')
+
+class UploadBatchItem(Base):
+    __tablename__ = 'upload_batch_items'
+    
+    id = Column(Integer, primary_key=True)
+    batch_id = Column(String(32), ForeignKey('upload_batches.id', ondelete='CASCADE'), nullable=False)
+    filename = Column(String(255), nullable=False)
+    certificate_id = Column(Integer, ForeignKey('certificates.id', ondelete='SET NULL'), nullable=True)
+    cache_hit = Column(Boolean, default=False, nullable=False)  # Matched an already uploaded file
+    error = Column(Text, nullable=True)  # Why the file was rejected; no certificate then
+    
+    batch = relationship('UploadBatch', back_populates='items')
+    certificate = relationship('Certificate')
+    
+    __table_args__ = (
+        Index('idx_upload_batch_items_batch_id', 'batch_id'),
+        Index('idx_upload_batch_items_certificate_id', 'certificate_id'),
+    )
+
+class ReverifyRun(Base):
+    __tablename__ = 'reverify_runs'
+    
+    id = Column(String(32), primary_key=True)  # Opaque uuid4 hex handed to the client
+    scope = Column(String(20), nullable=False)  # 'all' or 'mismatch'
+    status = Column(String(20), default=ReverifyRunStatus.RUNNING, nullable=False)
+    total = Column(Integer, default=0, nullable=False)  # Certificates in scope when the run started
+    processed = Column(Integer, default=0, nullable=False)
+    last_certificate_id = Column(Integer, default=0, nullable=False)  # Keyset cursor; a resumed run continues after it
+    counts = Column(JSONType, nullable=True)  # Certificates per resulting simple_status, plus 'skipped'
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)  # Heartbeat: bumped after every chunk
+    finished_at = Column(DateTime, nullable=True)
+    
+    __table_args__ = (
+        # At most one live run per scope, even when two starts race
+        Index('uq_reverify_runs_running_scope', 'scope', unique=True,
+              sqlite_where=text("status = 'running'"), postgresql_where=text("status = 'running'")),
+    )
+
+class LLMCacheEntry(Base):
+    __tablename__ = 'llm_cache'
+    
+    cache_key = Column(String(64), primary_key=True)  # sha256(prompt version, model, normalized OCR text)
+    model = Column(String(100), nullable=False)
+    prompt_version = Column(String(50), nullable=False)
+    response = Column(Text, nullable=False)  # Parsed JSON returned by the model
+    hit_count = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_used_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        Index('idx_llm_cache_created_at', 'created_at'),
+        Index('idx_llm_cache_last_used_at', 'last_used_at'),
+    )
+
+class CacheGeneration(Base):
+    __tablename__ = 'cache_generations'
+    
+    # One row per in-process cache; bumping generation tells every process to drop its entries
+    name = Column(String(50), primary_key=True)
+    generation = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
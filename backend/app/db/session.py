@@ -1,8 +1,11 @@
 from sqlalchemy.orm import declarative_base, scoped_session, sessionmaker
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, insert, tuple_
+from sqlalchemy.engine import make_url
 from contextlib import contextmanager
 import logging
 
+from app.core.config import settings
+
 logger = logging.getLogger(__name__)
 
 Base = declarative_base()
@@ -11,15 +14,47 @@ _db_factory = None
 
 db_session = scoped_session(lambda: _db_factory())
 
+def _engine_options(url) -> dict:
+    options = {
+        "pool_pre_ping": True,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "echo": settings.DB_ECHO,
+        "query_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+    }
+    if url.get_backend_name() == 'sqlite':
+        options["connect_args"] = {"timeout": settings.SQLITE_BUSY_TIMEOUT}
+        if url.database in (None, '', ':memory:'):
+            return options  # single shared in-memory connection, no pool to size
+    options.update({
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    })
+    return options
+
+def _configure_sqlite(engine):
+    """
+    Per-connection PRAGMAs: WAL lets readers run alongside the single writer
+    and busy_timeout makes writers wait for the lock instead of failing with
+    "database is locked" when uploads and job workers write concurrently.
+    """
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT * 1000)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+        cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}")  # negative = KiB
+        cursor.close()
+
 def init_engine(db_url: str):
     global _engine, _db_factory
     
-    _engine = create_engine(
-        db_url, 
-        pool_pre_ping=True,
-        pool_recycle=3600,
-        echo=False
-    )
+    url = make_url(db_url)
+    _engine = create_engine(url, **_engine_options(url))
+    if url.get_backend_name() == 'sqlite':
+        _configure_sqlite(_engine)
     
     _db_factory = sessionmaker(bind=_engine, autocommit=False, autoflush=False)
     logger.info("Database engine initialized")
@@ -39,7 +74,41 @@ def get_db_session():
     finally:
         session.close()
 
-def create_tables():
-    if _engine:
-        Base.metadata.create_all(_engine)
-        logger.info("Database tables created")
\ No newline at end of file
+# Bound parameters per upsert statement: SQLite before 3.32 allows at most 999
+UPSERT_MAX_PARAMETERS = 999
+
+def upsert(session, model, rows: list[dict], conflict_columns: tuple[str, ...], update_columns: tuple[str, ...]):
+    """
+    Insert rows, updating update_columns of rows that collide on the unique
+    conflict_columns, as INSERT ... ON CONFLICT DO UPDATE statements on
+    PostgreSQL and SQLite. Other dialects fall back to delete + insert.
+    Each statement carries as many rows as fit in UPSERT_MAX_PARAMETERS, so
+    the caller's batch size never runs into the database's variable limit.
+    """
+    if not rows:
+        return
+    per_statement = max(1, UPSERT_MAX_PARAMETERS // len(rows[0]))
+    for start in range(0, len(rows), per_statement):
+        _upsert_rows(session, model, rows[start:start + per_statement], conflict_columns, update_columns)
+
+def _upsert_rows(session, model, rows, conflict_columns, update_columns):
+    dialect = session.get_bind().dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        stmt = dialect_insert(model).values(rows)
+        if update_columns:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=list(conflict_columns),
+                set_={column: stmt.excluded[column] for column in update_columns}
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=list(conflict_columns))
+        session.execute(stmt)
+        return
+    keys = [tuple(row[c] for c in conflict_columns) for row in rows]
+    columns = [getattr(model, c) for c in conflict_columns]
+    session.query(model).filter(tuple_(*columns).in_(keys)).delete(synchronize_session=False)
+    session.execute(insert(model), rows)
@@ -1,6 +1,7 @@
 from flask import Flask, request
 from flask_cors import CORS
-from app.db.session import init_engine, db_session, Base, get_engine
+from app.db.session import init_engine, db_session, get_engine
+from app.db.migrations import migrate, check_schema_version
 from app.api.routes import api_bp
 from app.core.config import settings
 
@@ -19,35 +20,10 @@ def create_app() -> Flask:
     # DB
     init_engine(settings.DB_URL)
 
-    # Import models and create tables
-    from app.db import models
-    try:
-        Base.metadata.create_all(bind=get_engine())
-    except Exception as e:
-        # Tables might already exist, which is fine
-        print(f"Note: Database tables may already exist: {e}")
-        pass
-    
-    # Run migration for field_type column
-    try:
-        from sqlalchemy import text
-        with get_engine().connect() as conn:
-            # Check if column exists
-            result = conn.execute(text("""
-                SELECT column_name FROM information_schema.columns 
-                WHERE table_name='extracted_fields' AND column_name='field_type'
-            """))
-            if not result.fetchone():
-                print("Adding field_type column...")
-                conn.execute(text("""
-                    ALTER TABLE extracted_fields 
-                    ADD COLUMN field_type VARCHAR(50) DEFAULT 'extracted' NOT NULL
-                """))
-                conn.commit()
-                print("✅ Added field_type column")
-    except Exception as e:
-        print(f"Migration note: {e}")
-        pass
+    # Schema changes are applied at deploy time (python migrate.py); startup only checks
+    if settings.AUTO_MIGRATE:
+        migrate(get_engine())
+    check_schema_version(get_engine())
 
     @app.teardown_appcontext
     def remove_session(exception=None):
@@ -69,6 +45,10 @@ def create_app() -> Flask:
 
     app.register_blueprint(api_bp, url_prefix="/api/v1")
 
+    # Background workers that drain the certificate processing queue
+    from app.services.jobs import start_worker_pool
+    start_worker_pool()
+
     return app
 
 # Create the WSGI application instance for gunicorn
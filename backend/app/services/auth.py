@@ -11,14 +11,14 @@ logger = logging.getLogger(__name__)
 JWT_SECRET = "your-secret-key-change-in-production"
 JWT_ALGORITHM = "HS256"
 
-def generate_token(user_id: int, user_type: str, username: str) -> str:
+def generate_token(user_id: int, user_type: str, username: str, expires_in: timedelta = timedelta(days=7)) -> str:
     """Generate JWT token for user authentication"""
     try:
         payload = {
             'user_id': user_id,
             'user_type': user_type,
             'username': username,
-            'exp': datetime.utcnow() + timedelta(days=7)  # Token expires in 7 days
+            'exp': datetime.utcnow() + expires_in  # Login tokens expire in 7 days
         }
         token = jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
         return token
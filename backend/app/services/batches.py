@@ -0,0 +1,253 @@
+"""
+Batch uploads: many certificates (multipart files and/or zip archives) in
+one request.
+
+Files are stored and deduplicated by content hash like single uploads, then
+all certificates, jobs and batch items are inserted together and handed to
+the background worker pool, which runs OCR and LLM extraction for several
+certificates at once (JOB_WORKERS threads, OCR_WORKERS page slots,
+LLM_MAX_CONCURRENCY chat completions). Progress is read back per item from
+the certificates' status.
+"""
+from pathlib import Path
+import logging
+import os
+import uuid
+import zipfile
+import zlib
+
+from sqlalchemy.exc import IntegrityError
+from werkzeug.utils import secure_filename
+
+from app.core.config import settings
+from app.core.constants import CertificateStatus
+from app.db.models import Certificate, UploadBatch, UploadBatchItem
+from app.services.images import save_and_process_file, is_allowed_file
+from app.services.jobs import enqueue_certificates
+
+logger = logging.getLogger(__name__)
+
+
+class BatchTooLarge(ValueError):
+    pass
+
+
+# Raised while reading a damaged or unsupported archive member
+ZIP_ENTRY_ERRORS = (zipfile.BadZipFile, zlib.error, EOFError, NotImplementedError)
+
+
+def _is_zip(filename: str) -> bool:
+    return filename.lower().endswith('.zip')
+
+
+def _stream_size(stream) -> int | None:
+    """Size of a seekable upload stream, leaving it at the start; None if unknown."""
+    try:
+        size = stream.seek(0, os.SEEK_END)
+        stream.seek(0)
+        return size
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def _too_large(size: int | None) -> str | None:
+    if size is not None and size > settings.MAX_FILE_SIZE:
+        return f"File exceeds {settings.MAX_FILE_SIZE} bytes"
+    return None
+
+
+def _is_batch_member(info: zipfile.ZipInfo) -> bool:
+    name = Path(info.filename).name
+    return not (info.is_dir() or not name or name.startswith('.') or info.filename.startswith('__MACOSX/'))
+
+
+def iter_batch_files(file_storages):
+    """
+    Yield (filename, open stream or None, error or None) for every file in
+    the request, expanding zip archives. Directory entries, hidden files and
+    macOS resource forks inside archives are skipped. Attached files and
+    archive members alike are rejected above MAX_FILE_SIZE. The file count is
+    checked against BATCH_MAX_FILES before anything is yielded.
+    """
+    sources = []  # (filename, stream, archive members or None, error or None)
+    archives = []
+    try:
+        for storage in file_storages:
+            if not storage or not storage.filename:
+                continue
+            if not _is_zip(storage.filename):
+                sources.append((storage.filename, storage.stream, None, None))
+                continue
+            try:
+                archive = zipfile.ZipFile(storage.stream)
+            except zipfile.BadZipFile:
+                sources.append((storage.filename, None, None, "Not a valid zip archive"))
+                continue
+            archives.append(archive)
+            sources.append((storage.filename, archive, [info for info in archive.infolist() if _is_batch_member(info)], None))
+
+        count = sum(1 if members is None else len(members) for _, _, members, error in sources if error is None)
+        if count > settings.BATCH_MAX_FILES:
+            raise BatchTooLarge(f"Batch exceeds {settings.BATCH_MAX_FILES} files")
+
+        for filename, source, members, error in sources:
+            if error is not None:
+                yield filename, None, error
+                continue
+            if members is None:
+                error = _too_large(_stream_size(source))
+                yield filename, None if error else source, error
+                continue
+            for info in members:
+                name = Path(info.filename).name
+                error = _too_large(info.file_size)
+                if error:
+                    yield name, None, error
+                    continue
+                try:
+                    stream = source.open(info)
+                except (*ZIP_ENTRY_ERRORS, RuntimeError) as e:  # RuntimeError: encrypted entry
+                    yield name, None, f"Unreadable zip entry: {str(e)}"
+                    continue
+                with stream:
+                    yield name, stream, None
+    finally:
+        for archive in archives:
+            archive.close()
+
+
+def _store_file(filename: str, stream) -> tuple[Path, str]:
+    upload_path = Path(settings.UPLOAD_DIR)
+    file_path = upload_path / f"{uuid.uuid4().hex[:12]}_{secure_filename(filename)}"
+    try:
+        processed_path, _, content_hash = save_and_process_file(stream, file_path)
+    except Exception:
+        file_path.unlink(missing_ok=True)
+        raise
+    return processed_path, content_hash
+
+
+def create_batch(session, file_storages, source: str | None = None) -> tuple[UploadBatch, list[UploadBatchItem], int]:
+    """
+    Store every file of a batch and queue the new ones for processing.
+    Returns (batch, items in submission order, number of jobs queued); the
+    caller commits and notifies the workers. If anything fails, the files
+    stored so far are removed again.
+    """
+    entries = []  # (filename, path, content_hash, error), in submission order
+    try:
+        for filename, stream, error in iter_batch_files(file_storages):
+            if error is None and not is_allowed_file(filename):
+                error = "Invalid file type. Allowed: PDF, JPG, JPEG, PNG, TIFF, BMP, WEBP"
+            if error is None:
+                try:
+                    path, content_hash = _store_file(filename, stream)
+                    entries.append((filename, path, content_hash, None))
+                    continue
+                except ValueError as e:
+                    error = str(e)
+                except ZIP_ENTRY_ERRORS as e:
+                    # The member's data is damaged (bad CRC, truncated deflate stream)
+                    error = f"Unreadable zip entry: {str(e)}"
+            entries.append((filename, None, None, error))
+
+        try:
+            return _insert_batch(session, entries, source)
+        except IntegrityError:
+            # A concurrent upload inserted one of our hashes first; retry once and match it
+            session.rollback()
+            return _insert_batch(session, entries, source)
+    except Exception:
+        # No rows will point at them
+        for _, path, _, _ in entries:
+            if path is not None:
+                path.unlink(missing_ok=True)
+        raise
+
+
+def _insert_batch(session, entries, source):
+    hashes = {content_hash for _, _, content_hash, error in entries if error is None}
+    existing = {}
+    if hashes:
+        existing = {
+            cert.content_hash: cert
+            for cert in session.query(Certificate).filter(Certificate.content_hash.in_(hashes))
+        }
+
+    batch = UploadBatch(id=uuid.uuid4().hex, source=source, total=len(entries))
+    session.add(batch)
+
+    new_certs, items = [], []
+    by_hash = dict(existing)
+    for filename, path, content_hash, error in entries:
+        if error is not None:
+            items.append((UploadBatchItem(batch_id=batch.id, filename=(secure_filename(filename) or filename)[:255],
+                                          error=error), None))
+            continue
+        cert = by_hash.get(content_hash)
+        cache_hit = cert is not None
+        if cache_hit:
+            path.unlink(missing_ok=True)
+        else:
+            cert = Certificate(
+                image_path=str(path),
+                status=CertificateStatus.PENDING,
+                user_id=None,
+                original_filename=secure_filename(filename),
+                content_hash=content_hash
+            )
+            by_hash[content_hash] = cert
+            new_certs.append(cert)
+        items.append((UploadBatchItem(batch_id=batch.id, filename=secure_filename(filename), cache_hit=cache_hit), cert))
+
+    # One multi-row INSERT for the certificates; ids are needed for jobs and items
+    session.add_all(new_certs)
+    session.flush()
+
+    # Earlier failed attempts of re-uploaded files get another run
+    to_queue = new_certs + [cert for cert in existing.values() if cert.status == CertificateStatus.FAILED]
+    jobs = enqueue_certificates(session, to_queue)
+
+    all_items = []
+    for item, cert in items:
+        if cert is not None:
+            item.certificate_id = cert.id
+        all_items.append(item)
+    session.add_all(all_items)
+    session.flush()
+    rejected = sum(1 for item in all_items if item.error)
+    logger.info(f"Batch {batch.id}: {len(all_items) - rejected} files stored, {len(new_certs)} new, {rejected} rejected")
+    return batch, all_items, len(jobs)
+
+
+def batch_progress(session, batch_id: str) -> dict | None:
+    """Per-item status of a batch plus counts by status, in one query."""
+    batch = session.get(UploadBatch, batch_id)
+    if batch is None:
+        return None
+    rows = session.query(UploadBatchItem, Certificate.status).outerjoin(
+        Certificate, UploadBatchItem.certificate_id == Certificate.id
+    ).filter(UploadBatchItem.batch_id == batch_id).order_by(UploadBatchItem.id).all()
+
+    counts = {}
+    items = []
+    for item, cert_status in rows:
+        status = 'rejected' if item.error else (cert_status or 'deleted')
+        counts[status] = counts.get(status, 0) + 1
+        items.append({
+            "filename": item.filename,
+            "id": item.certificate_id,
+            "status": status,
+            "cache_hit": item.cache_hit,
+            "error": item.error,
+        })
+    in_flight = counts.get(CertificateStatus.PENDING, 0) + counts.get(CertificateStatus.PROCESSING, 0)
+    return {
+        "batch_id": batch.id,
+        "source": batch.source,
+        "created_at": batch.created_at.isoformat(),
+        "total": batch.total,
+        "counts": counts,
+        "done": in_flight == 0,
+        "items": items,
+    }
@@ -0,0 +1,118 @@
+"""
+Circuit breaker for a remote dependency.
+
+closed     requests go through; consecutive failures are counted
+open       after failure_threshold consecutive failures requests are refused
+           immediately instead of each waiting out a connect/read timeout
+half_open  a background probe is checking whether the dependency is back;
+           requests are still refused until it succeeds
+
+While open, a daemon thread runs the probe every reset_timeout seconds and
+closes the circuit on the first success. State is per process.
+"""
+import logging
+import os
+import threading
+import time
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float, probe: Callable[[], bool]):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.probe = probe
+        self._lock = threading.Lock()
+        self._reset_state()
+        if hasattr(os, "register_at_fork"):
+            # The probe thread does not survive fork; children start closed
+            os.register_at_fork(after_in_child=self._reset_state)
+
+    def _reset_state(self) -> None:
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probe_thread: threading.Thread | None = None
+        self._stats = {"rejected": 0, "opened": 0, "probes": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.failure_threshold > 0
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def allow_request(self) -> bool:
+        if not self.enabled:
+            return True
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            self._stats["rejected"] += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._failures += 1
+            if self._state == CLOSED and self._failures >= self.failure_threshold:
+                self._open()
+
+    def _open(self) -> None:
+        # Caller holds the lock
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._stats["opened"] += 1
+        logger.warning(f"{self.name} circuit opened after {self._failures} consecutive failures")
+        if self._probe_thread is None or not self._probe_thread.is_alive():
+            self._probe_thread = threading.Thread(
+                target=self._probe_until_recovered, name=f"{self.name}-probe", daemon=True
+            )
+            self._probe_thread.start()
+
+    def _probe_until_recovered(self) -> None:
+        while True:
+            time.sleep(self.reset_timeout)
+            with self._lock:
+                self._state = HALF_OPEN
+                self._stats["probes"] += 1
+            try:
+                healthy = self.probe()
+            except Exception as e:
+                logger.debug(f"{self.name} probe failed: {str(e)}")
+                healthy = False
+            with self._lock:
+                if healthy:
+                    self._state = CLOSED
+                    self._failures = 0
+                    self._opened_at = None
+                    logger.info(f"{self.name} circuit closed, dependency recovered")
+                    return
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+
+    def stats(self) -> dict:
+        if not self.enabled:
+            return {"enabled": False}
+        with self._lock:
+            return {
+                "enabled": True,
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "failure_threshold": self.failure_threshold,
+                "open_for_seconds": round(time.monotonic() - self._opened_at, 1) if self._opened_at else None,
+                **self._stats,
+            }
@@ -1,20 +1,30 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
 from app.core.config import settings
-import openai
+from app.services.llm_cache import make_llm_cache_key, get_cached_response, store_response
 import json
 import logging
 import re
 import os
-import httpx
-import requests
+import threading
+
+# openai/httpx are imported on the first LLM call, keeping them out of
+# processes that only serve reads
+if TYPE_CHECKING:
+    import openai
 
 logger = logging.getLogger(__name__)
 
-# --- Shared Utilities ---
+# Process-wide OpenAI client, created lazily and rebuilt in forked children
+_openai_client: openai.OpenAI | None = None
+_openai_client_pid: int | None = None
+_openai_client_lock = threading.Lock()
 
-def _clear_proxy_env_vars():
-    """Clear proxy environment variables to avoid interference."""
-    for var in ['HTTP_PROXY', 'HTTPS_PROXY', 'http_proxy', 'https_proxy']:
-        os.environ.pop(var, None)
+# Caps concurrent chat completions so more job workers never exceed the provider's limit
+_llm_slots = threading.BoundedSemaphore(settings.LLM_MAX_CONCURRENCY)
+
+# --- Shared Utilities ---
 
 def _determine_base_url() -> str | None:
     """Determine API base URL (auto-detect OpenRouter via key prefix, or use OPENAI_BASE_URL)."""
@@ -38,18 +48,54 @@ def _model_id() -> str:
     return or_model if _using_openrouter() else default_model
 
 def _init_openai_client() -> openai.OpenAI:
-    """Initialize OpenAI/OpenRouter client with consistent configuration."""
+    """
+    Return the shared OpenAI/OpenRouter client, creating it on first use.
+    The underlying httpx.Client keeps a keep-alive connection pool and is
+    thread-safe, so every gunicorn/worker thread reuses the same sockets.
+    A client inherited across fork() is discarded and rebuilt in the child.
+    """
+    global _openai_client, _openai_client_pid
     if not settings.OPENAI_API_KEY:
         raise ValueError(
             "OpenAI API key is required. Please configure OPENAI_API_KEY environment variable."
         )
-    _clear_proxy_env_vars()
-    base_url = _determine_base_url()
-    return openai.OpenAI(
-        api_key=settings.OPENAI_API_KEY,
-        base_url=base_url,
-        http_client=httpx.Client()
-    )
+    pid = os.getpid()
+    client = _openai_client
+    if client is not None and _openai_client_pid == pid:
+        return client
+
+    with _openai_client_lock:
+        if _openai_client is None or _openai_client_pid != pid:
+            import httpx
+            import openai
+            http_client = httpx.Client(
+                # Ignore HTTP(S)_PROXY env vars, which interfered with API calls
+                trust_env=False,
+                limits=httpx.Limits(
+                    max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.OPENAI_MAX_CONNECTIONS,
+                    keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY,
+                ),
+                timeout=httpx.Timeout(settings.OPENAI_TIMEOUT, connect=settings.OPENAI_CONNECT_TIMEOUT),
+            )
+            _openai_client = openai.OpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                base_url=_determine_base_url(),
+                http_client=http_client,
+                max_retries=settings.OPENAI_MAX_RETRIES
+            )
+            _openai_client_pid = pid
+            logger.info("OpenAI client initialized")
+        return _openai_client
+
+def _reset_openai_client_after_fork():
+    # The parent's pooled sockets must not be shared with the child
+    global _openai_client, _openai_client_pid
+    _openai_client = None
+    _openai_client_pid = None
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_openai_client_after_fork)
 
 def _clean_json_response(response_text: str) -> dict:
     """Clean and parse JSON response from OpenAI, handling markdown fences."""
@@ -80,21 +126,10 @@ def _validate_extracted_fields(result: dict) -> dict:
 
 # --- AI Extraction ---
 
-def extract_fields_with_ai(ocr_text: str) -> dict:
-    """
-    AI-powered field extraction using OpenAI API.
-    Returns structured tabular data for certificate information.
-    STRICTLY REQUIRES OpenAI API key - no fallback to pattern matching.
-    """
-    try:
-        client = _init_openai_client()
+# Part of the LLM cache key; bump whenever the extraction prompt or its parsing changes
+EXTRACTION_PROMPT_VERSION = "1"
 
-        prompt = f"""
-You are an AI assistant specialized in extracting structured information from university/college certificates, academic transcripts, and examination results.
-
-Analyze the following text and return ONLY a JSON object with these fields:
-
-{{
+_EXTRACTION_FIELDS = """{{
     "student_name": "...",
     "enrollment_number": "...",
     "degree": "...",
@@ -110,37 +145,73 @@ Analyze the following text and return ONLY a JSON object with these fields:
     "cgpa": "numerical value",
     "subjects": [{{"subject_code": "...", "subject_name": "...", "grade": "...", "credits": "..."}}],
     "total_credits": "...",
-    "earned_credits": "..."
-}}
+    "earned_credits": "..."{summary_field}
+}}"""
 
-CRITICAL RULES:
+_EXTRACTION_RULES = """CRITICAL RULES:
 1. Return ONLY valid JSON — no extra text.
 2. Missing fields → set to null.
 3. Clean and format all text.
 4. Extract embedded patterns (e.g., "Enrollment No : 231B225").
 5. Prioritize numerical grades (6.1, 8.5).
 6. Extract subjects as array of objects with code, name, grade, credits.
-7. Format dates strictly as DD/MM/YYYY.
+7. Format dates strictly as DD/MM/YYYY."""
+
+_COMBINED_SUMMARY_RULES = """
+8. "summary" is a SINGLE LINE (max 200 chars), professional tone, no markdown,
+   suitable for table display. Order: Name → Degree/Branch → University → Performance (CGPA/SGPA).
+   Include the enrollment number and key dates (DD/MM/YYYY) if available.
+   Example: "Prashant Singh - B.Tech CSE from Jaypee University (CGPA: 6.1)"
+"""
+
+
+def _build_extraction_prompt(ocr_text: str, include_summary: bool = False) -> str:
+    fields = _EXTRACTION_FIELDS.format(
+        summary_field=',\n    "summary": "one-line certificate summary"' if include_summary else ""
+    )
+    rules = (_EXTRACTION_RULES + (_COMBINED_SUMMARY_RULES if include_summary else "")).rstrip()
+    return f"""
+You are an AI assistant specialized in extracting structured information from university/college certificates, academic transcripts, and examination results.
+
+Analyze the following text and return ONLY a JSON object with these fields:
+
+{fields}
+
+{rules}
 
 Text to analyze:
 {ocr_text}
-        """.strip()
+    """.strip()
 
-        response = client.chat.completions.create(
-            model=_model_id(),
-            messages=[{"role": "user", "content": prompt}],
-            response_format={"type": "json_object"},
-            temperature=0.1,
-            max_tokens=1500
-        )
 
-        raw_response = response.choices[0].message.content
-        parsed = _clean_json_response(raw_response)
-        validated_result = _validate_extracted_fields(parsed)
+def _request_extraction(ocr_text: str, include_summary: bool, max_tokens: int) -> dict:
+    """
+    Run the extraction prompt and return the parsed (unvalidated) JSON object.
+    Responses are cached by normalized OCR text, model and prompt version.
+    """
+    model = _model_id()
+    prompt_version = EXTRACTION_PROMPT_VERSION + ("+summary" if include_summary else "")
+    cache_key = make_llm_cache_key(ocr_text, model, prompt_version)
+    cached = get_cached_response(cache_key)
+    if cached is not None:
+        logger.info("AI extraction served from LLM cache")
+        return cached
+
+    raw_response = None
+    try:
+        client = _init_openai_client()
 
-        logger.info(f"AI extraction completed successfully - extracted {sum(1 for v in validated_result.values() if v)} fields")
-        return validated_result
+        with _llm_slots:
+            response = client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": _build_extraction_prompt(ocr_text, include_summary)}],
+                response_format={"type": "json_object"},
+                temperature=0.1,
+                max_tokens=max_tokens
+            )
 
+        raw_response = response.choices[0].message.content
+        parsed = _clean_json_response(raw_response)
     except json.JSONDecodeError as e:
         logger.error(f"Failed to parse AI response as JSON: {str(e)}\nRaw: {raw_response}")
         raise ValueError(f"AI response was not valid JSON: {str(e)}")
@@ -148,6 +219,44 @@ Text to analyze:
         logger.error(f"OpenAI extraction failed: {str(e)}")
         raise RuntimeError(f"AI-powered extraction failed: {str(e)}")
 
+    store_response(cache_key, model, prompt_version, parsed)
+    return parsed
+
+
+def extract_fields_with_ai(ocr_text: str) -> dict:
+    """
+    AI-powered field extraction using OpenAI API.
+    Returns structured tabular data for certificate information.
+    STRICTLY REQUIRES OpenAI API key - no fallback to pattern matching.
+    """
+    parsed = _request_extraction(ocr_text, include_summary=False, max_tokens=1500)
+    validated_result = _validate_extracted_fields(parsed)
+
+    logger.info(f"AI extraction completed successfully - extracted {sum(1 for v in validated_result.values() if v)} fields")
+    return validated_result
+
+
+def extract_and_summarize(ocr_text: str) -> tuple[dict, str]:
+    """
+    Return (extracted_fields, summary) for a certificate's OCR text.
+    With AI_COMBINED_EXTRACTION enabled both come back from a single chat
+    completion; otherwise this is extract_fields_with_ai followed by
+    generate_ai_summary. The return values are identical in either mode.
+    """
+    if not settings.AI_COMBINED_EXTRACTION:
+        extracted_fields = extract_fields_with_ai(ocr_text)
+        return extracted_fields, generate_ai_summary(extracted_fields)
+
+    parsed = _request_extraction(ocr_text, include_summary=True, max_tokens=1700)
+    summary = parsed.pop("summary", None)
+    extracted_fields = _validate_extracted_fields(parsed)
+    logger.info(f"AI extraction completed successfully - extracted {sum(1 for v in extracted_fields.values() if v)} fields")
+
+    if not isinstance(summary, str) or not summary.strip():
+        logger.warning("Combined extraction returned no summary - requesting it separately")
+        return extracted_fields, generate_ai_summary(extracted_fields)
+    return extracted_fields, summary.strip()
+
 # --- AI Summary Generation ---
 
 def generate_ai_summary(extracted_fields: dict) -> str:
@@ -195,12 +304,13 @@ Examples:
 Return ONLY the summary text.
         """.strip()
 
-        response = client.chat.completions.create(
-            model=_model_id(),
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.1,
-            max_tokens=200
-        )
+        with _llm_slots:
+            response = client.chat.completions.create(
+                model=_model_id(),
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.1,
+                max_tokens=200
+            )
 
         summary = response.choices[0].message.content.strip()
         logger.info("AI summary generated successfully")
@@ -311,120 +421,3 @@ def generate_summary_fallback(extracted_fields: dict) -> str:
     except Exception as e:
         logger.error(f"Fallback summary generation failed: {str(e)}")
         return "Certificate processed successfully"
-
-# --- University Database Verification ---
-
-def verify_certificate_with_university(extracted_data: dict) -> dict:
-    """
-    Verify extracted certificate data against the university database.
-    
-    Args:
-        extracted_data: Dictionary containing extracted certificate fields
-        
-    Returns:
-        Dictionary containing verification results
-    """
-    try:
-        # University portal URL (from environment or fallback to localhost)
-        university_base_url = os.getenv('UNIVERSITY_PORTAL_URL', 'http://localhost:3000')
-        university_api_url = f"{university_base_url}/api/verify"
-        
-        # Extract key fields for verification
-        student_name = extracted_data.get('student_name', '').strip()
-        enrollment_number = extracted_data.get('enrollment_number', '').strip()
-        
-        if not student_name or not enrollment_number:
-            return {
-                'student_verified': False,
-                'confidence_score': 0.0,
-                'message': 'Insufficient data for university verification',
-                'matched_student': None,
-                'verification_attempted': False
-            }
-        
-        # Prepare verification request
-        verification_data = {
-            'student_name': student_name,
-            'enrollment_number': enrollment_number
-        }
-        
-        logger.info(f"Verifying certificate for: {student_name} (Enrollment: {enrollment_number})")
-        
-        # Send verification request to university portal
-        response = requests.post(
-            university_api_url,
-            json=verification_data,
-            headers={'Content-Type': 'application/json'},
-            timeout=10
-        )
-        
-        if response.status_code == 200:
-            university_response = response.json()
-            
-            if university_response.get('success'):
-                if university_response.get('verified'):
-                    logger.info(f"Certificate verified successfully for {student_name}")
-                    return {
-                        'student_verified': True,
-                        'confidence_score': university_response.get('confidence_score', 1.0),
-                        'message': 'Certificate verified against university database',
-                        'matched_student': university_response.get('matched_certificate'),
-                        'verification_attempted': True,
-                        'verification_timestamp': university_response.get('verification_timestamp')
-                    }
-                else:
-                    logger.info(f"Certificate not found in university database for {student_name}")
-                    return {
-                        'student_verified': False,
-                        'confidence_score': 0.0,
-                        'message': university_response.get('message', 'Certificate not found in university database'),
-                        'matched_student': None,
-                        'verification_attempted': True,
-                        'searched_for': university_response.get('searched_for')
-                    }
-            else:
-                logger.error(f"University API returned error: {university_response.get('error')}")
-                return {
-                    'student_verified': False,
-                    'confidence_score': 0.0,
-                    'message': f"University verification failed: {university_response.get('error')}",
-                    'matched_student': None,
-                    'verification_attempted': False
-                }
-        else:
-            logger.error(f"University API request failed with status {response.status_code}")
-            return {
-                'student_verified': False,
-                'confidence_score': 0.0,
-                'message': f"Unable to connect to university database (HTTP {response.status_code})",
-                'matched_student': None,
-                'verification_attempted': False
-            }
-            
-    except requests.exceptions.ConnectionError:
-        logger.warning("University portal is not accessible - verification skipped")
-        return {
-            'student_verified': False,
-            'confidence_score': 0.0,
-            'message': 'University database is currently unavailable',
-            'matched_student': None,
-            'verification_attempted': False
-        }
-    except requests.exceptions.Timeout:
-        logger.error("University verification request timed out")
-        return {
-            'student_verified': False,
-            'confidence_score': 0.0,
-            'message': 'University database verification timed out',
-            'matched_student': None,
-            'verification_attempted': False
-        }
-    except Exception as e:
-        logger.error(f"University verification failed with error: {str(e)}")
-        return {
-            'student_verified': False,
-            'confidence_score': 0.0,
-            'message': f'University verification error: {str(e)}',
-            'matched_student': None,
-            'verification_attempted': False
-        }
@@ -1,5 +1,5 @@
 from pathlib import Path
-from PIL import Image
+import hashlib
 import logging
 
 from app.core.config import settings
@@ -7,19 +7,28 @@ from app.core.config import settings
 logger = logging.getLogger(__name__)
 
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'pdf', 'tiff', 'bmp', 'webp'}
+HASH_CHUNK_SIZE = 64 * 1024
 
 def is_allowed_file(filename: str) -> bool:
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def save_and_process_file(stream, dest: Path) -> tuple[Path, str]:
+def save_and_process_file(stream, dest: Path) -> tuple[Path, str, str]:
     """
     Save and process uploaded file for AI processing.
-    Simplified version for AI-focused certificate verifier.
+    Returns (path, file_type, sha256) where the hash covers the uploaded
+    bytes as received, before any image conversion.
     """
     dest.parent.mkdir(parents=True, exist_ok=True)
     
+    hasher = hashlib.sha256()
     with open(dest, 'wb') as f:
-        f.write(stream.read())
+        while True:
+            chunk = stream.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            hasher.update(chunk)
+            f.write(chunk)
+    content_hash = hasher.hexdigest()
     
     file_ext = dest.suffix.lower()
     
@@ -27,9 +36,10 @@ def save_and_process_file(stream, dest: Path) -> tuple[Path, str]:
         if file_ext == '.pdf':
             # For this AI project, we'll treat PDFs as valid but process them as generic files
             logger.info(f"PDF file saved: {dest}")
-            return dest, 'pdf'
+            return dest, 'pdf', content_hash
         else:
-            # Validate image files using Pillow
+            # Validate image files using Pillow (imported here: only uploads need it)
+            from PIL import Image
             img = Image.open(dest)
             img.verify()
             
@@ -43,7 +53,7 @@ def save_and_process_file(stream, dest: Path) -> tuple[Path, str]:
                 img.save(dest, 'PNG', optimize=True)
                 logger.info(f"Image converted to RGB: {dest}")
             
-            return dest, 'image'
+            return dest, 'image', content_hash
             
     except Exception as e:
         dest.unlink(missing_ok=True)
@@ -0,0 +1,280 @@
+"""
+Database-backed processing queue for certificate uploads.
+
+Jobs live in the `processing_jobs` table, so no external broker is needed:
+any process sharing the database (gunicorn workers, a dedicated worker
+process) can claim pending jobs. Claims are a conditional UPDATE on the job
+status, which is atomic on both SQLite and PostgreSQL.
+
+While a job runs its worker bumps updated_at every JOB_STALE_AFTER / 4
+seconds; a 'processing' job without a heartbeat for JOB_STALE_AFTER belongs
+to a dead worker and is claimed again. The outcome is only recorded by the
+worker that still owns the claim.
+"""
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import logging
+import os
+import socket
+import threading
+
+from sqlalchemy import and_, or_, update
+
+from app.core.config import settings
+from app.core.constants import CertificateStatus
+from app.db.models import Certificate, ProcessingJob
+from app.db.session import get_db_session
+from app.services.pipeline import process_certificate
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_certificate(session, cert: Certificate) -> ProcessingJob:
+    """Create a pending job for a certificate. The caller commits."""
+    cert.status = CertificateStatus.PENDING
+    job = ProcessingJob(certificate_id=cert.id, status=CertificateStatus.PENDING)
+    session.add(job)
+    session.flush()
+    return job
+
+
+def enqueue_certificates(session, certs: list[Certificate]) -> list[ProcessingJob]:
+    """Create pending jobs for many certificates with one batched INSERT. The caller commits."""
+    jobs = []
+    for cert in certs:
+        cert.status = CertificateStatus.PENDING
+        jobs.append(ProcessingJob(certificate_id=cert.id, status=CertificateStatus.PENDING))
+    session.add_all(jobs)
+    session.flush()
+    return jobs
+
+
+def get_latest_job(session, cert_id: int) -> ProcessingJob | None:
+    return session.query(ProcessingJob).filter(
+        ProcessingJob.certificate_id == cert_id
+    ).order_by(ProcessingJob.id.desc()).first()
+
+
+def _is_stale(stale_cutoff: datetime):
+    return and_(
+        ProcessingJob.status == CertificateStatus.PROCESSING,
+        ProcessingJob.updated_at < stale_cutoff,
+    )
+
+
+def fail_exhausted_jobs(session, stale_cutoff: datetime) -> int:
+    """
+    Mark stale jobs that used up JOB_MAX_ATTEMPTS, and their certificates, as
+    failed; nothing would ever claim them again. The caller commits. Returns
+    the number of jobs failed.
+    """
+    exhausted = session.query(ProcessingJob.id, ProcessingJob.certificate_id).filter(
+        _is_stale(stale_cutoff),
+        ProcessingJob.attempts >= settings.JOB_MAX_ATTEMPTS,
+    ).all()
+    if not exhausted:
+        return 0
+    job_ids = [job_id for job_id, _ in exhausted]
+    result = session.execute(
+        update(ProcessingJob)
+        .where(ProcessingJob.id.in_(job_ids), _is_stale(stale_cutoff))
+        .values(
+            status=CertificateStatus.FAILED,
+            error=f"Worker stopped responding; gave up after {settings.JOB_MAX_ATTEMPTS} attempts",
+            finished_at=datetime.utcnow(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        return 0  # Another worker got there first
+    session.execute(
+        update(Certificate)
+        .where(
+            Certificate.id.in_([cert_id for _, cert_id in exhausted]),
+            Certificate.status == CertificateStatus.PROCESSING,
+        )
+        .values(status=CertificateStatus.FAILED)
+        .execution_options(synchronize_session=False)
+    )
+    logger.warning(f"Failed {result.rowcount} stale jobs that exhausted their attempts: {job_ids}")
+    return result.rowcount
+
+
+def claim_next_job(worker_id: str) -> int | None:
+    """
+    Atomically claim the oldest runnable job and return its id.
+    Jobs whose heartbeat stopped for JOB_STALE_AFTER (crashed worker)
+    are claimable again until they exceed JOB_MAX_ATTEMPTS; after that they
+    are marked failed.
+    """
+    stale_cutoff = datetime.utcnow() - timedelta(seconds=settings.JOB_STALE_AFTER)
+    runnable = or_(
+        ProcessingJob.status == CertificateStatus.PENDING,
+        _is_stale(stale_cutoff),
+    )
+
+    with get_db_session() as session:
+        if fail_exhausted_jobs(session, stale_cutoff):
+            session.commit()
+        candidates = session.query(ProcessingJob.id).filter(
+            runnable,
+            ProcessingJob.attempts < settings.JOB_MAX_ATTEMPTS,
+        ).order_by(ProcessingJob.created_at, ProcessingJob.id).limit(5).all()
+
+        for (job_id,) in candidates:
+            result = session.execute(
+                update(ProcessingJob)
+                .where(ProcessingJob.id == job_id, runnable)
+                .values(
+                    status=CertificateStatus.PROCESSING,
+                    worker_id=worker_id,
+                    started_at=datetime.utcnow(),
+                    updated_at=datetime.utcnow(),
+                    attempts=ProcessingJob.attempts + 1,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount == 1:
+                session.commit()
+                return job_id
+    return None
+
+
+@contextmanager
+def _heartbeat(job_id: int, worker_id: str):
+    """Keep a claimed job's updated_at fresh while the body runs."""
+    stop = threading.Event()
+    interval = max(settings.JOB_STALE_AFTER / 4, 1)
+
+    def beat():
+        while not stop.wait(interval):
+            try:
+                with get_db_session() as session:
+                    session.execute(
+                        update(ProcessingJob)
+                        .where(ProcessingJob.id == job_id, ProcessingJob.worker_id == worker_id)
+                        .values(updated_at=datetime.utcnow())
+                        .execution_options(synchronize_session=False)
+                    )
+            except Exception as e:
+                logger.warning(f"Heartbeat for job {job_id} failed: {str(e)}")
+
+    thread = threading.Thread(target=beat, name=f"job-{job_id}-heartbeat", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def _finish_job(session, job_id: int, worker_id: str, status: str, error: str | None = None) -> bool:
+    """Record a job's outcome, unless another worker has reclaimed it meanwhile."""
+    now = datetime.utcnow()
+    result = session.execute(
+        update(ProcessingJob)
+        .where(
+            ProcessingJob.id == job_id,
+            ProcessingJob.worker_id == worker_id,
+            ProcessingJob.status == CertificateStatus.PROCESSING,
+        )
+        .values(status=status, error=error, finished_at=now, updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+def run_job(job_id: int, worker_id: str) -> None:
+    """Execute a job claimed by worker_id and record its outcome."""
+    try:
+        with _heartbeat(job_id, worker_id), get_db_session() as session:
+            job = session.get(ProcessingJob, job_id)
+            cert = job.certificate
+            cert.status = CertificateStatus.PROCESSING
+            session.commit()
+
+            process_certificate(session, cert)
+
+            if not _finish_job(session, job_id, worker_id, CertificateStatus.COMPLETED):
+                session.rollback()
+                logger.warning(f"Job {job_id} was reclaimed by another worker; discarding this result")
+                return
+            cert.status = CertificateStatus.COMPLETED
+        logger.info(f"Job {job_id} completed")
+    except Exception as e:
+        logger.error(f"Job {job_id} failed: {str(e)}")
+        with get_db_session() as session:
+            if _finish_job(session, job_id, worker_id, CertificateStatus.FAILED, str(e)):
+                session.get(ProcessingJob, job_id).certificate.status = CertificateStatus.FAILED
+
+
+class JobWorkerPool:
+    """Fixed set of daemon threads that drain the processing queue."""
+
+    def __init__(self, size: int, poll_interval: float):
+        self.size = size
+        self.poll_interval = poll_interval
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def start(self) -> None:
+        for i in range(self.size):
+            worker_id = f"{socket.gethostname()}:{os.getpid()}:{i}"
+            t = threading.Thread(target=self._loop, args=(worker_id,), name=f"job-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        logger.info(f"Started {self.size} certificate processing workers")
+
+    def notify(self) -> None:
+        """Wake idle workers immediately instead of waiting for the next poll."""
+        self._wakeup.set()
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop.set()
+        self._wakeup.set()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    def _loop(self, worker_id: str) -> None:
+        while not self._stop.is_set():
+            try:
+                job_id = claim_next_job(worker_id)
+            except Exception as e:
+                logger.error(f"Failed to poll job queue: {str(e)}")
+                job_id = None
+
+            if job_id is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+
+            try:
+                run_job(job_id, worker_id)
+            except Exception:
+                # e.g. the database went away while recording the failure; the
+                # job is retried once it goes stale, this thread keeps polling
+                logger.exception(f"Worker {worker_id} could not finish job {job_id}")
+
+
+_pool: JobWorkerPool | None = None
+_pool_lock = threading.Lock()
+
+
+def start_worker_pool(size: int | None = None) -> JobWorkerPool | None:
+    """Start the process-wide worker pool once; later calls return the same pool."""
+    global _pool
+    size = settings.JOB_WORKERS if size is None else size
+    if size <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = JobWorkerPool(size, settings.JOB_POLL_INTERVAL)
+            _pool.start()
+    return _pool
+
+
+def notify_workers() -> None:
+    if _pool is not None:
+        _pool.notify()
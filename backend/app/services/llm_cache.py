@@ -0,0 +1,132 @@
+"""
+Database-backed cache of LLM extraction responses.
+
+Keys are a hash of the prompt version, model id and the OCR text with
+whitespace normalized, so re-scans that differ only in spacing or line
+breaks reuse the earlier response without a network call. Entries expire
+after LLM_CACHE_TTL_DAYS and the least recently used ones are pruned once
+the table holds more than LLM_CACHE_MAX_ENTRIES rows.
+"""
+from datetime import datetime, timedelta
+import hashlib
+import json
+import logging
+import re
+import threading
+
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.db.models import LLMCacheEntry
+from app.db.session import get_db_session, get_engine
+
+logger = logging.getLogger(__name__)
+
+# Prune expired/excess rows every N writes per process
+PRUNE_EVERY = 50
+
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+
+def normalize_ocr_text(text: str) -> str:
+    """
+    Collapse runs of whitespace. Unlike the name matching in the pipeline,
+    case and punctuation are kept: '6.1' and '61' must not share an entry.
+    """
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+def make_llm_cache_key(ocr_text: str, model: str, prompt_version: str) -> str:
+    payload = f"{prompt_version}|{model}|{normalize_ocr_text(ocr_text)}"
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _enabled() -> bool:
+    # Scripts that call the extractor without a database simply skip the cache
+    return settings.LLM_CACHE_ENABLED and get_engine() is not None
+
+
+def _bump(stat: str, n: int = 1) -> None:
+    with _stats_lock:
+        _stats[stat] += n
+
+
+def get_cached_response(cache_key: str) -> dict | None:
+    if not _enabled():
+        return None
+    try:
+        with get_db_session() as session:
+            entry = session.get(LLMCacheEntry, cache_key)
+            if entry is None:
+                _bump("misses")
+                return None
+            if entry.created_at < datetime.utcnow() - timedelta(days=settings.LLM_CACHE_TTL_DAYS):
+                session.delete(entry)
+                _bump("misses")
+                _bump("evictions")
+                return None
+            entry.hit_count += 1
+            entry.last_used_at = datetime.utcnow()
+            response = json.loads(entry.response)
+        _bump("hits")
+        return response
+    except Exception as e:
+        logger.warning(f"LLM cache lookup failed: {str(e)}")
+        return None
+
+
+def store_response(cache_key: str, model: str, prompt_version: str, response: dict) -> None:
+    if not _enabled():
+        return
+    try:
+        with get_db_session() as session:
+            session.add(LLMCacheEntry(
+                cache_key=cache_key,
+                model=model,
+                prompt_version=prompt_version,
+                response=json.dumps(response)
+            ))
+        with _stats_lock:
+            _stats["writes"] += 1
+            prune = _stats["writes"] % PRUNE_EVERY == 0
+        if prune:
+            prune_cache()
+    except IntegrityError:
+        pass  # Another worker stored the same response first
+    except Exception as e:
+        logger.warning(f"LLM cache write failed: {str(e)}")
+
+
+def prune_cache() -> int:
+    """Delete expired entries, then the least recently used beyond the size cap."""
+    cutoff = datetime.utcnow() - timedelta(days=settings.LLM_CACHE_TTL_DAYS)
+    with get_db_session() as session:
+        removed = session.query(LLMCacheEntry).filter(
+            LLMCacheEntry.created_at < cutoff
+        ).delete(synchronize_session=False)
+
+        excess = session.query(LLMCacheEntry).count() - settings.LLM_CACHE_MAX_ENTRIES
+        if excess > 0:
+            oldest = session.query(LLMCacheEntry.cache_key).order_by(
+                LLMCacheEntry.last_used_at
+            ).limit(excess).subquery()
+            removed += session.query(LLMCacheEntry).filter(
+                LLMCacheEntry.cache_key.in_(oldest.select())
+            ).delete(synchronize_session=False)
+    if removed:
+        _bump("evictions", removed)
+        logger.info(f"Pruned {removed} LLM cache entries")
+    return removed
+
+
+def llm_cache_stats() -> dict:
+    if not settings.LLM_CACHE_ENABLED:
+        return {"enabled": False}
+    with _stats_lock:
+        lookups = _stats["hits"] + _stats["misses"]
+        return {
+            "enabled": True,
+            **_stats,
+            "hit_rate": round(_stats["hits"] / lookups, 3) if lookups else 0.0,
+        }
@@ -1,24 +1,126 @@
+from __future__ import annotations
+
 from pathlib import Path
-from PIL import Image
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
 import logging
-from io import BytesIO
-import pytesseract
+import os
+import threading
+
+from app.core.config import settings
+from app.services.ocr_cache import get_ocr_cache, make_cache_key, file_sha256
+
+# Pillow, pytesseract and PyMuPDF are imported on first OCR, so processes that
+# only serve reads (see benchmark_startup.py) never load them
+if TYPE_CHECKING:
+    from PIL import Image
 
 logger = logging.getLogger(__name__)
 
+# Every transform _ocr_image applies, in order; part of the OCR cache key
+OCR_PREPROCESSING = ("grayscale",)
+
+_page_pool: ThreadPoolExecutor | None = None
+_page_slots: threading.BoundedSemaphore | None = None
+_page_pool_lock = threading.Lock()
+
 def _ocr_image(img: Image.Image) -> str:
+    import pytesseract
     try:
         # Basic preprocessing: convert to grayscale
         if img.mode != 'L':
             img = img.convert('L')
-        text = pytesseract.image_to_string(img)
+        text = pytesseract.image_to_string(img, lang=settings.OCR_LANG)
         return text
     except Exception as e:
         logger.error(f"pytesseract OCR failed: {str(e)}")
         raise
 
 
-def run_ocr(file_path: Path) -> str:
+def _get_page_pool() -> tuple[ThreadPoolExecutor, threading.BoundedSemaphore]:
+    """
+    Shared pool for page OCR. Tesseract runs as a subprocess, so threads give
+    real multi-core parallelism. The semaphore caps how many rendered pages
+    are held in memory across all concurrent run_ocr calls.
+    """
+    global _page_pool, _page_slots
+    with _page_pool_lock:
+        if _page_pool is None:
+            # N tesseract processes each spawning OpenMP threads would oversubscribe the cores
+            os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+            _page_pool = ThreadPoolExecutor(max_workers=settings.OCR_WORKERS, thread_name_prefix="ocr-page")
+            _page_slots = threading.BoundedSemaphore(settings.OCR_WORKERS)
+    return _page_pool, _page_slots
+
+
+def _ocr_page_and_release(img: Image.Image, slots: threading.BoundedSemaphore) -> str:
+    try:
+        return _ocr_image(img)
+    finally:
+        img.close()
+        slots.release()
+
+
+def _ocr_pdf_pages(doc) -> list[str]:
+    """
+    Rasterize PDF pages and OCR them in parallel, returning text in page order.
+    Rendering stays on the calling thread because PyMuPDF is not thread-safe.
+    """
+    from PIL import Image
+    pool, slots = _get_page_pool()
+    futures = []
+    try:
+        for page in doc:
+            slots.acquire()
+            try:
+                pix = page.get_pixmap(dpi=settings.OCR_DPI, alpha=False)
+                mode = "RGB" if pix.n >= 3 else "L"
+                img = Image.frombytes(mode, (pix.width, pix.height), pix.samples)
+                del pix
+                futures.append(pool.submit(_ocr_page_and_release, img, slots))
+            except Exception:
+                slots.release()
+                raise
+        return [f.result() for f in futures]
+    finally:
+        # On failure, drop queued pages; cancelled tasks never run, so free their slots here
+        for f in futures:
+            if f.cancel():
+                slots.release()
+
+
+def run_ocr(file_path: Path, content_hash: str | None = None) -> str:
+    """
+    Extract text from uploaded files, serving repeats from the OCR cache.
+    content_hash (SHA-256 of the file) saves re-hashing when the caller has it.
+    """
+    cache = get_ocr_cache()
+    key = None
+    if cache is not None and file_path.exists():
+        try:
+            key = make_cache_key(
+                content_hash or file_sha256(file_path),
+                settings.OCR_DPI, settings.OCR_LANG, OCR_PREPROCESSING
+            )
+            cached = cache.get(key)
+            if cached is not None:
+                logger.info(f"OCR cache hit for {file_path.name}")
+                return cached
+        except OSError as e:
+            logger.warning(f"OCR cache lookup failed: {str(e)}")
+            key = None
+
+    text = _extract_text(file_path)
+
+    if key is not None:
+        try:
+            cache.put(key, text)
+        except OSError as e:
+            logger.warning(f"OCR cache write failed: {str(e)}")
+    return text
+
+
+def _extract_text(file_path: Path) -> str:
     """
     Extract text from uploaded files using Tesseract OCR.
     - For images: run OCR directly
@@ -46,10 +148,7 @@ def run_ocr(file_path: Path) -> str:
                 text = "\n".join(text_parts)
                 # Fallback to image rendering + OCR if no embedded text
                 if not text.strip():
-                    for page in doc:
-                        pix = page.get_pixmap(dpi=300)
-                        img = Image.open(BytesIO(pix.tobytes('png')))
-                        text_parts.append(_ocr_image(img))
+                    text_parts.extend(_ocr_pdf_pages(doc))
                     text = "\n".join(text_parts)
                 if not text.strip():
                     raise RuntimeError("No text found in PDF")
@@ -61,6 +160,7 @@ def run_ocr(file_path: Path) -> str:
                 raise
         else:
             # Image OCR path
+            from PIL import Image
             try:
                 img = Image.open(file_path)
                 width, height = img.size
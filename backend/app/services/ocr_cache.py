@@ -0,0 +1,144 @@
+"""
+On-disk cache for OCR output.
+
+Entries are keyed by the SHA-256 of the file contents plus every parameter
+that changes Tesseract's output (render DPI, language, preprocessing chain),
+so a settings change never serves stale text. Each entry is one small text
+file; its mtime is bumped on every hit and the least recently used files are
+evicted once the directory exceeds the configured size cap. Writes go through
+a temp file + os.replace so concurrent workers never see partial entries.
+"""
+from pathlib import Path
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Bump when the stored format or OCR pipeline changes in a way the key can't see
+CACHE_FORMAT_VERSION = 1
+
+
+def file_sha256(path: Path, chunk_size: int = 64 * 1024) -> str:
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def make_cache_key(content_hash: str, dpi: int, lang: str, preprocessing: tuple[str, ...]) -> str:
+    params = f"v{CACHE_FORMAT_VERSION}|dpi={dpi}|lang={lang}|pre={','.join(preprocessing)}"
+    return hashlib.sha256(f"{content_hash}|{params}".encode('utf-8')).hexdigest()
+
+
+class OCRCache:
+    """Size-capped LRU cache of OCR text stored as files in a directory."""
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = sum(p.stat().st_size for p in self.directory.glob('*.txt'))
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.txt"
+
+    def get(self, key: str) -> str | None:
+        path = self._path(key)
+        try:
+            text = path.read_text(encoding='utf-8')
+            os.utime(path)  # mark as recently used
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return text
+
+    def put(self, key: str, text: str) -> None:
+        data = text.encode('utf-8')
+        path = self._path(key)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except Exception:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        with self._lock:
+            self.writes += 1
+            self._size += len(data)
+            over_cap = self._size > self.max_bytes
+        if over_cap:
+            self._evict()
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until the directory is under 90% of the cap."""
+        with self._lock:
+            entries = []
+            for p in self.directory.glob('*.txt'):
+                try:
+                    st = p.stat()
+                except FileNotFoundError:
+                    continue  # removed by another process
+                entries.append((st.st_mtime, st.st_size, p))
+            entries.sort()
+            total = sum(size for _, size, _ in entries)
+            target = int(self.max_bytes * 0.9)
+            for _, size, p in entries:
+                if total <= target:
+                    break
+                p.unlink(missing_ok=True)
+                total -= size
+                self.evictions += 1
+            self._size = total
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": True,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "writes": self.writes,
+                "evictions": self.evictions,
+                "size_bytes": self._size,
+                "max_bytes": self.max_bytes,
+            }
+
+
+_cache: OCRCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_ocr_cache() -> OCRCache | None:
+    """Return the process-wide cache, or None when OCR_CACHE_DIR is empty."""
+    global _cache
+    if not settings.OCR_CACHE_DIR:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = OCRCache(Path(settings.OCR_CACHE_DIR), settings.OCR_CACHE_MAX_MB * 1024 * 1024)
+            except OSError as e:
+                logger.warning(f"OCR cache disabled: {str(e)}")
+                return None
+    return _cache
+
+
+def ocr_cache_stats() -> dict:
+    cache = get_ocr_cache()
+    return cache.stats() if cache else {"enabled": False}
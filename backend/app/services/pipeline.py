@@ -0,0 +1,160 @@
+from pathlib import Path
+import json
+import logging
+import re
+
+from app.db.models import Certificate, ExtractedField
+from app.db.session import upsert
+from app.services.ocr import run_ocr
+from app.services.extract import extract_and_summarize
+from app.services.university import verify_certificate_with_university
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(s: str) -> str:
+    try:
+        s = (s or "").lower().strip()
+        s = re.sub(r"\s+", " ", s)
+        s = re.sub(r"[^a-z0-9\s]", "", s)
+        return s
+    except Exception:
+        return (s or "").strip().lower()
+
+def parse_float(val):
+    try:
+        if val is None:
+            return None
+        s = str(val).strip()
+        if s == "" or s.lower() in {"na", "n/a", "null", "none", "-"}:
+            return None
+        return float(s)
+    except Exception:
+        return None
+
+def compute_mismatch_report(extracted_fields: dict, verification: dict) -> dict:
+    """Compare extracted vs university data and compute simple status + per-field mismatches."""
+    report = {
+        "name": "not_available",
+        "cgpa": "not_available",
+        "sgpa": "not_available",
+    }
+
+    if not verification or not verification.get("student_verified"):
+        return {
+            "report": report,
+            "simple_status": "not verified",
+        }
+
+    matched = verification.get("matched_student") or verification.get("matched_certificate") or {}
+
+    # Name comparison
+    ext_name = extracted_fields.get("student_name")
+    uni_name = matched.get("student_name") or matched.get("name")
+    if ext_name and uni_name:
+        report["name"] = "match" if normalize_text(ext_name) == normalize_text(uni_name) else "mismatch"
+    else:
+        report["name"] = "not_available"
+
+    # CGPA comparison
+    ext_cgpa = parse_float(extracted_fields.get("cgpa"))
+    uni_cgpa = parse_float(matched.get("cgpa"))
+    if ext_cgpa is not None and uni_cgpa is not None:
+        report["cgpa"] = "match" if abs(ext_cgpa - uni_cgpa) <= 0.05 else "mismatch"
+    else:
+        report["cgpa"] = "not_available"
+
+    # SGPA comparison - usually not available in university summary; mark not_available if uni missing
+    ext_sgpa = parse_float(extracted_fields.get("sgpa"))
+    uni_sgpa = parse_float(matched.get("sgpa"))
+    if ext_sgpa is not None and uni_sgpa is not None:
+        report["sgpa"] = "match" if abs(ext_sgpa - uni_sgpa) <= 0.05 else "mismatch"
+    else:
+        report["sgpa"] = "not_available"
+
+    any_mismatch = any(v == "mismatch" for v in report.values())
+    simple_status = "mismatch" if any_mismatch else "verified"
+    return {"report": report, "simple_status": simple_status}
+
+
+def verification_field_rows(cert_id: int, verification: dict, mismatch: dict) -> list[dict]:
+    """Field rows for the verification result, simple status and mismatch report of one certificate."""
+    return [
+        {"certificate_id": cert_id, "key": 'verification_result', "value": json.dumps(verification),
+         "confidence": verification.get('confidence_score', 0.0), "field_type": 'verification'},
+        {"certificate_id": cert_id, "key": 'verification_simple_status', "value": mismatch.get('simple_status'),
+         "confidence": 1.0, "field_type": 'verification'},
+        {"certificate_id": cert_id, "key": 'verification_mismatch_report', "value": json.dumps(mismatch.get('report')),
+         "confidence": 1.0, "field_type": 'verification'},
+    ]
+
+
+def upsert_fields(session, rows: list[dict]) -> None:
+    """Write ExtractedField rows (dicts of column values) as upserts keyed on (certificate_id, key)."""
+    upsert(session, ExtractedField, rows, ('certificate_id', 'key'), ('value', 'confidence', 'field_type'))
+
+
+def process_certificate(session, cert: Certificate) -> dict:
+    """
+    Run the full OCR -> AI extraction -> summary -> verification pipeline for a
+    stored certificate and persist the resulting fields on the given session.
+    Fresh OCR text is committed straight away so a retried job skips Tesseract;
+    the caller owns the transaction for everything after that.
+    """
+    ocr_text = cert.ocr_text
+    if ocr_text is None:
+        ocr_text = run_ocr(Path(cert.image_path), content_hash=cert.content_hash)
+        cert.ocr_text = ocr_text
+        session.commit()
+
+    if not ocr_text.strip():
+        raise ValueError("No text could be extracted from the certificate. Please ensure the image is clear and readable.")
+
+    extracted_fields, summary = extract_and_summarize(ocr_text)
+
+    # Verify certificate against university database
+    verification = verify_certificate_with_university(extracted_fields)
+
+    # Compute simple status + mismatch report (name, cgpa, sgpa)
+    mismatch = compute_mismatch_report(extracted_fields, verification)
+
+    # Store extracted fields with proper typing
+    rows = [
+        {
+            "certificate_id": cert.id,
+            "key": key,
+            "value": str(value),
+            "confidence": 0.9,  # High confidence for AI extraction
+            "field_type": 'extracted'
+        }
+        for key, value in extracted_fields.items()
+        if value and value != "null"
+    ]
+
+    # AI summary, verification results, simple status and mismatch report
+    # are stored as separate fields for retrieval
+    rows.append({"certificate_id": cert.id, "key": 'ai_summary', "value": summary,
+                 "confidence": 1.0, "field_type": 'ai_summary'})
+    rows += verification_field_rows(cert.id, verification, mismatch)
+
+    # One INSERT ... ON CONFLICT for every field; a retried job overwrites its earlier rows
+    upsert_fields(session, rows)
+
+    # Keep the typed summary row in step with the field rows
+    from app.services.summary import sync_certificate_summary  # summary imports helpers from this module
+    sync_certificate_summary(
+        session, cert.id,
+        extracted_fields=extracted_fields,
+        ai_summary=summary,
+        simple_status=mismatch.get('simple_status'),
+        verification=verification,
+        mismatch_report=mismatch.get('report')
+    )
+
+    logger.info(f"Certificate {cert.id} processed: {mismatch.get('simple_status')}")
+    return {
+        "extracted_fields": extracted_fields,
+        "summary": summary,
+        "verification": verification,
+        "mismatch": mismatch,
+    }
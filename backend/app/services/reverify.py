@@ -0,0 +1,272 @@
+"""
+Bulk re-verification of stored certificates against the university portal.
+
+A run (ReverifyRun row) walks its scope - every certificate, or those whose
+summary is 'mismatch' - in id-ordered keyset chunks. Each chunk costs one
+query for the extracted fields, /api/verify/batch calls of PORTAL_BATCH_SIZE
+students with up to REVERIFY_WORKERS in flight, and multi-row upserts for
+the verification field rows and the summaries (as many rows per statement as
+fit in UPSERT_MAX_PARAMETERS). The run's cursor and counts are
+committed in the same transaction as the chunk's results, so a run stopped
+by a crash, a deploy or Ctrl+C resumes exactly after the last stored chunk.
+
+Certificates the portal could not answer for (verification_attempted False)
+keep their previous result and are counted as 'skipped'. A chunk the portal
+answered none of - it is down, or the circuit breaker is open - instead stops
+the run as 'interrupted' with its cursor before that chunk, to be resumed.
+
+Start runs with POST /api/v1/admin/reverify or the reverify_all.py CLI.
+"""
+from collections import Counter
+from datetime import datetime, timedelta
+import logging
+import threading
+import uuid
+
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.core.constants import ReverifyRunStatus
+from app.db.models import Certificate, CertificateSummary, ExtractedField, ReverifyRun
+from app.db.session import get_db_session
+from app.services.pipeline import compute_mismatch_report, upsert_fields, verification_field_rows
+from app.services.summary import sync_certificate_summaries
+from app.services.university import has_verification_data, verify_certificates_with_university
+
+logger = logging.getLogger(__name__)
+
+SCOPES = ('all', 'mismatch')
+
+
+class ReverifyRunActive(Exception):
+    """Another run of the same scope is still making progress."""
+
+
+class PortalUnavailable(Exception):
+    """The university portal answered none of a chunk's certificates."""
+
+
+def _extracted_fields_by_certificate(session, cert_ids: list[int]) -> dict[int, dict]:
+    fields: dict[int, dict] = {cert_id: {} for cert_id in cert_ids}
+    rows = session.query(ExtractedField.certificate_id, ExtractedField.key, ExtractedField.value).filter(
+        ExtractedField.certificate_id.in_(cert_ids),
+        ExtractedField.field_type == 'extracted'
+    )
+    for cert_id, key, value in rows:
+        fields[cert_id][key] = value
+    return fields
+
+
+def reverify_certificates(session, cert_ids: list[int], max_workers: int = 1) -> Counter:
+    """
+    Re-verify the given certificates and stage the results on session (the
+    caller commits). Returns counts per resulting simple_status, plus
+    'skipped' for certificates the portal gave no answer for. Raises
+    PortalUnavailable, staging nothing, if it answered none of them.
+    """
+    counts = Counter()
+    if not cert_ids:
+        return counts
+    fields_by_cert = _extracted_fields_by_certificate(session, cert_ids)
+    # A re-verification exists to see the portal's current answer: never serve it from the cache
+    verifications = verify_certificates_with_university(
+        [fields_by_cert[cert_id] for cert_id in cert_ids], max_workers=max_workers, use_cache=False
+    )
+
+    asked = [
+        verification for cert_id, verification in zip(cert_ids, verifications)
+        if has_verification_data(fields_by_cert[cert_id])
+    ]
+    if asked and not any(verification.get('verification_attempted') for verification in asked):
+        raise PortalUnavailable(asked[0].get('message'))
+
+    field_rows, summary_updates = [], []
+    for cert_id, verification in zip(cert_ids, verifications):
+        if not verification.get('verification_attempted'):
+            counts['skipped'] += 1
+            continue
+        extracted_fields = fields_by_cert[cert_id]
+        mismatch = compute_mismatch_report(extracted_fields, verification)
+        field_rows += verification_field_rows(cert_id, verification, mismatch)
+        summary_updates.append(dict(
+            cert_id=cert_id,
+            simple_status=mismatch.get('simple_status'),
+            verification=verification,
+            mismatch_report=mismatch.get('report')
+        ))
+        counts[mismatch.get('simple_status')] += 1
+
+    upsert_fields(session, field_rows)
+    sync_certificate_summaries(session, summary_updates)
+    return counts
+
+
+def _scope_ids(session, scope: str):
+    """Id column (keyset order) and query of the certificates a scope covers."""
+    if scope == 'mismatch':
+        column = CertificateSummary.certificate_id
+        return column, session.query(column).filter(CertificateSummary.simple_status == 'mismatch')
+    return Certificate.id, session.query(Certificate.id)
+
+
+def _next_chunk(session, run: ReverifyRun, chunk_size: int) -> list[int]:
+    column, query = _scope_ids(session, run.scope)
+    rows = query.filter(column > run.last_certificate_id).order_by(column).limit(chunk_size)
+    return [cert_id for (cert_id,) in rows]
+
+
+def _is_stale(run: ReverifyRun) -> bool:
+    """A 'running' run whose heartbeat stopped: its process died mid-run."""
+    return run.updated_at < datetime.utcnow() - timedelta(seconds=settings.JOB_STALE_AFTER)
+
+
+def _take_scope(session, scope: str, run_id: str | None = None) -> None:
+    """
+    Clear the way for a run of scope: raise ReverifyRunActive if another one
+    is live, and mark stale ones interrupted so they release the scope.
+    """
+    others = session.query(ReverifyRun).filter(
+        ReverifyRun.scope == scope, ReverifyRun.status == ReverifyRunStatus.RUNNING
+    )
+    if run_id is not None:
+        others = others.filter(ReverifyRun.id != run_id)
+    for active in others:
+        if not _is_stale(active):
+            raise ReverifyRunActive(active.id)
+        active.status = ReverifyRunStatus.INTERRUPTED
+        active.error = "Stopped responding; superseded by a newer run"
+    # Release the scope before the caller's run turns 'running' in the same flush
+    session.flush()
+
+
+def _flush_running(session, scope: str) -> None:
+    # uq_reverify_runs_running_scope turns a lost race with a concurrent start into ReverifyRunActive
+    try:
+        session.flush()
+    except IntegrityError:
+        session.rollback()
+        winner = session.query(ReverifyRun.id).filter(
+            ReverifyRun.scope == scope, ReverifyRun.status == ReverifyRunStatus.RUNNING
+        ).scalar()
+        raise ReverifyRunActive(winner)
+
+
+def create_reverify_run(session, scope: str) -> ReverifyRun:
+    """Record a new run (the caller commits). Raises ReverifyRunActive if one of this scope is live."""
+    if scope not in SCOPES:
+        raise ValueError(f"scope must be one of {', '.join(SCOPES)}")
+    _take_scope(session, scope)
+    _, query = _scope_ids(session, scope)
+    run = ReverifyRun(id=uuid.uuid4().hex, scope=scope, total=query.count(), counts={})
+    session.add(run)
+    _flush_running(session, scope)
+    return run
+
+
+def claim_for_resume(session, run_id: str) -> ReverifyRun | None:
+    """
+    Mark an interrupted, failed or stale run as running again (the caller
+    commits). None if the run does not exist; raises ReverifyRunActive if it
+    or another run of its scope is still making progress and ValueError if it already completed.
+    """
+    run = session.get(ReverifyRun, run_id)
+    if run is None:
+        return None
+    if run.status == ReverifyRunStatus.COMPLETED:
+        raise ValueError("Run already completed")
+    if run.status == ReverifyRunStatus.RUNNING and not _is_stale(run):
+        raise ReverifyRunActive(run.id)
+    _take_scope(session, run.scope, run.id)
+    run.status = ReverifyRunStatus.RUNNING
+    run.error = None
+    run.finished_at = None
+    run.updated_at = datetime.utcnow()
+    _flush_running(session, run.scope)
+    return run
+
+
+def execute_reverify_run(run_id: str, chunk_size: int | None = None, max_workers: int | None = None,
+                         stop: threading.Event | None = None) -> dict:
+    """
+    Process a claimed run chunk by chunk until its scope is exhausted (or
+    stop is set or the portal stops answering, which leave it 'interrupted').
+    Returns its final progress.
+    """
+    chunk_size = chunk_size or settings.REVERIFY_CHUNK_SIZE
+    max_workers = max_workers or settings.REVERIFY_WORKERS
+    try:
+        while True:
+            with get_db_session() as session:
+                run = session.get(ReverifyRun, run_id)
+                if run.status != ReverifyRunStatus.RUNNING:
+                    # Looked stale and was superseded, or resumed elsewhere and finished
+                    logger.warning(f"Reverify run {run_id} is {run.status}; stopping")
+                    break
+                if stop is not None and stop.is_set():
+                    run.status = ReverifyRunStatus.INTERRUPTED
+                    run.updated_at = datetime.utcnow()
+                    break
+                cert_ids = _next_chunk(session, run, chunk_size)
+                if not cert_ids:
+                    run.status = ReverifyRunStatus.COMPLETED
+                    run.finished_at = run.updated_at = datetime.utcnow()
+                    break
+                counts = Counter(run.counts or {})
+                counts.update(reverify_certificates(session, cert_ids, max_workers=max_workers))
+                # Cursor and counts commit with the chunk's results
+                run.counts = dict(counts)
+                run.processed += len(cert_ids)
+                run.last_certificate_id = cert_ids[-1]
+                run.updated_at = datetime.utcnow()
+                processed, total = run.processed, run.total
+            logger.info(f"Reverify run {run_id}: {processed}/{total} certificates")
+    except PortalUnavailable as e:
+        # Keep the cursor before the unanswered chunk so a resume retries it
+        logger.warning(f"Reverify run {run_id} interrupted: university portal unavailable ({e})")
+        with get_db_session() as session:
+            run = session.get(ReverifyRun, run_id)
+            run.status = ReverifyRunStatus.INTERRUPTED
+            run.error = f"University portal unavailable: {e}"
+            run.updated_at = datetime.utcnow()
+    except Exception as e:
+        logger.error(f"Reverify run {run_id} failed: {str(e)}")
+        with get_db_session() as session:
+            run = session.get(ReverifyRun, run_id)
+            run.status = ReverifyRunStatus.FAILED
+            run.error = str(e)
+            run.updated_at = datetime.utcnow()
+        raise
+    with get_db_session() as session:
+        return reverify_progress(session, run_id)
+
+
+def start_reverify_run(run_id: str) -> None:
+    """Run execute_reverify_run on a background thread."""
+    def run():
+        try:
+            execute_reverify_run(run_id)
+        except Exception:
+            pass  # Logged and recorded on the run; resume it to continue
+
+    threading.Thread(target=run, name=f"reverify-{run_id[:8]}", daemon=True).start()
+
+
+def reverify_progress(session, run_id: str) -> dict | None:
+    run = session.get(ReverifyRun, run_id)
+    if run is None:
+        return None
+    return {
+        "run_id": run.id,
+        "scope": run.scope,
+        "status": run.status,
+        "total": run.total,
+        "processed": run.processed,
+        "percent": round(100.0 * run.processed / run.total, 1) if run.total else 100.0,
+        "counts": run.counts or {},
+        "last_certificate_id": run.last_certificate_id,
+        "stale": run.status == ReverifyRunStatus.RUNNING and _is_stale(run),
+        "error": run.error,
+        "created_at": run.created_at.isoformat(),
+        "updated_at": run.updated_at.isoformat(),
+        "finished_at": run.finished_at.isoformat() if run.finished_at else None,
+    }
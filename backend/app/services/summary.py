@@ -0,0 +1,228 @@
+"""
+Typed per-certificate summary rows.
+
+ExtractedField stays the source of truth (one row per extracted key), but
+pivoting it on every read makes list/detail pages expensive and filtering by
+CGPA, branch or enrollment impossible without scanning all fields. The
+certificate_summary table keeps one typed, indexed row per certificate; it is
+written by the processing pipeline and reverify, and can be rebuilt from the
+field rows at any time (see backfill_summaries.py).
+"""
+from datetime import datetime
+import json
+import logging
+
+from app.db.models import Certificate, CertificateSummary, ExtractedField
+from app.db.session import upsert
+from app.services.pipeline import compute_mismatch_report, parse_float
+
+logger = logging.getLogger(__name__)
+
+# Extracted keys copied verbatim into same-named text columns
+TEXT_FIELDS = (
+    "student_name", "enrollment_number", "degree", "branch", "university_name",
+    "graduation_date", "date_of_birth", "grade", "certificate_type", "semester",
+    "academic_year", "total_credits", "earned_credits", "subjects",
+)
+
+
+def _clip(value, column) -> str | None:
+    if value is None:
+        return None
+    value = str(value)
+    length = getattr(column.type, 'length', None)
+    return value[:length] if length else value
+
+
+def apply_extracted_fields(row: CertificateSummary, extracted_fields: dict) -> None:
+    """Copy extracted values onto the row, skipping the same empty/"null" values the field store skips."""
+    values = {k: v for k, v in extracted_fields.items() if v and v != "null"}
+    for key in TEXT_FIELDS:
+        setattr(row, key, _clip(values.get(key), CertificateSummary.__table__.c[key]))
+    row.cgpa_text = _clip(values.get("cgpa"), CertificateSummary.cgpa_text)
+    row.sgpa_text = _clip(values.get("sgpa"), CertificateSummary.sgpa_text)
+    row.cgpa = parse_float(values.get("cgpa"))
+    row.sgpa = parse_float(values.get("sgpa"))
+    row.field_count = len(values)
+
+
+def decode_verification_value(value: str | None):
+    """Decode a stored verification/mismatch field (JSON since schema migration 8)."""
+    if not value:
+        return None
+    try:
+        return json.loads(value)
+    except ValueError:
+        logger.warning(f"Undecodable verification payload: {value[:80]!r}")
+        return None
+
+
+def sync_certificate_summary(session, cert_id: int, extracted_fields: dict | None = None,
+                             ai_summary: str | None = None, simple_status: str | None = None,
+                             verification: dict | None = None, mismatch_report: dict | None = None) -> None:
+    """
+    Create or update the summary row with a single upsert; arguments left as
+    None keep their stored value.
+    """
+    sync_certificate_summaries(session, [dict(
+        cert_id=cert_id, extracted_fields=extracted_fields, ai_summary=ai_summary,
+        simple_status=simple_status, verification=verification, mismatch_report=mismatch_report
+    )])
+
+
+def sync_certificate_summaries(session, updates: list[dict]) -> None:
+    """
+    Bulk sync_certificate_summary: each update holds its keyword arguments.
+    Updates that set the same arguments (normally all of them) are written
+    with one multi-row upsert.
+    """
+    groups: dict[tuple, list[dict]] = {}
+    for update in updates:
+        row = _summary_values(**update)
+        update_columns = tuple(column for column in row if column != 'certificate_id')
+        groups.setdefault(update_columns, []).append(row)
+    for update_columns, rows in groups.items():
+        rows = [{"field_count": 0, **row} for row in rows]  # NOT NULL on insert, kept on update unless recomputed
+        upsert(session, CertificateSummary, rows, ('certificate_id',), update_columns)
+
+
+def _summary_values(cert_id: int, extracted_fields: dict | None = None,
+                    ai_summary: str | None = None, simple_status: str | None = None,
+                    verification: dict | None = None, mismatch_report: dict | None = None) -> dict:
+    values = {}
+    if extracted_fields is not None:
+        staged = CertificateSummary()
+        apply_extracted_fields(staged, extracted_fields)
+        values.update({key: getattr(staged, key) for key in TEXT_FIELDS})
+        values.update({key: getattr(staged, key) for key in ('cgpa', 'sgpa', 'cgpa_text', 'sgpa_text', 'field_count')})
+    if ai_summary is not None:
+        values['ai_summary'] = ai_summary
+    if simple_status is not None:
+        values['simple_status'] = simple_status
+    if verification is not None:
+        values['verification'] = verification
+    if mismatch_report is not None:
+        values['mismatch_report'] = mismatch_report
+    values['updated_at'] = datetime.utcnow()
+    return {"certificate_id": cert_id, **values}
+
+
+def _summary_from_field_rows(cert_id: int, rows) -> CertificateSummary:
+    """Build a transient (unsaved) summary from (key, value, field_type) rows."""
+    extracted, verification_fields, ai_summary = {}, {}, None
+    for key, value, field_type in rows:
+        if field_type == 'extracted':
+            extracted[key] = value
+        elif field_type == 'ai_summary':
+            ai_summary = value
+        elif field_type == 'verification':
+            verification_fields[key] = value
+
+    verification = decode_verification_value(verification_fields.get('verification_result'))
+    mismatch_report = decode_verification_value(verification_fields.get('verification_mismatch_report'))
+    simple_status = verification_fields.get('verification_simple_status')
+    if simple_status is None and verification is not None:
+        mismatch = compute_mismatch_report(extracted, verification)
+        simple_status, mismatch_report = mismatch.get('simple_status'), mismatch.get('report')
+
+    row = CertificateSummary(
+        certificate_id=cert_id,
+        ai_summary=ai_summary,
+        simple_status=simple_status,
+        verification=verification,
+        mismatch_report=mismatch_report
+    )
+    apply_extracted_fields(row, extracted)
+    return row
+
+
+def _fields_by_certificate(session, cert_ids) -> dict[int, list[tuple]]:
+    fields_by_cert: dict[int, list[tuple]] = {}
+    rows = session.query(
+        ExtractedField.certificate_id, ExtractedField.key, ExtractedField.value, ExtractedField.field_type
+    ).filter(ExtractedField.certificate_id.in_(cert_ids)).order_by(ExtractedField.id)
+    for cert_id, key, value, field_type in rows:
+        fields_by_cert.setdefault(cert_id, []).append((key, value, field_type))
+    return fields_by_cert
+
+
+def load_summaries(session, cert_ids: list[int]) -> dict[int, CertificateSummary]:
+    """
+    Summary rows for a page of certificates in one query. Certificates that
+    have not been backfilled yet get a transient row built from their fields
+    (one more query for all of them together), so reads stay correct before
+    backfill_summaries.py has run.
+    """
+    if not cert_ids:
+        return {}
+    summaries = {
+        row.certificate_id: row
+        for row in session.query(CertificateSummary).filter(CertificateSummary.certificate_id.in_(cert_ids))
+    }
+    missing = [cert_id for cert_id in cert_ids if cert_id not in summaries]
+    if missing:
+        fields_by_cert = _fields_by_certificate(session, missing)
+        for cert_id in missing:
+            summaries[cert_id] = _summary_from_field_rows(cert_id, fields_by_cert.get(cert_id, ()))
+    return summaries
+
+
+def backfill_summaries(session, batch_size: int = 500, rebuild: bool = False) -> int:
+    """
+    Write summary rows from the ExtractedField rows, in id-ordered batches.
+    Only certificates without a summary are touched unless rebuild is set.
+    Returns the number of rows written.
+    """
+    written = 0
+    last_id = 0
+    while True:
+        query = session.query(Certificate.id).filter(Certificate.id > last_id)
+        if not rebuild:
+            query = query.outerjoin(CertificateSummary).filter(CertificateSummary.certificate_id.is_(None))
+        cert_ids = [cert_id for (cert_id,) in query.order_by(Certificate.id).limit(batch_size)]
+        if not cert_ids:
+            return written
+        fields_by_cert = _fields_by_certificate(session, cert_ids)
+        existing = {
+            row.certificate_id: row
+            for row in session.query(CertificateSummary).filter(CertificateSummary.certificate_id.in_(cert_ids))
+        }
+        for cert_id in cert_ids:
+            built = _summary_from_field_rows(cert_id, fields_by_cert.get(cert_id, ()))
+            row = existing.get(cert_id)
+            if row is None:
+                session.add(built)
+                continue
+            for column in CertificateSummary.__table__.columns:
+                if column.key not in ('certificate_id', 'updated_at'):
+                    setattr(row, column.key, getattr(built, column.key))
+        session.commit()
+        written += len(cert_ids)
+        last_id = cert_ids[-1]
+        logger.info(f"Backfilled {written} certificate summaries (up to id {last_id})")
+
+
+def tabular_data(row: CertificateSummary, detail: bool = False) -> dict:
+    """The tabular_data block the API has always returned, with "-" for missing values."""
+    data = {
+        "student_name": row.student_name or "-",
+        "degree": row.degree or "-",
+        "branch": row.branch or "-",
+        "university_name": row.university_name or "-",
+        "enrollment_number": row.enrollment_number or "-",
+        "sgpa": row.sgpa_text or "-",
+        "cgpa": row.cgpa_text or "-",
+        "semester": row.semester or "-",
+        "academic_year": row.academic_year or "-",
+    }
+    if detail:
+        data.update({
+            "graduation_date": row.graduation_date or "-",
+            "date_of_birth": row.date_of_birth or "-",
+            "grade": row.grade or "-",
+            "certificate_type": row.certificate_type or "-",
+            "total_credits": row.total_credits or "-",
+            "earned_credits": row.earned_credits or "-",
+            "subjects": row.subjects or [],
+        })
+    return data
@@ -0,0 +1,325 @@
+"""
+Client for the university portal's verification API.
+
+All verification calls (upload processing, reverify, batch jobs) share one
+requests.Session per process, so connections to UNIVERSITY_PORTAL_URL are
+kept alive and pooled instead of opening a new TCP (and TLS) connection per
+certificate. Connection errors and 502/503/504 responses are retried with
+exponential backoff (/api/verify is a read-only lookup, so retrying the POST
+is safe); read timeouts are not, since a slow portal would only get slower.
+Once the portal keeps failing, a circuit breaker makes verification fail fast
+(verification_attempted False) until a background probe sees it healthy.
+"""
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+import logging
+import os
+import threading
+
+from app.core.config import settings
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.verification_cache import (
+    make_verification_key, get_cached_verification, store_verification, sync_invalidations
+)
+
+# requests is imported on the first portal call (see benchmark_startup.py)
+if TYPE_CHECKING:
+    import requests
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = (502, 503, 504)
+
+# Process-wide session, created lazily and rebuilt in forked children
+_session: requests.Session | None = None
+_session_pid: int | None = None
+_session_lock = threading.Lock()
+
+
+def portal_url(path: str) -> str:
+    return f"{settings.UNIVERSITY_PORTAL_URL.rstrip('/')}{path}"
+
+
+def _timeout() -> tuple[float, float]:
+    return settings.PORTAL_CONNECT_TIMEOUT, settings.PORTAL_READ_TIMEOUT
+
+
+def get_portal_session() -> requests.Session:
+    """
+    Return the shared portal session, creating it on first use. Its
+    connection pool holds PORTAL_POOL_SIZE keep-alive connections, enough for
+    every job worker and request thread to verify concurrently.
+    """
+    global _session, _session_pid
+    pid = os.getpid()
+    session = _session
+    if session is not None and _session_pid == pid:
+        return session
+
+    with _session_lock:
+        if _session is None or _session_pid != pid:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            retry = Retry(
+                total=settings.PORTAL_MAX_RETRIES,
+                connect=settings.PORTAL_MAX_RETRIES,
+                read=False,  # a slow portal is not retried, the read timeout is final
+                status=settings.PORTAL_MAX_RETRIES,
+                backoff_factor=settings.PORTAL_BACKOFF_FACTOR,
+                status_forcelist=RETRY_STATUSES,
+                allowed_methods=frozenset({"GET", "POST"}),  # the portal's POSTs are lookups
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=settings.PORTAL_POOL_SIZE,
+                max_retries=retry,
+            )
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+            _session_pid = pid
+            logger.info("University portal session initialized")
+        return _session
+
+
+def _reset_session_after_fork():
+    # The parent's pooled sockets must not be shared with the child
+    global _session, _session_pid
+    _session = None
+    _session_pid = None
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_session_after_fork)
+
+
+def _portal_is_up() -> bool:
+    """Recovery probe for the circuit breaker: the portal's /health answers 200."""
+    response = get_portal_session().get(portal_url("/health"), timeout=_timeout())
+    return response.status_code == 200
+
+
+portal_breaker = CircuitBreaker(
+    "university-portal",
+    failure_threshold=settings.PORTAL_BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=settings.PORTAL_BREAKER_RESET_TIMEOUT,
+    probe=_portal_is_up,
+)
+
+
+def portal_breaker_stats() -> dict:
+    return portal_breaker.stats()
+
+
+def _not_attempted(message: str) -> dict:
+    return {
+        'student_verified': False,
+        'confidence_score': 0.0,
+        'message': message,
+        'matched_student': None,
+        'verification_attempted': False
+    }
+
+
+def _result_from_portal(university_response: dict, student_name: str) -> dict:
+    """Translate one /api/verify(/batch) answer into the stored verification result."""
+    if university_response.get('success'):
+        if university_response.get('verified'):
+            logger.info(f"Certificate verified successfully for {student_name}")
+            return {
+                'student_verified': True,
+                'confidence_score': university_response.get('confidence_score', 1.0),
+                'message': 'Certificate verified against university database',
+                'matched_student': university_response.get('matched_certificate'),
+                'verification_attempted': True,
+                'verification_timestamp': university_response.get('verification_timestamp')
+            }
+        logger.info(f"Certificate not found in university database for {student_name}")
+        return {
+            'student_verified': False,
+            'confidence_score': 0.0,
+            'message': university_response.get('message', 'Certificate not found in university database'),
+            'matched_student': None,
+            'verification_attempted': True,
+            'searched_for': university_response.get('searched_for')
+        }
+    logger.error(f"University API returned error: {university_response.get('error')}")
+    return _not_attempted(f"University verification failed: {university_response.get('error')}")
+
+
+def _verification_pair(extracted_data: dict) -> tuple[str, str]:
+    return (
+        (extracted_data.get('student_name') or '').strip(),
+        (extracted_data.get('enrollment_number') or '').strip(),
+    )
+
+
+def has_verification_data(extracted_data: dict) -> bool:
+    """Whether the fields carry the name and enrollment number the portal matches on."""
+    return all(_verification_pair(extracted_data))
+
+
+def verify_certificate_with_university(extracted_data: dict, use_cache: bool = True) -> dict:
+    """
+    Verify extracted certificate data against the university database,
+    answering from the verification cache when the same student was checked
+    recently.
+
+    Args:
+        extracted_data: Dictionary containing extracted certificate fields
+        use_cache: False always asks the portal; the fresh answer is still cached
+
+    Returns:
+        Dictionary containing verification results
+    """
+    student_name, enrollment_number = _verification_pair(extracted_data)
+    if not student_name or not enrollment_number:
+        return _not_attempted('Insufficient data for university verification')
+    sync_invalidations()
+    key = make_verification_key(enrollment_number, student_name)
+    cached = get_cached_verification(key) if use_cache else None
+    if cached is not None:
+        return cached
+    result = _request_verification(student_name, enrollment_number)
+    store_verification(key, result)
+    return result
+
+
+def verify_certificates_with_university(items: list[dict], max_workers: int = 1,
+                                        use_cache: bool = True) -> list[dict]:
+    """
+    Batch form of verify_certificate_with_university: one result per
+    extracted-fields dict, in order. Cache misses go to the portal's
+    /api/verify/batch in chunks of PORTAL_BATCH_SIZE, so verifying thousands
+    of certificates costs a handful of requests instead of one each; up to
+    max_workers chunks are in flight at once. use_cache=False sends every
+    pair to the portal but still caches the fresh answers.
+    """
+    sync_invalidations()
+    results: list[dict | None] = [None] * len(items)
+    pending = []  # (index, cache key, student_name, enrollment_number)
+    for index, extracted_data in enumerate(items):
+        student_name, enrollment_number = _verification_pair(extracted_data)
+        if not student_name or not enrollment_number:
+            results[index] = _not_attempted('Insufficient data for university verification')
+            continue
+        key = make_verification_key(enrollment_number, student_name)
+        cached = get_cached_verification(key) if use_cache else None
+        if cached is not None:
+            results[index] = cached
+            continue
+        pending.append((index, key, student_name, enrollment_number))
+
+    size = max(1, settings.PORTAL_BATCH_SIZE)
+    chunks = [pending[start:start + size] for start in range(0, len(pending), size)]
+    pair_lists = [[(name, enrollment) for _, _, name, enrollment in chunk] for chunk in chunks]
+    if max_workers > 1 and len(chunks) > 1:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks)), thread_name_prefix="portal-batch") as pool:
+            answers_per_chunk = list(pool.map(_request_batch_verification, pair_lists))
+    else:
+        answers_per_chunk = [_request_batch_verification(pairs) for pairs in pair_lists]
+    for chunk, answers in zip(chunks, answers_per_chunk):
+        for (index, key, _, _), result in zip(chunk, answers):
+            store_verification(key, result)
+            results[index] = result
+    return results
+
+
+def _request_batch_verification(pairs: list[tuple[str, str]]) -> list[dict]:
+    """POST (student_name, enrollment_number) pairs to /api/verify/batch; one result per pair."""
+    import requests
+    if not portal_breaker.allow_request():
+        return [_not_attempted('University database is currently unavailable') for _ in pairs]
+    logger.info(f"Verifying {len(pairs)} certificates in one batch")
+    try:
+        response = get_portal_session().post(
+            portal_url("/api/verify/batch"),
+            json={"items": [{"student_name": name, "enrollment_number": enrollment} for name, enrollment in pairs]},
+            timeout=_timeout()
+        )
+    except requests.exceptions.ConnectionError:
+        portal_breaker.record_failure()
+        logger.warning("University portal is not accessible - batch verification skipped")
+        return [_not_attempted('University database is currently unavailable') for _ in pairs]
+    except requests.exceptions.Timeout:
+        portal_breaker.record_failure()
+        logger.error("University batch verification request timed out")
+        return [_not_attempted('University database verification timed out') for _ in pairs]
+    except requests.exceptions.RequestException as e:
+        portal_breaker.record_failure()
+        logger.error(f"University batch verification request failed: {str(e)}")
+        return [_not_attempted(f'University verification error: {str(e)}') for _ in pairs]
+
+    if response.status_code >= 500:
+        portal_breaker.record_failure()
+    elif response.status_code != 200:
+        portal_breaker.record_success()
+    if response.status_code in (404, 405):
+        # Portal predates the batch endpoint: fall back to one request per pair
+        return [_request_verification(name, enrollment) for name, enrollment in pairs]
+    if response.status_code == 413 and len(pairs) > 1:
+        # Portal caps batches below PORTAL_BATCH_SIZE: retry the halves
+        middle = len(pairs) // 2
+        logger.warning(f"University portal rejected a batch of {len(pairs)}; retrying in halves")
+        return _request_batch_verification(pairs[:middle]) + _request_batch_verification(pairs[middle:])
+    if response.status_code != 200:
+        logger.error(f"University batch API request failed with status {response.status_code}")
+        return [
+            _not_attempted(f"Unable to connect to university database (HTTP {response.status_code})")
+            for _ in pairs
+        ]
+    try:
+        body = response.json()
+    except ValueError:
+        body = None
+    answers = body.get('results') if isinstance(body, dict) else None
+    if (not isinstance(answers, list) or len(answers) != len(pairs)
+            or not all(isinstance(answer, dict) for answer in answers)):
+        # A 200 we can't read is as bad as no answer: count it against the portal
+        portal_breaker.record_failure()
+        logger.error("University batch API returned a malformed response")
+        return [_not_attempted('University verification error: malformed batch response') for _ in pairs]
+    portal_breaker.record_success()
+    return [_result_from_portal(answer, name) for answer, (name, _) in zip(answers, pairs)]
+
+
+def _request_verification(student_name: str, enrollment_number: str) -> dict:
+    """POST the student's name and enrollment number to the portal's /api/verify."""
+    import requests
+    if not portal_breaker.allow_request():
+        # Portal known to be down: don't tie up this worker waiting on it
+        return _not_attempted('University database is currently unavailable')
+
+    logger.info(f"Verifying certificate for: {student_name} (Enrollment: {enrollment_number})")
+    try:
+        response = get_portal_session().post(
+            portal_url("/api/verify"),
+            json={'student_name': student_name, 'enrollment_number': enrollment_number},
+            timeout=_timeout()
+        )
+        if response.status_code >= 500:
+            portal_breaker.record_failure()
+        else:
+            portal_breaker.record_success()
+
+        if response.status_code == 200:
+            return _result_from_portal(response.json(), student_name)
+        logger.error(f"University API request failed with status {response.status_code}")
+        return _not_attempted(f"Unable to connect to university database (HTTP {response.status_code})")
+
+    except requests.exceptions.ConnectionError:
+        portal_breaker.record_failure()
+        logger.warning("University portal is not accessible - verification skipped")
+        return _not_attempted('University database is currently unavailable')
+    except requests.exceptions.Timeout:
+        portal_breaker.record_failure()
+        logger.error("University verification request timed out")
+        return _not_attempted('University database verification timed out')
+    except Exception as e:
+        logger.error(f"University verification failed with error: {str(e)}")
+        return _not_attempted(f'University verification error: {str(e)}')
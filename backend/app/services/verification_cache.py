@@ -0,0 +1,158 @@
+"""
+In-process TTL cache of university portal verification results.
+
+Keys are the (enrollment number, student name) pair normalized the way the
+portal matches them, so re-uploads and /reverify of the same student skip the
+HTTP round-trip. Verified results live for VERIFICATION_CACHE_TTL seconds;
+"not found" answers for the shorter VERIFICATION_CACHE_NEGATIVE_TTL, so a
+certificate the university adds shortly afterwards is picked up soon even
+without an invalidation. Errors, timeouts and other results with
+verification_attempted False are never cached. The cache is bounded to
+VERIFICATION_CACHE_MAX_ENTRIES, evicting the least recently used entry.
+
+Every process (each gunicorn worker, run_worker.py) holds its own entries.
+Invalidation goes through the database: invalidate_verifications() bumps the
+shared 'verification' row of cache_generations, and each process drops all
+of its entries the next time sync_invalidations() (one primary-key read,
+run before every verification) sees a new generation. The portal triggers
+this through POST /verification/cache/invalidate when its records change.
+"""
+from collections import OrderedDict
+from datetime import datetime
+import copy
+import logging
+import re
+import threading
+import time
+
+from sqlalchemy import select, update
+
+from app.core.config import settings
+from app.db.models import CacheGeneration
+from app.db.session import get_db_session
+
+logger = logging.getLogger(__name__)
+
+CACHE_NAME = 'verification'
+
+_lock = threading.Lock()
+# key -> (expires_at, result), least recently used first
+_entries: "OrderedDict[tuple[str, str], tuple[float, dict]]" = OrderedDict()
+_stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "invalidations": 0}
+# Shared generation the current entries were cached under; None until first synced
+_generation: int | None = None
+
+
+def normalize_key_part(value: str | None) -> str:
+    """Same normalization the portal's store applies before matching."""
+    value = re.sub(r"\s+", " ", (value or "").lower().strip())
+    return re.sub(r"[^a-z0-9\s]", "", value)
+
+
+def make_verification_key(enrollment_number: str | None, student_name: str | None) -> tuple[str, str]:
+    return normalize_key_part(enrollment_number), normalize_key_part(student_name)
+
+
+def _enabled() -> bool:
+    return settings.VERIFICATION_CACHE_MAX_ENTRIES > 0
+
+
+def get_cached_verification(key: tuple[str, str]) -> dict | None:
+    if not _enabled():
+        return None
+    now = time.monotonic()
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None:
+            _stats["misses"] += 1
+            return None
+        expires_at, result = entry
+        if expires_at <= now:
+            del _entries[key]
+            _stats["misses"] += 1
+            _stats["evictions"] += 1
+            return None
+        _entries.move_to_end(key)
+        _stats["hits"] += 1
+    # Callers store the result as they please; never hand out the cached dict itself
+    return copy.deepcopy(result)
+
+
+def store_verification(key: tuple[str, str], result: dict) -> None:
+    """Cache a definitive portal answer; failed attempts are skipped."""
+    if not _enabled() or not result.get('verification_attempted'):
+        return
+    ttl = settings.VERIFICATION_CACHE_TTL if result.get('student_verified') else settings.VERIFICATION_CACHE_NEGATIVE_TTL
+    if ttl <= 0:
+        return
+    with _lock:
+        _entries[key] = (time.monotonic() + ttl, copy.deepcopy(result))
+        _entries.move_to_end(key)
+        _stats["writes"] += 1
+        while len(_entries) > settings.VERIFICATION_CACHE_MAX_ENTRIES:
+            _entries.popitem(last=False)
+            _stats["evictions"] += 1
+
+
+def _drop_all() -> int:
+    # Caller holds the lock
+    dropped = len(_entries)
+    _entries.clear()
+    _stats["invalidations"] += dropped
+    return dropped
+
+
+def sync_invalidations() -> None:
+    """
+    Drop this process's entries if any process invalidated the cache since
+    they were stored. If the generation can't be read, nothing cached is
+    trusted.
+    """
+    global _generation
+    if not _enabled():
+        return
+    try:
+        with get_db_session() as session:
+            generation = session.execute(
+                select(CacheGeneration.generation).where(CacheGeneration.name == CACHE_NAME)
+            ).scalar() or 0
+    except Exception as e:
+        logger.warning(f"Could not read verification cache generation: {str(e)}")
+        generation = None
+    with _lock:
+        if generation is None or generation != _generation:
+            _drop_all()
+            _generation = generation
+
+
+def invalidate_verifications() -> int:
+    """
+    Invalidate cached results in every process: bump the shared generation
+    (each process drops its entries on its next sync) and clear this one
+    now. Returns the number of local entries removed.
+    """
+    with get_db_session() as session:
+        result = session.execute(
+            update(CacheGeneration)
+            .where(CacheGeneration.name == CACHE_NAME)
+            .values(generation=CacheGeneration.generation + 1, updated_at=datetime.utcnow())
+        )
+        if result.rowcount == 0:
+            session.add(CacheGeneration(name=CACHE_NAME, generation=1))
+    with _lock:
+        return _drop_all()
+
+
+def verification_cache_stats() -> dict:
+    if not _enabled():
+        return {"enabled": False}
+    with _lock:
+        lookups = _stats["hits"] + _stats["misses"]
+        return {
+            "enabled": True,
+            "entries": len(_entries),
+            "max_entries": settings.VERIFICATION_CACHE_MAX_ENTRIES,
+            "generation": _generation,
+            **_stats,
+            "hit_rate": round(_stats["hits"] / lookups, 3) if lookups else 0.0,
+        }
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Populate the certificate_summary table from existing ExtractedField rows.
+
+migrate.py fills the table once when it is created; new uploads and
+re-verifications keep it in sync on their own. Pass --rebuild to rewrite
+every row.
+"""
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.core.config import settings
+from app.db.session import init_engine, get_engine, db_session
+from app.db.migrations import check_schema_version
+from app.services.summary import backfill_summaries
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rebuild", action="store_true", help="rewrite existing summary rows too")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    init_engine(settings.DB_URL)
+    check_schema_version(get_engine())
+
+    try:
+        count = backfill_summaries(db_session, batch_size=args.batch_size, rebuild=args.rebuild)
+        print(f"✅ Wrote {count} certificate summaries")
+    finally:
+        db_session.remove()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Measure backend startup cost: import time, resident memory and which heavy
+dependencies get loaded, for a fresh interpreter importing the API.
+
+Each run happens in a new subprocess so nothing is cached between runs.
+
+Usage:
+  python benchmark_startup.py [--runs 5] [--target app.api.routes]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+HEAVY_MODULES = ("openai", "httpx", "requests", "PIL", "pytesseract", "fitz")
+
+# Runs inside the child interpreter; prints one JSON line
+_PROBE = """
+import json, resource, sys, time
+sys.path.insert(0, {backend!r})
+start = time.perf_counter()
+__import__({target!r})
+elapsed = time.perf_counter() - start
+rss_kb = 0
+with open('/proc/self/status') as f:
+    for line in f:
+        if line.startswith('VmRSS:'):
+            rss_kb = int(line.split()[1])
+if not rss_kb:
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # peak, KiB on Linux
+print(json.dumps({{
+    "seconds": elapsed,
+    "rss_mb": rss_kb / 1024,
+    "loaded": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+
+def run_once(target: str) -> dict:
+    code = _PROBE.format(backend=str(Path(__file__).parent), target=target, heavy=HEAVY_MODULES)
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    if result.returncode != 0:
+        sys.exit(f"import {target} failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--target", default="app.api.routes", help="module to import (default: app.api.routes)")
+    args = parser.parse_args()
+
+    samples = [run_once(args.target) for _ in range(args.runs)]
+    seconds = [s["seconds"] for s in samples]
+    rss = [s["rss_mb"] for s in samples]
+    print(f"import {args.target} ({args.runs} runs)")
+    print(f"  time: median {statistics.median(seconds) * 1000:.0f} ms, min {min(seconds) * 1000:.0f} ms")
+    print(f"  RSS:  median {statistics.median(rss):.1f} MB")
+    print(f"  heavy modules loaded: {', '.join(samples[-1]['loaded']) or 'none'}")
@@ -8,7 +8,7 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from app.db.session import db_session, init_engine
-from app.db.models import Certificate, ExtractedField
+from app.db.models import Certificate, CertificateSummary, ExtractedField, ProcessingJob
 from app.core.config import settings
 import logging
 
@@ -31,8 +31,11 @@ def delete_all_certificates():
             logger.info("No certificates to delete.")
             return
         
-        # Delete all certificates (cascade will delete extracted fields)
+        # Bulk deletes skip ORM cascades: remove the rows referencing certificates first
         logger.info("Deleting all certificates...")
+        db_session.query(ProcessingJob).delete(synchronize_session=False)
+        db_session.query(ExtractedField).delete(synchronize_session=False)
+        db_session.query(CertificateSummary).delete(synchronize_session=False)
         db_session.query(Certificate).delete()
         db_session.commit()
         
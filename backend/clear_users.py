@@ -10,7 +10,7 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from app.db.session import init_engine, db_session
 from app.core.config import settings
-from app.db.models import User, Certificate, ExtractedField, Student
+from app.db.models import User, Certificate, CertificateSummary, ExtractedField, ProcessingJob, Student
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -40,6 +40,9 @@ def clear_all_users():
             deleted_fields = db_session.query(ExtractedField).delete(synchronize_session=False)
             logger.info(f"Deleted {deleted_fields} extracted fields")
             
+            db_session.query(ProcessingJob).delete(synchronize_session=False)
+            db_session.query(CertificateSummary).delete(synchronize_session=False)
+            
             logger.info("Deleting certificates...")
             deleted_certs = db_session.query(Certificate).delete(synchronize_session=False)
             logger.info(f"Deleted {deleted_certs} certificates")
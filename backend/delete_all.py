@@ -41,6 +41,9 @@ if 'certificates' in tables:
             if 'extracted_fields' in tables:
                 cursor.execute('DELETE FROM extracted_fields')
                 print(f"Deleted extracted fields")
+            if 'processing_jobs' in tables:
+                cursor.execute('DELETE FROM processing_jobs')
+                print(f"Deleted processing jobs")
             
             # Delete certificates
             cursor.execute('DELETE FROM certificates')
@@ -36,6 +36,14 @@ def delete_all_certificates():
                 except Exception as e:
                     logger.warning(f"Could not delete extracted_fields: {str(e)}")
                 
+                try:
+                    # Processing jobs reference certificates too
+                    logger.info("Deleting all processing jobs...")
+                    result = conn.execute(text("DELETE FROM processing_jobs;"))
+                    logger.info(f"Deleted {result.rowcount} processing job records")
+                except Exception as e:
+                    logger.warning(f"Could not delete processing_jobs: {str(e)}")
+                
                 try:
                     # Delete all certificates
                     logger.info("Deleting all certificates...")
@@ -8,7 +8,8 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from app.db.session import db_session, init_engine, Base, get_engine
+from app.db.session import db_session, init_engine, get_engine
+from app.db.migrations import migrate
 from app.db.models import Student, User
 from app.core.config import settings
 import logging
@@ -22,12 +23,9 @@ def init_university_data():
         # Initialize database engine and create tables
         init_engine(settings.DB_URL)
         
-        # Import models to ensure they are registered with Base
-        from app.db import models
-        
-        # Create all tables
-        Base.metadata.create_all(bind=get_engine())
-        logger.info("Database tables created/verified")
+        # Bring the schema up to date
+        migrate(get_engine())
+        logger.info("Database schema migrated")
         # Sample university certificates data for verification
         sample_students = [
             {
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+Issue a long-lived API token for a service account.
+
+The university portal uses one (VERIFIER_TOKEN) to call the verification
+cache invalidation endpoint, which only accepts university or admin tokens.
+"""
+import argparse
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.core.constants import UserType
+from app.services.auth import generate_token
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--username", default="university-portal", help="name recorded in the token and in logs")
+    parser.add_argument("--user-type", default=UserType.UNIVERSITY, choices=[UserType.UNIVERSITY, UserType.ADMIN])
+    parser.add_argument("--days", type=int, default=365, help="validity in days (default: 365)")
+    args = parser.parse_args()
+
+    # user_id 0: not a row in users, the token only carries a role
+    print(generate_token(0, args.user_type, args.username, expires_in=timedelta(days=args.days)))
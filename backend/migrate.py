@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Apply pending database schema migrations.
+
+Run at deploy time, before starting the web and worker processes; they only
+check that the schema is current and refuse to start otherwise.
+"""
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.core.config import settings
+from app.db.session import init_engine, get_engine
+from app.db.migrations import MIGRATIONS, LATEST_VERSION, current_version, migrate
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--status", action="store_true", help="show applied/pending migrations and exit")
+    parser.add_argument("--target", type=int, help="stop after this version (default: latest)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    init_engine(settings.DB_URL)
+    engine = get_engine()
+
+    if args.status:
+        version = current_version(engine)
+        for number, name, _ in MIGRATIONS:
+            print(f"{'applied' if number <= version else 'pending'}  {number:3d}  {name}")
+        print(f"Schema version {version} of {LATEST_VERSION}")
+        sys.exit(0)
+
+    applied = migrate(engine, target=args.target)
+    if applied:
+        print(f"✅ Applied migrations {', '.join(map(str, applied))}; schema at version {applied[-1]}")
+    else:
+        print(f"✅ Schema already at version {current_version(engine)}")
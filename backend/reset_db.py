@@ -7,8 +7,10 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from db.session import get_engine, init_engine, Base
-from core.config import settings
+from app.db import models  # noqa: F401  registers every table on Base.metadata
+from app.db.session import Base, get_engine, init_engine
+from app.db.migrations import SCHEMA_VERSION_TABLE, migrate
+from app.core.config import settings
 from sqlalchemy import text
 import logging
 
@@ -22,31 +24,17 @@ def reset_database():
         init_engine(settings.DB_URL)
         engine = get_engine()
         
-        with engine.connect() as conn:
-            # Start transaction
-            trans = conn.begin()
-            
-            try:
-                # Drop all tables
-                logger.info("Dropping all tables...")
-                conn.execute(text("DROP TABLE IF EXISTS extracted_fields CASCADE;"))
-                conn.execute(text("DROP TABLE IF EXISTS certificates CASCADE;"))
-                conn.execute(text("DROP TABLE IF EXISTS students CASCADE;"))
-                conn.execute(text("DROP TABLE IF EXISTS users CASCADE;"))
-                
-                # Commit the drops
-                trans.commit()
-                logger.info("All tables dropped successfully")
-                
-            except Exception as e:
-                trans.rollback()
-                logger.error(f"Error dropping tables: {str(e)}")
-                raise
+        # Drop every model table (in dependency order) plus the migration
+        # bookkeeping, so nothing stale attaches to recreated certificate ids
+        logger.info("Dropping all tables...")
+        with engine.begin() as conn:
+            Base.metadata.drop_all(bind=conn)
+            conn.execute(text(f"DROP TABLE IF EXISTS {SCHEMA_VERSION_TABLE}"))
+        logger.info("All tables dropped successfully")
         
-        # Now recreate all tables using SQLAlchemy
+        # Now recreate all tables by replaying the migrations
         logger.info("Creating all tables...")
-        from db import models  # Import all models
-        Base.metadata.create_all(bind=engine)
+        migrate(engine)
         logger.info("All tables created successfully!")
         
     except Exception as e:
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Re-verify stored certificates against the university portal.
+
+Walks every certificate (or only the mismatches with --scope mismatch) in
+id-ordered chunks, committing each chunk's results together with the run's
+cursor. Ctrl+C or SIGTERM finishes the current chunk and leaves the run
+'interrupted'; pass its id to --resume to continue where it stopped.
+"""
+import argparse
+import logging
+import signal
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.core.config import settings
+from app.db.session import init_engine, get_engine, get_db_session
+from app.db.migrations import check_schema_version
+from app.services.reverify import (
+    SCOPES, ReverifyRunActive, create_reverify_run, claim_for_resume, execute_reverify_run
+)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scope", choices=SCOPES, default="all")
+    parser.add_argument("--resume", metavar="RUN_ID", help="continue an interrupted or failed run")
+    parser.add_argument("--chunk-size", type=int, default=settings.REVERIFY_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=settings.REVERIFY_WORKERS,
+                        help="portal batch requests in flight at once")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    init_engine(settings.DB_URL)
+    check_schema_version(get_engine())
+
+    try:
+        with get_db_session() as session:
+            if args.resume:
+                run = claim_for_resume(session, args.resume)
+                if run is None:
+                    sys.exit(f"❌ No re-verification run {args.resume}")
+            else:
+                run = create_reverify_run(session, args.scope)
+            run_id, total, processed = run.id, run.total, run.processed
+    except ReverifyRunActive as e:
+        sys.exit(f"❌ Run {e} is still in progress")
+    except ValueError as e:
+        sys.exit(f"❌ {e}")
+
+    stop = threading.Event()
+
+    def request_stop(signum, frame):
+        print("Stopping after the current chunk...")
+        stop.set()
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+
+    print(f"Run {run_id}: {processed}/{total} certificates done")
+    progress = execute_reverify_run(run_id, chunk_size=args.chunk_size, max_workers=args.workers, stop=stop)
+    print(f"{'✅' if progress['status'] == 'completed' else '⏸'} Run {run_id} {progress['status']}: "
+          f"{progress['processed']}/{progress['total']} certificates, {progress['counts']}")
+    if progress['error']:
+        print(f"   {progress['error']}")
+    if progress['status'] != 'completed':
+        print(f"Resume with: python reverify_all.py --resume {run_id}")
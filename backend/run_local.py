@@ -13,6 +13,7 @@ sys.path.insert(0, str(Path(__file__).parent))
 os.environ.setdefault('DB_URL', 'sqlite:///./university.db')
 os.environ.setdefault('UPLOAD_DIR', './uploads')
 os.environ.setdefault('LOG_LEVEL', 'DEBUG')
+os.environ.setdefault('AUTO_MIGRATE', 'true')
 
 # Import and run the app
 from app.main import create_app
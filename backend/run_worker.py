@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Standalone certificate processing worker.
+
+Drains the database-backed job queue without serving HTTP. Useful when the
+web processes run with JOB_WORKERS=0 and processing is scaled separately.
+"""
+import signal
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.core.config import settings
+from app.db.session import init_engine, get_engine
+from app.db.migrations import check_schema_version
+from app.services.jobs import start_worker_pool
+
+if __name__ == "__main__":
+    init_engine(settings.DB_URL)
+    check_schema_version(get_engine())
+
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else max(settings.JOB_WORKERS, 1)
+    pool = start_worker_pool(size)
+    print(f"Processing worker running with {size} threads (Ctrl+C to stop)")
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    try:
+        stop.wait()
+    except KeyboardInterrupt:
+        pass
+    pool.stop(timeout=30)
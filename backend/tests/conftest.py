@@ -0,0 +1,24 @@
+import os
+import sys
+from pathlib import Path
+
+# Settings are read at import time: point the app at a private in-memory
+# database and keep the job workers from starting before anything imports it
+os.environ["DB_URL"] = "sqlite://"
+os.environ["AUTO_MIGRATE"] = "true"
+os.environ["JOB_WORKERS"] = "0"
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def app():
+    from app.main import app as flask_app
+    return flask_app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,40 @@
+"""
+The admin "delete all certificates" endpoint must respect every foreign key
+to certificates, as PostgreSQL enforces them.
+"""
+import pytest
+from sqlalchemy import text
+
+from app.core.constants import CertificateStatus
+from app.db.models import Certificate, CertificateSummary, ExtractedField, ProcessingJob
+from app.db.session import db_session, get_db_session, get_engine
+
+
+@pytest.fixture
+def enforced_foreign_keys(app):
+    # SQLite only checks foreign keys when asked to; the in-memory test database is one connection
+    db_session.remove()
+    with get_engine().connect() as conn:
+        conn.execute(text("PRAGMA foreign_keys = ON"))
+    yield
+    db_session.remove()
+    with get_engine().connect() as conn:
+        conn.execute(text("PRAGMA foreign_keys = OFF"))
+
+
+def test_delete_all_certificates_removes_their_jobs(client, enforced_foreign_keys):
+    with get_db_session() as session:
+        cert = Certificate(image_path="/tmp/cert.png", status=CertificateStatus.COMPLETED)
+        session.add(cert)
+        session.flush()
+        session.add_all([
+            ExtractedField(certificate_id=cert.id, key="student_name", value="Student", confidence=0.9),
+            CertificateSummary(certificate_id=cert.id, simple_status="verified"),
+            ProcessingJob(certificate_id=cert.id, status=CertificateStatus.COMPLETED),
+        ])
+
+    response = client.delete("/api/v1/admin/delete-all-certificates")
+    assert response.status_code == 200
+    with get_db_session() as session:
+        for model in (Certificate, ExtractedField, CertificateSummary, ProcessingJob):
+            assert session.query(model).count() == 0
@@ -0,0 +1,73 @@
+"""
+Batch uploads must not leave stored files behind when the batch is
+rejected, and must report items in the order they were submitted.
+"""
+import io
+import zipfile
+
+import pytest
+from PIL import Image
+
+from app.core.config import settings
+from app.db.models import Certificate, ProcessingJob, UploadBatch, UploadBatchItem
+from app.db.session import get_db_session
+
+BATCH_URL = "/api/v1/certificates/batch"
+
+
+@pytest.fixture(autouse=True)
+def upload_dir(app, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "BATCH_MAX_FILES", 3)
+    yield tmp_path
+    with get_db_session() as session:
+        for model in (UploadBatchItem, UploadBatch, ProcessingJob, Certificate):
+            session.query(model).delete()
+
+
+def png(color):
+    buf = io.BytesIO()
+    Image.new('RGB', (40, 40), color).save(buf, 'PNG')
+    return buf.getvalue()
+
+
+def archive(**members):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, 'w') as zf:
+        for name, data in members.items():
+            zf.writestr(name, data)
+    return buf.getvalue()
+
+
+def upload(client, *files):
+    return client.post(BATCH_URL, data={"files": [(io.BytesIO(data), name) for name, data in files]},
+                       content_type="multipart/form-data")
+
+
+def test_oversized_batch_stores_nothing(client, upload_dir):
+    response = upload(client, ("a.png", png("red")), ("b.png", png("blue")),
+                      ("more.zip", archive(**{"c.png": png("green"), "d.png": png("navy")})))
+    assert response.status_code == 413
+    assert list(upload_dir.iterdir()) == []
+
+
+def test_failed_insert_removes_stored_files(client, upload_dir, monkeypatch):
+    def broken(*args):
+        raise RuntimeError("database went away")
+
+    monkeypatch.setattr("app.services.batches._insert_batch", broken)
+    response = upload(client, ("a.png", png("red")), ("b.png", png("blue")))
+    assert response.status_code == 500
+    assert list(upload_dir.iterdir()) == []
+
+
+def test_items_keep_submission_order(client):
+    response = upload(client, ("notes.txt", b"not a certificate"), ("a.png", png("red")),
+                      ("broken.zip", b"not a zip"))
+    assert response.status_code == 202
+    items = response.json["items"]
+    assert [item["filename"] for item in items] == ["notes.txt", "a.png", "broken.zip"]
+    assert [item["error"] is None for item in items] == [False, True, False]
+
+    progress = client.get(response.json["status_url"]).json
+    assert [item["filename"] for item in progress["items"]] == ["notes.txt", "a.png", "broken.zip"]
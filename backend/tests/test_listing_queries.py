@@ -0,0 +1,93 @@
+"""
+Query-count regression tests for the certificate listings: a page must cost
+the same number of statements whether it holds one certificate or many.
+"""
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from app.core.constants import CertificateStatus
+from app.db.models import Certificate, CertificateSummary, ExtractedField
+from app.db.session import db_session, get_db_session, get_engine
+from app.services.summary import backfill_summaries
+
+PAGE_SIZE = 10
+LISTINGS = ["/api/v1/certificates", "/api/v1/certificates/my-certificates"]
+
+
+@pytest.fixture(autouse=True)
+def certificates(app):
+    with get_db_session() as session:
+        for i in range(PAGE_SIZE):
+            cert = Certificate(image_path=f"/tmp/cert-{i}.png", status=CertificateStatus.COMPLETED)
+            session.add(cert)
+            session.flush()
+            session.add_all([
+                ExtractedField(certificate_id=cert.id, key="student_name", value=f"Student {i}", confidence=0.9),
+                ExtractedField(certificate_id=cert.id, key="enrollment_number", value=f"231B{i:03d}", confidence=0.9),
+                ExtractedField(certificate_id=cert.id, key="cgpa", value="8.5", confidence=0.9),
+                ExtractedField(certificate_id=cert.id, key="summary", value=f"Summary {i}", confidence=0.9),
+            ])
+        session.commit()
+        backfill_summaries(session)
+    yield
+    with get_db_session() as session:
+        for model in (CertificateSummary, ExtractedField, Certificate):
+            session.query(model).delete()
+
+
+@contextmanager
+def count_queries():
+    counter = {"n": 0}
+
+    def before_cursor_execute(*args):
+        counter["n"] += 1
+
+    db_session.remove()  # Start from a fresh session, like a new request
+    event.listen(get_engine(), "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(get_engine(), "before_cursor_execute", before_cursor_execute)
+
+
+def page_queries(client, path: str, limit: int, **filters) -> int:
+    with count_queries() as counter:
+        response = client.get(path, query_string={"limit": limit, **filters})
+    assert response.status_code == 200
+    assert response.json["count"] == limit
+    return counter["n"]
+
+
+@pytest.mark.parametrize("path", LISTINGS)
+def test_page_query_count_does_not_grow_with_page_size(client, path):
+    assert page_queries(client, path, 1) == page_queries(client, path, PAGE_SIZE)
+
+
+@pytest.mark.parametrize("path", LISTINGS)
+def test_page_without_summaries_loads_fields_in_one_batch(client, path):
+    # Certificates not backfilled yet are summarized from their fields
+    with get_db_session() as session:
+        session.query(CertificateSummary).delete()
+    assert page_queries(client, path, 1) == page_queries(client, path, PAGE_SIZE)
+
+
+def test_filtered_page_query_count_does_not_grow_with_page_size(client):
+    filters = {"cgpa_min": 8, "enrollment_prefix": "231B"}
+    path = "/api/v1/certificates"
+    assert page_queries(client, path, 1, **filters) == page_queries(client, path, PAGE_SIZE, **filters)
+
+
+@pytest.mark.parametrize("path", LISTINGS)
+@pytest.mark.parametrize("params", [{"limit": 0}, {"limit": -1}, {"offset": -1}])
+def test_out_of_range_page_parameters_are_rejected(client, path, params):
+    response = client.get(path, query_string=params)
+    assert response.status_code == 400
+    assert "error" in response.json
+
+
+def test_large_limit_is_capped(client):
+    response = client.get("/api/v1/certificates", query_string={"limit": 1000})
+    assert response.status_code == 200
+    assert response.json["limit"] == 100
@@ -0,0 +1,98 @@
+"""
+At most one re-verification run per scope may be running, even when two
+starts race past the application-level check.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.core.constants import CertificateStatus, ReverifyRunStatus
+from app.db.models import Certificate, CertificateSummary, ExtractedField, ReverifyRun
+from app.db.session import get_db_session
+from app.services import university
+from app.services.reverify import (
+    ReverifyRunActive, claim_for_resume, create_reverify_run, execute_reverify_run
+)
+
+
+@pytest.fixture(autouse=True)
+def no_runs(app):
+    yield
+    with get_db_session() as session:
+        for model in (ReverifyRun, CertificateSummary, ExtractedField, Certificate):
+            session.query(model).delete()
+
+
+def running_run(session, run_id, updated_at=None):
+    run = ReverifyRun(id=run_id, scope='all', status=ReverifyRunStatus.RUNNING, counts={},
+                      updated_at=updated_at or datetime.utcnow())
+    session.add(run)
+    session.flush()
+    return run
+
+
+def test_database_rejects_a_second_running_run_of_a_scope():
+    with get_db_session() as session:
+        running_run(session, 'first')
+    with pytest.raises(IntegrityError):
+        with get_db_session() as session:
+            running_run(session, 'second')
+
+
+def test_lost_race_surfaces_as_active_run(monkeypatch):
+    with get_db_session() as session:
+        running_run(session, 'winner')
+    # The other start committed after our check ran: only the index catches it
+    monkeypatch.setattr('app.services.reverify._take_scope', lambda *args: None)
+    with pytest.raises(ReverifyRunActive) as raised:
+        with get_db_session() as session:
+            create_reverify_run(session, 'all')
+    assert str(raised.value) == 'winner'
+
+
+def test_stale_run_is_superseded():
+    stale_at = datetime.utcnow() - timedelta(seconds=settings.JOB_STALE_AFTER + 60)
+    with get_db_session() as session:
+        running_run(session, 'stale', updated_at=stale_at)
+    with get_db_session() as session:
+        new_id = create_reverify_run(session, 'all').id
+    with get_db_session() as session:
+        assert session.get(ReverifyRun, 'stale').status == ReverifyRunStatus.INTERRUPTED
+        assert session.get(ReverifyRun, new_id).status == ReverifyRunStatus.RUNNING
+        # Resuming the superseded run must not steal the scope back from a live one
+        with pytest.raises(ReverifyRunActive):
+            claim_for_resume(session, 'stale')
+
+
+def test_portal_outage_interrupts_the_run_before_the_unanswered_chunk(monkeypatch):
+    with get_db_session() as session:
+        for i in range(5):
+            cert = Certificate(image_path=f"/tmp/cert-{i}.png", status=CertificateStatus.COMPLETED)
+            session.add(cert)
+            session.flush()
+            session.add_all([
+                ExtractedField(certificate_id=cert.id, key="student_name", value=f"Student {i}", confidence=0.9),
+                ExtractedField(certificate_id=cert.id, key="enrollment_number", value=f"231B{i:03d}", confidence=0.9),
+            ])
+        run_id = create_reverify_run(session, 'all').id
+
+    monkeypatch.setattr(university.portal_breaker, "allow_request", lambda: False)
+    progress = execute_reverify_run(run_id, chunk_size=2)
+    assert progress["status"] == ReverifyRunStatus.INTERRUPTED
+    assert progress["processed"] == 0 and progress["last_certificate_id"] == 0
+    assert progress["counts"] == {}
+    assert "unavailable" in progress["error"]
+
+    # Back up: the resumed run verifies everything it could not before
+    monkeypatch.undo()
+    monkeypatch.setattr(university, "_request_batch_verification", lambda pairs: [
+        {"verification_attempted": True, "student_verified": True, "confidence_score": 1.0} for _ in pairs
+    ])
+    with get_db_session() as session:
+        claim_for_resume(session, run_id)
+    progress = execute_reverify_run(run_id, chunk_size=2)
+    assert progress["status"] == ReverifyRunStatus.COMPLETED
+    assert progress["processed"] == 5
+    assert "skipped" not in progress["counts"]
@@ -0,0 +1,67 @@
+"""
+Batched upserts must stay under SQLite's bound-variable limit however many
+rows the caller hands over (reverify chunks grow with REVERIFY_CHUNK_SIZE).
+"""
+import sqlite3
+
+import pytest
+from sqlalchemy import event
+
+from app.core.constants import CertificateStatus
+from app.db.models import Certificate, ExtractedField
+from app.db.session import UPSERT_MAX_PARAMETERS, get_db_session, get_engine
+from app.services.pipeline import upsert_fields
+
+ROWS = 1000
+# The oldest limit SQLite ships with; this sqlite3 may allow far more
+OLD_SQLITE_VARIABLE_LIMIT = 999
+
+
+@pytest.fixture
+def certificate_id(app):
+    with get_db_session() as session:
+        cert = Certificate(image_path="/tmp/cert.png", status=CertificateStatus.COMPLETED)
+        session.add(cert)
+        session.flush()
+        cert_id = cert.id
+    yield cert_id
+    with get_db_session() as session:
+        session.query(ExtractedField).delete()
+        session.query(Certificate).delete()
+
+
+@pytest.fixture
+def old_sqlite_variable_limit(app):
+    with get_engine().connect() as conn:
+        dbapi_connection = conn.connection.dbapi_connection
+        previous = dbapi_connection.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, OLD_SQLITE_VARIABLE_LIMIT)
+    yield
+    with get_engine().connect() as conn:
+        conn.connection.dbapi_connection.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, previous)
+
+
+def test_large_field_upsert_is_split_under_the_variable_limit(certificate_id, old_sqlite_variable_limit):
+    rows = [
+        dict(certificate_id=certificate_id, key=f"field_{i}", value=str(i), confidence=1.0, field_type="verification")
+        for i in range(ROWS)
+    ]
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO extracted_fields"):
+            statements.append(statement)
+
+    event.listen(get_engine(), "before_cursor_execute", count)
+    try:
+        with get_db_session() as session:
+            upsert_fields(session, rows)
+            # Second pass takes the ON CONFLICT DO UPDATE path
+            upsert_fields(session, [dict(row, value="updated") for row in rows])
+    finally:
+        event.remove(get_engine(), "before_cursor_execute", count)
+
+    per_statement = UPSERT_MAX_PARAMETERS // len(rows[0])
+    assert len(statements) == 2 * -(-ROWS // per_statement)
+    with get_db_session() as session:
+        values = {value for (value,) in session.query(ExtractedField.value)}
+    assert values == {"updated"}
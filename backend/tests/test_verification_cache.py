@@ -0,0 +1,85 @@
+"""
+Verification cache invalidation must reach every process, not only the one
+that served the invalidation request.
+"""
+import pytest
+from sqlalchemy import update
+
+from app.core.constants import UserType
+from app.db.models import CacheGeneration
+from app.db.session import get_db_session
+from app.services import verification_cache
+from app.services.auth import generate_token
+
+KEY = verification_cache.make_verification_key("231B001", "Student One")
+RESULT = {"verification_attempted": True, "student_verified": True, "university_match": {}}
+ENDPOINT = "/api/v1/verification/cache/invalidate"
+
+
+@pytest.fixture(autouse=True)
+def warm_cache(app):
+    verification_cache.sync_invalidations()
+    verification_cache.store_verification(KEY, RESULT)
+    assert verification_cache.get_cached_verification(KEY) == RESULT
+
+
+def bump_generation_elsewhere():
+    # What invalidate_verifications() in another worker process leaves behind
+    with get_db_session() as session:
+        session.execute(
+            update(CacheGeneration)
+            .where(CacheGeneration.name == verification_cache.CACHE_NAME)
+            .values(generation=CacheGeneration.generation + 1)
+        )
+
+
+def test_invalidation_in_another_process_drops_local_entries():
+    verification_cache.sync_invalidations()
+    assert verification_cache.get_cached_verification(KEY) == RESULT
+
+    bump_generation_elsewhere()
+    verification_cache.sync_invalidations()
+    assert verification_cache.get_cached_verification(KEY) is None
+
+
+def test_invalidate_endpoint_requires_university_or_admin(client):
+    assert client.post(ENDPOINT).status_code == 401
+
+    student = generate_token(1, UserType.STUDENT, "student")
+    response = client.post(ENDPOINT, headers={"Authorization": f"Bearer {student}"})
+    assert response.status_code == 403
+    assert verification_cache.get_cached_verification(KEY) == RESULT
+
+
+def test_invalidate_endpoint_bumps_shared_generation(client):
+    before = verification_cache.verification_cache_stats()["generation"]
+    portal = generate_token(0, UserType.UNIVERSITY, "university-portal")
+    response = client.post(ENDPOINT, json={"enrollment_number": "231B001"},
+                           headers={"Authorization": f"Bearer {portal}"})
+    assert response.status_code == 200
+    assert verification_cache.get_cached_verification(KEY) is None
+
+    with get_db_session() as session:
+        generation = session.get(CacheGeneration, verification_cache.CACHE_NAME).generation
+    assert generation == before + 1
+
+
+def test_refresh_asks_the_portal_and_stores_its_answer(monkeypatch):
+    from app.services import university
+
+    fresh = {"verification_attempted": True, "student_verified": False, "message": "Not found"}
+    asked = []
+
+    def portal(pairs):
+        asked.extend(pairs)
+        return [dict(fresh) for _ in pairs]
+
+    monkeypatch.setattr(university, "_request_batch_verification", portal)
+    items = [{"student_name": "Student One", "enrollment_number": "231B001"}]
+
+    assert university.verify_certificates_with_university(items) == [RESULT]
+    assert asked == []
+
+    assert university.verify_certificates_with_university(items, use_cache=False) == [fresh]
+    assert asked == [("Student One", "231B001")]
+    assert verification_cache.get_cached_verification(KEY) == fresh
@@ -1,10 +1,12 @@
 ﻿from app.db.session import init_engine, db_session
 from app.core.config import settings
-from app.db.models import Certificate, ExtractedField
+from app.db.models import Certificate, CertificateSummary, ExtractedField, ProcessingJob
 
 init_engine(settings.DB_URL)
 
 # Delete child rows first to avoid FK violations
+db_session.query(ProcessingJob).delete(synchronize_session=False)
+db_session.query(CertificateSummary).delete(synchronize_session=False)
 fe = db_session.query(ExtractedField).delete(synchronize_session=False)
 fc = db_session.query(Certificate).delete(synchronize_session=False)
 db_session.commit()
@@ -22,9 +22,11 @@ import argparse
 sys.path.insert(0, str(Path(__file__).parent / 'backend'))
 
 # Import backend modules
-from backend.app.services.extract import extract_fields_with_ai, generate_ai_summary
+from backend.app.services.extract import extract_and_summarize
 from backend.app.services.ocr import run_ocr
 from backend.app.core.config import settings
+# Same module instance run_ocr uses internally, so the counters are shared
+from app.services.ocr_cache import ocr_cache_stats
 
 class CertificateDataExtractor:
     """Enhanced certificate data extractor with tabular export capabilities."""
@@ -40,14 +42,11 @@ class CertificateDataExtractor:
         try:
             print(f"Processing: {file_path.name}")
             
-            # Run OCR to extract text
+            # Run OCR to extract text (served from the OCR cache on re-runs)
             ocr_text = run_ocr(file_path)
             
-            # Extract fields using AI
-            extracted_fields = extract_fields_with_ai(ocr_text)
-            
-            # Generate summary
-            summary = generate_ai_summary(extracted_fields)
+            # Extract fields and summary using AI (one call unless AI_COMBINED_EXTRACTION=false)
+            extracted_fields, summary = extract_and_summarize(ocr_text)
             
             # Format subjects for better display
             subjects_formatted = []
@@ -472,6 +471,10 @@ def main():
         extractor.export_to_html()
     
     print(f"\nAll exports saved to: {extractor.output_dir}")
+    
+    stats = ocr_cache_stats()
+    if stats.get("enabled"):
+        print(f"OCR cache: {stats['hits']} hits, {stats['misses']} misses")
 
 
 if __name__ == "__main__":
@@ -20,9 +20,21 @@ export default function Upload() {
       const res = await api.post("/certificates/upload", form, {
         headers: { "Content-Type": "multipart/form-data" },
       });
-      setResult(res.data);
+      // Processing runs in the background; poll until the job finishes
+      const certId = res.data.id;
+      let status = res.data.status;
+      while (status === "pending" || status === "processing") {
+        await new Promise((resolve) => setTimeout(resolve, 1500));
+        const statusRes = await api.get(`/certificates/${certId}/status`);
+        status = statusRes.data.status;
+        if (status === "failed") {
+          throw new Error(statusRes.data.job?.error || "Processing failed");
+        }
+      }
+      const detail = await api.get(`/certificates/${certId}`);
+      setResult(detail.data);
     } catch (err) {
-      const errorMessage = err?.response?.data?.error || "Upload failed";
+      const errorMessage = err?.response?.data?.error || err?.message || "Upload failed";
       setError(errorMessage);
     } finally {
       setLoading(false);
@@ -3,60 +3,25 @@
 Script to add a certificate to the university database
 """
 
-import json
 import os
+import sys
 from datetime import datetime
 
-# Database file path
-import os
+# Database file path; DB_FILE, STORAGE_BACKEND and SQLITE_DB_FILE as for the portal
 script_dir = os.path.dirname(os.path.abspath(__file__))
-DB_FILE = os.path.join(script_dir, 'database', 'certificates.json')
+DB_FILE = os.environ.get('DB_FILE', os.path.join(script_dir, 'database', 'certificates.json'))
 
-def load_certificates():
-    """Load certificates from database"""
-    try:
-        with open(DB_FILE, 'r') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Error loading certificates: {e}")
-        return {"certificates": [], "metadata": {}}
+# Same store factory as the portal, so certificates land where it reads them
+# and ids come from the same persisted counter
+sys.path.insert(0, os.path.join(script_dir, 'backend'))
+from store import create_store
 
-def save_certificates(data):
-    """Save certificates to database"""
-    try:
-        with open(DB_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
-        return True
-    except Exception as e:
-        print(f"Error saving certificates: {e}")
-        return False
-
-def generate_certificate_id(certificates):
-    """Generate next certificate ID"""
-    if not certificates:
-        return "JUET001"
-    
-    max_id = 0
-    for cert in certificates:
-        cert_id = cert.get('id', '')
-        if cert_id.startswith('JUET'):
-            try:
-                num = int(cert_id[4:])
-                max_id = max(max_id, num)
-            except ValueError:
-                continue
-    
-    return f"JUET{str(max_id + 1).zfill(3)}"
+store = create_store(DB_FILE)
 
 def add_certificate(student_name, enrollment_number, branch, academic_year, cgpa="N/A", status="Active"):
     """Add a new certificate to the database"""
     
-    # Load existing data
-    data = load_certificates()
-    certificates = data.get("certificates", [])
-    
     # Generate certificate data
-    cert_id = generate_certificate_id(certificates)
     current_time = datetime.utcnow().isoformat() + 'Z'
     
     # Extract branch abbreviation
@@ -75,45 +40,34 @@ def add_certificate(student_name, enrollment_number, branch, academic_year, cgpa
     except:
         year = '2024'
     
-    cert_number = f"JUET/{branch_abbrev}/{year}/{cert_id[4:]}"
-    
-    new_certificate = {
-        "id": cert_id,
-        "student_name": student_name.strip(),
-        "enrollment_number": enrollment_number.strip(),
-        "registration_number": f"REG{year}{cert_id[4:]}",
-        "degree": "Bachelor of Technology",
-        "branch": branch,
-        "university": "Jaypee University of Engineering & Technology",
-        "graduation_date": f"{year}-06-15",
-        "cgpa": str(cgpa),
-        "academic_year": academic_year,
-        "certificate_type": "Degree Certificate",
-        "issue_date": current_time[:10],
-        "certificate_number": cert_number,
-        "status": status,
-        "upload_timestamp": current_time
-    }
-    
-    # Add the new certificate
-    certificates.append(new_certificate)
-    
-    # Update metadata
-    metadata = data.get("metadata", {})
-    metadata['total_certificates'] = len(certificates)
-    metadata['last_updated'] = current_time
-    
-    data['certificates'] = certificates
-    data['metadata'] = metadata
+    def build_certificate(cert_id):
+        return {
+            "id": cert_id,
+            "student_name": student_name.strip(),
+            "enrollment_number": enrollment_number.strip(),
+            "registration_number": f"REG{year}{cert_id[4:]}",
+            "degree": "Bachelor of Technology",
+            "branch": branch,
+            "university": "Jaypee University of Engineering & Technology",
+            "graduation_date": f"{year}-06-15",
+            "cgpa": str(cgpa),
+            "academic_year": academic_year,
+            "certificate_type": "Degree Certificate",
+            "issue_date": current_time[:10],
+            "certificate_number": f"JUET/{branch_abbrev}/{year}/{cert_id[4:]}",
+            "status": status,
+            "upload_timestamp": current_time
+        }
     
-    # Save to file
-    if save_certificates(data):
+    # Add the new certificate and save to file
+    new_certificate = store.add(build_certificate, {'last_updated': current_time})
+    if new_certificate:
         print(f"✅ Certificate added successfully!")
-        print(f"   Certificate ID: {cert_id}")
-        print(f"   Certificate Number: {cert_number}")
+        print(f"   Certificate ID: {new_certificate['id']}")
+        print(f"   Certificate Number: {new_certificate['certificate_number']}")
         print(f"   Student: {student_name}")
         print(f"   Enrollment: {enrollment_number}")
-        print(f"   Total certificates in DB: {len(certificates)}")
+        print(f"   Total certificates in DB: {len(store.all()[0])}")
         return True
     else:
         print("❌ Failed to save certificate to database")
@@ -4,7 +4,11 @@ import json
 import os
 from datetime import datetime
 import logging
+import threading
+import urllib.request
+import uuid
 from werkzeug.utils import secure_filename
+from store import create_store
 
 app = Flask(__name__)
 CORS(app)
@@ -65,41 +69,38 @@ if not os.path.exists(DB_FILE):
     except Exception as e:
         logger.error(f"Could not initialize database: {e}")
 
-# Load certificate database
-def load_certificates():
-    try:
-        with open(DB_FILE, 'r') as f:
-            return json.load(f)
-    except Exception as e:
-        logger.error(f"Error loading certificates: {e}")
-        return {"certificates": [], "metadata": {}}
+# Backend endpoint that drops its cached verification results, e.g.
+# http://backend:5000/api/v1/verification/cache/invalidate (unset = no notification)
+VERIFIER_INVALIDATE_URL = os.environ.get('VERIFIER_INVALIDATE_URL')
+# University-role token for that endpoint, minted with the backend's issue_service_token.py
+VERIFIER_TOKEN = os.environ.get('VERIFIER_TOKEN')
 
-# Save certificate database
-def save_certificates(data):
-    try:
-        with open(DB_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
-        return True
-    except Exception as e:
-        logger.error(f"Error saving certificates: {e}")
-        return False
+def notify_verifier(certificate=None):
+    """Tell the verifier backend its cached answers are stale: a certificate was added, or the data reloaded."""
+    if not VERIFIER_INVALIDATE_URL:
+        return
+    certificate = certificate or {}
+    payload = json.dumps({
+        "enrollment_number": certificate.get("enrollment_number"),
+        "student_name": certificate.get("student_name"),
+    }).encode()
+    headers = {'Content-Type': 'application/json'}
+    if VERIFIER_TOKEN:
+        headers['Authorization'] = f"Bearer {VERIFIER_TOKEN}"
 
-# Generate next certificate ID
-def generate_certificate_id(certificates):
-    if not certificates:
-        return "JUET001"
-    
-    max_id = 0
-    for cert in certificates:
-        cert_id = cert.get('id', '')
-        if cert_id.startswith('JUET'):
-            try:
-                num = int(cert_id[4:])  # Extract number after 'JUET'
-                max_id = max(max_id, num)
-            except ValueError:
-                continue
-    
-    return f"JUET{str(max_id + 1).zfill(3)}"
+    def send():
+        try:
+            req = urllib.request.Request(VERIFIER_INVALIDATE_URL, data=payload, headers=headers, method='POST')
+            urllib.request.urlopen(req, timeout=5).close()
+        except Exception as e:
+            logger.warning(f"Could not notify verifier of certificate changes: {e}")
+
+    # Best effort and off the request path; the backend's cache TTL covers a lost notification
+    threading.Thread(target=send, daemon=True).start()
+
+# The JSON file may be edited or replaced out of band; re-reading it means
+# any record may have changed, so the verifier drops everything it cached
+store = create_store(DB_FILE, on_reload=lambda: notify_verifier())
 
 @app.route('/')
 def home():
@@ -145,6 +146,7 @@ def info():
                     <div class="endpoint"><strong>POST</strong> /api/certificates - Upload new certificate</div>
                     <div class="endpoint"><strong>GET</strong> /api/certificates/&lt;enrollment&gt; - Get certificate by enrollment</div>
                     <div class="endpoint"><strong>POST</strong> /api/verify - Verify certificate data</div>
+                    <div class="endpoint"><strong>POST</strong> /api/verify/batch - Verify many certificates in one request</div>
                     <div class="endpoint"><strong>GET</strong> /api/stats - Get university statistics</div>
                     <div class="endpoint"><strong>GET</strong> /health - Health check</div>
                 </div>
@@ -170,12 +172,12 @@ def health():
 def get_all_certificates():
     """Get all certificates in the database"""
     try:
-        data = load_certificates()
+        certificates, metadata = store.all()
         return jsonify({
             "success": True,
-            "certificates": data.get("certificates", []),
-            "total": len(data.get("certificates", [])),
-            "metadata": data.get("metadata", {})
+            "certificates": certificates,
+            "total": len(certificates),
+            "metadata": metadata
         })
     except Exception as e:
         logger.error(f"Error getting certificates: {e}")
@@ -221,15 +223,10 @@ def upload_certificate():
                     "error": f"Missing required field: {field}"
                 }), 400
         
-        # Load existing data
-        data = load_certificates()
-        certificates = data.get("certificates", [])
-        
         # Get enrollment number
         enrollment = request_data['enrollment_number'].strip()
         
         # Generate certificate data
-        cert_id = generate_certificate_id(certificates)
         current_time = datetime.utcnow().isoformat() + 'Z'
         
         # Extract branch abbreviation for certificate number
@@ -248,55 +245,54 @@ def upload_certificate():
         except:
             year = '2024'
         
-        cert_number = f"JUET/{branch_abbrev}/{year}/{cert_id[4:]}"
-        
-        # Save the certificate file (if upload folder is available)
-        saved_filename = None
+        # Save the certificate file (if upload folder is available) under a
+        # temporary name; it is renamed once the store has assigned the id
+        upload_path = None
+        file_extension = None
         if UPLOAD_FOLDER:
             try:
                 filename = secure_filename(file.filename)
                 file_extension = filename.rsplit('.', 1)[1].lower()
-                saved_filename = f"{enrollment}_{cert_id}.{file_extension}"
-                file_path = os.path.join(UPLOAD_FOLDER, saved_filename)
-                file.save(file_path)
-                logger.info(f"File saved: {saved_filename}")
+                upload_path = os.path.join(UPLOAD_FOLDER, f".upload_{uuid.uuid4().hex}.{file_extension}")
+                file.save(upload_path)
             except Exception as e:
                 logger.warning(f"Could not save file: {e}. Continuing without file storage.")
-                saved_filename = None
-        
-        new_certificate = {
-            "id": cert_id,
-            "student_name": request_data['student_name'].strip(),
-            "enrollment_number": enrollment,
-            "registration_number": f"REG{year}{cert_id[4:]}",
-            "degree": "Bachelor of Technology",
-            "branch": request_data['branch'],
-            "university": "Jaypee University of Engineering & Technology",
-            "graduation_date": f"{year}-06-15",
-            "cgpa": str(request_data.get('cgpa', 'N/A')),
-            "academic_year": request_data['academic_year'],
-            "certificate_type": "Degree Certificate",
-            "issue_date": current_time[:10],
-            "certificate_number": cert_number,
-            "status": request_data['status'],
-            "upload_timestamp": current_time,
-            "certificate_file": saved_filename
-        }
-        
-        # Add the new certificate
-        certificates.append(new_certificate)
-        
-        # Update metadata
-        metadata = data.get("metadata", {})
-        metadata['total_certificates'] = len(certificates)
-        metadata['last_updated'] = current_time
-        
-        data['certificates'] = certificates
-        data['metadata'] = metadata
+                upload_path = None
+        
+        def build_certificate(cert_id):
+            return {
+                "id": cert_id,
+                "student_name": request_data['student_name'].strip(),
+                "enrollment_number": enrollment,
+                "registration_number": f"REG{year}{cert_id[4:]}",
+                "degree": "Bachelor of Technology",
+                "branch": request_data['branch'],
+                "university": "Jaypee University of Engineering & Technology",
+                "graduation_date": f"{year}-06-15",
+                "cgpa": str(request_data.get('cgpa', 'N/A')),
+                "academic_year": request_data['academic_year'],
+                "certificate_type": "Degree Certificate",
+                "issue_date": current_time[:10],
+                "certificate_number": f"JUET/{branch_abbrev}/{year}/{cert_id[4:]}",
+                "status": request_data['status'],
+                "upload_timestamp": current_time,
+                "certificate_file": f"{enrollment}_{cert_id}.{file_extension}" if upload_path else None
+            }
         
-        # Save to file
-        if save_certificates(data):
+        # Add the new certificate, update metadata and save to file
+        new_certificate = store.add(build_certificate, {'last_updated': current_time})
+        if upload_path:
+            try:
+                if new_certificate:
+                    os.replace(upload_path, os.path.join(UPLOAD_FOLDER, new_certificate['certificate_file']))
+                    logger.info(f"File saved: {new_certificate['certificate_file']}")
+                else:
+                    os.unlink(upload_path)
+            except OSError as e:
+                logger.warning(f"Could not store uploaded file: {e}")
+        if new_certificate:
             logger.info(f"Certificate added successfully: {enrollment}")
+            notify_verifier(new_certificate)
             return jsonify({
                 "success": True,
                 "message": "Certificate uploaded successfully",
@@ -330,15 +326,10 @@ def add_certificate():
                     "error": f"Missing required field: {field}"
                 }), 400
         
-        # Load existing data
-        data = load_certificates()
-        certificates = data.get("certificates", [])
-        
         # Get enrollment number
         enrollment = request_data['enrollment_number'].strip()
         
         # Generate certificate data
-        cert_id = generate_certificate_id(certificates)
         current_time = datetime.utcnow().isoformat() + 'Z'
         
         # Extract branch abbreviation for certificate number
@@ -357,40 +348,30 @@ def add_certificate():
         except:
             year = '2024'
         
-        cert_number = f"JUET/{branch_abbrev}/{year}/{cert_id[4:]}"
-        
-        new_certificate = {
-            "id": cert_id,
-            "student_name": request_data['student_name'].strip(),
-            "enrollment_number": enrollment,
-            "registration_number": f"REG{year}{cert_id[4:]}",
-            "degree": "Bachelor of Technology",
-            "branch": request_data['branch'],
-            "university": "Jaypee University of Engineering & Technology",
-            "graduation_date": f"{year}-06-15",
-            "cgpa": str(request_data.get('cgpa', 'N/A')),
-            "academic_year": request_data['academic_year'],
-            "certificate_type": "Degree Certificate",
-            "issue_date": current_time[:10],
-            "certificate_number": cert_number,
-            "status": request_data['status'],
-            "upload_timestamp": current_time
-        }
-        
-        # Add the new certificate
-        certificates.append(new_certificate)
-        
-        # Update metadata
-        metadata = data.get("metadata", {})
-        metadata['total_certificates'] = len(certificates)
-        metadata['last_updated'] = current_time
-        
-        data['certificates'] = certificates
-        data['metadata'] = metadata
+        def build_certificate(cert_id):
+            return {
+                "id": cert_id,
+                "student_name": request_data['student_name'].strip(),
+                "enrollment_number": enrollment,
+                "registration_number": f"REG{year}{cert_id[4:]}",
+                "degree": "Bachelor of Technology",
+                "branch": request_data['branch'],
+                "university": "Jaypee University of Engineering & Technology",
+                "graduation_date": f"{year}-06-15",
+                "cgpa": str(request_data.get('cgpa', 'N/A')),
+                "academic_year": request_data['academic_year'],
+                "certificate_type": "Degree Certificate",
+                "issue_date": current_time[:10],
+                "certificate_number": f"JUET/{branch_abbrev}/{year}/{cert_id[4:]}",
+                "status": request_data['status'],
+                "upload_timestamp": current_time
+            }
         
-        # Save to file
-        if save_certificates(data):
+        # Add the new certificate, update metadata and save to file
+        new_certificate = store.add(build_certificate, {'last_updated': current_time})
+        if new_certificate:
             logger.info(f"Certificate added successfully: {enrollment}")
+            notify_verifier(new_certificate)
             return jsonify({
                 "success": True,
                 "message": "Certificate uploaded successfully",
@@ -410,14 +391,8 @@ def add_certificate():
 def get_certificate_by_enrollment(enrollment_number):
     """Get all certificates for a student by enrollment number"""
     try:
-        data = load_certificates()
-        certificates = data.get("certificates", [])
-        
-        # Search for all certificates by enrollment number
-        matched_certificates = []
-        for cert in certificates:
-            if cert.get("enrollment_number", "").lower() == enrollment_number.lower():
-                matched_certificates.append(cert)
+        # Indexed lookup of all certificates by enrollment number
+        matched_certificates = store.find_by_enrollment(enrollment_number)
         
         if matched_certificates:
             return jsonify({
@@ -438,6 +413,35 @@ def get_certificate_by_enrollment(enrollment_number):
         logger.error(f"Error getting certificate by enrollment: {e}")
         return jsonify({"success": False, "error": str(e)}), 500
 
+MATCHED_CERTIFICATE_FIELDS = (
+    "student_name", "enrollment_number", "degree", "branch",
+    "graduation_date", "cgpa", "certificate_number", "status",
+)
+# Pairs accepted by one POST /api/verify/batch
+VERIFY_BATCH_MAX_ITEMS = int(os.environ.get('VERIFY_BATCH_MAX_ITEMS', '500'))
+
+def verification_result(student_name, enrollment_number):
+    """Indexed lookup on normalized enrollment number / name, as returned by the verify endpoints."""
+    matched_certificate, best_match_score = store.match(student_name, enrollment_number)
+    if matched_certificate:
+        return {
+            "verified": True,
+            # Use the calculated match score as confidence
+            "confidence_score": best_match_score,
+            "matched_certificate": {field: matched_certificate.get(field) for field in MATCHED_CERTIFICATE_FIELDS},
+            "verification_timestamp": datetime.utcnow().isoformat()
+        }
+    return {
+        "verified": False,
+        "confidence_score": 0.0,
+        "message": "Certificate not found in university database",
+        "searched_for": {
+            "student_name": student_name,
+            "enrollment_number": enrollment_number
+        },
+        "verification_timestamp": datetime.utcnow().isoformat()
+    }
+
 @app.route('/api/verify', methods=['POST'])
 def verify_certificate():
     """Verify certificate data against university database"""
@@ -457,132 +461,65 @@ def verify_certificate():
                 "error": "student_name and enrollment_number are required"
             }), 400
         
-        # Load university database
-        data = load_certificates()
-        certificates = data.get("certificates", [])
-        
-        # Helper function to normalize strings for comparison
-        def normalize_string(s):
-            """Normalize string by removing extra spaces, special chars, and lowercasing"""
-            import re
-            # Convert to lowercase and strip
-            s = s.lower().strip()
-            # Remove multiple spaces
-            s = re.sub(r'\s+', ' ', s)
-            # Remove common special characters that might cause mismatch
-            s = re.sub(r'[^a-z0-9\s]', '', s)
-            return s
-        
-        # Normalize input
-        normalized_input_name = normalize_string(student_name)
-        normalized_input_enrollment = normalize_string(enrollment_number)
-        
-        logger.info(f"Verification request - Name: '{student_name}' (normalized: '{normalized_input_name}'), Enrollment: '{enrollment_number}' (normalized: '{normalized_input_enrollment}')")
+        logger.info(f"Verification request - Name: '{student_name}', Enrollment: '{enrollment_number}'")
         
-        # Search for matching certificate
-        matched_certificate = None
-        best_match_score = 0
-        
-        logger.info(f"Searching {len(certificates)} certificates in database")
-        
-        for cert in certificates:
-            cert_name = normalize_string(cert.get("student_name", ""))
-            cert_enrollment = normalize_string(cert.get("enrollment_number", ""))
-            
-            logger.debug(f"Comparing with DB cert - Name: '{cert.get('student_name', '')}' (normalized: '{cert_name}'), Enrollment: '{cert.get('enrollment_number', '')}' (normalized: '{cert_enrollment}')")
-            
-            # Check for exact match on enrollment (most reliable)
-            if cert_enrollment == normalized_input_enrollment:
-                # If enrollment matches, check name similarity
-                # Calculate simple match score
-                name_match = cert_name == normalized_input_name
-                
-                if name_match:
-                    # Perfect match
-                    matched_certificate = cert
-                    best_match_score = 1.0
-                    break
-                elif best_match_score < 0.9:
-                    # Enrollment matches but name doesn't - still count as match
-                    # (enrollment is unique identifier)
-                    matched_certificate = cert
-                    best_match_score = 0.9
-            
-            # Also check if name matches and enrollment is similar
-            # (in case of OCR errors in enrollment number)
-            elif cert_name == normalized_input_name:
-                # Check if enrollment numbers are similar
-                if best_match_score < 0.7:
-                    # Name matches - possible match
-                    matched_certificate = cert
-                    best_match_score = 0.7
-        
-        if matched_certificate:
-            # Use the calculated match score as confidence
-            confidence_score = best_match_score
-            
-            return jsonify({
-                "success": True,
-                "verified": True,
-                "confidence_score": confidence_score,
-                "matched_certificate": {
-                    "student_name": matched_certificate["student_name"],
-                    "enrollment_number": matched_certificate["enrollment_number"],
-                    "degree": matched_certificate["degree"],
-                    "branch": matched_certificate["branch"],
-                    "graduation_date": matched_certificate["graduation_date"],
-                    "cgpa": matched_certificate["cgpa"],
-                    "certificate_number": matched_certificate["certificate_number"],
-                    "status": matched_certificate["status"]
-                },
-                "verification_timestamp": datetime.utcnow().isoformat()
-            })
-        else:
-            return jsonify({
-                "success": True,
-                "verified": False,
-                "confidence_score": 0.0,
-                "message": "Certificate not found in university database",
-                "searched_for": {
-                    "student_name": student_name,
-                    "enrollment_number": enrollment_number
-                },
-                "verification_timestamp": datetime.utcnow().isoformat()
-            })
+        return jsonify({"success": True, **verification_result(student_name, enrollment_number)})
             
     except Exception as e:
         logger.error(f"Error verifying certificate: {e}")
         return jsonify({"success": False, "error": str(e)}), 500
 
+@app.route('/api/verify/batch', methods=['POST'])
+def verify_certificates_batch():
+    """
+    Verify many (student_name, enrollment_number) pairs in one request.
+    Body: {"items": [{"student_name": ..., "enrollment_number": ...}, ...]}
+    Results come back in request order; an item missing either field gets
+    success false instead of failing the whole batch.
+    """
+    try:
+        request_data = request.get_json(silent=True) or {}
+        items = request_data.get('items')
+        if not isinstance(items, list):
+            return jsonify({"success": False, "error": "items must be a list"}), 400
+        if len(items) > VERIFY_BATCH_MAX_ITEMS:
+            return jsonify({
+                "success": False,
+                "error": f"At most {VERIFY_BATCH_MAX_ITEMS} items per batch"
+            }), 413
+
+        results = []
+        for item in items:
+            item = item if isinstance(item, dict) else {}
+            student_name = str(item.get('student_name') or '').strip()
+            enrollment_number = str(item.get('enrollment_number') or '').strip()
+            if not student_name or not enrollment_number:
+                results.append({"success": False, "error": "student_name and enrollment_number are required"})
+                continue
+            results.append({"success": True, **verification_result(student_name, enrollment_number)})
+
+        logger.info(f"Batch verification request - {len(items)} items")
+        return jsonify({"success": True, "results": results})
+
+    except Exception as e:
+        logger.error(f"Error verifying certificate batch: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
 @app.route('/api/stats')
 def get_university_stats():
     """Get university statistics"""
     try:
-        data = load_certificates()
-        certificates = data.get("certificates", [])
-        metadata = data.get("metadata", {})
-        
-        # Calculate statistics
-        branches = {}
-        years = {}
-        degrees = {}
-        
-        for cert in certificates:
-            branch = cert.get("branch", "Unknown")
-            year = cert.get("academic_year", "Unknown")
-            degree = cert.get("degree", "Unknown")
-            
-            branches[branch] = branches.get(branch, 0) + 1
-            years[year] = years.get(year, 0) + 1
-            degrees[degree] = degrees.get(degree, 0) + 1
+        # Aggregates are maintained by the store as records are loaded/added
+        stats = store.stats()
+        _, metadata = store.all()
         
         return jsonify({
             "success": True,
             "statistics": {
-                "total_certificates": len(certificates),
-                "branches": branches,
-                "academic_years": years,
-                "degrees": degrees,
+                "total_certificates": stats["total_certificates"],
+                "branches": stats["branches"],
+                "academic_years": stats["academic_years"],
+                "degrees": stats["degrees"],
                 "last_updated": metadata.get("last_updated"),
                 "university_info": {
                     "name": metadata.get("university_name"),
@@ -615,8 +552,7 @@ def search_certificates():
         branch = request.args.get('branch', '').lower()
         year = request.args.get('year', '')
         
-        data = load_certificates()
-        certificates = data.get("certificates", [])
+        certificates, _ = store.all()
         
         # Filter certificates
         results = []
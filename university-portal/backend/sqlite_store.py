@@ -0,0 +1,215 @@
+"""
+SQLite storage backend for the university portal.
+
+Drop-in alternative to store.CertificateStore (same methods), selected with
+STORAGE_BACKEND=sqlite. Each certificate is one row: the full record as JSON
+plus normalized enrollment/name columns that carry the lookup indexes. Inserts
+are single transactions, so concurrent uploads from several gunicorn workers
+can no longer overwrite each other the way whole-file JSON rewrites did.
+The database runs in WAL mode so readers don't block the writer.
+
+Import an existing JSON database once with:
+    python sqlite_store.py import <certificates.json> [<certificates.db>]
+"""
+import json
+import logging
+import sqlite3
+import sys
+import threading
+
+from store import normalize_string, format_certificate_id, CERTIFICATE_ID_PREFIX
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS certificates (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    enrollment_norm TEXT NOT NULL,
+    enrollment_lower TEXT NOT NULL,
+    name_norm TEXT NOT NULL,
+    branch TEXT,
+    academic_year TEXT,
+    degree TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_certificates_enrollment_norm ON certificates (enrollment_norm);
+CREATE INDEX IF NOT EXISTS idx_certificates_enrollment_lower ON certificates (enrollment_lower);
+CREATE INDEX IF NOT EXISTS idx_certificates_name_norm ON certificates (name_norm);
+CREATE TABLE IF NOT EXISTS metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS sequences (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+class SQLiteCertificateStore:
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        conn.executescript(SCHEMA)
+        conn.commit()
+
+    def _conn(self):
+        """One connection per thread; sqlite3 connections aren't shareable across threads."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _row_values(cert):
+        enrollment = cert.get("enrollment_number", "")
+        return (
+            cert["id"],
+            normalize_string(enrollment),
+            enrollment.lower(),
+            normalize_string(cert.get("student_name", "")),
+            cert.get("branch", "Unknown"),
+            cert.get("academic_year", "Unknown"),
+            cert.get("degree", "Unknown"),
+            json.dumps(cert),
+        )
+
+    def _insert(self, conn, cert):
+        conn.execute(
+            "INSERT INTO certificates (id, enrollment_norm, enrollment_lower, name_norm, branch, academic_year, degree, data) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            self._row_values(cert)
+        )
+
+    def _metadata(self, conn):
+        metadata = {key: json.loads(value) for key, value in conn.execute("SELECT key, value FROM metadata")}
+        metadata['total_certificates'] = conn.execute("SELECT COUNT(*) FROM certificates").fetchone()[0]
+        return metadata
+
+    # --- reads ---
+
+    def all(self):
+        conn = self._conn()
+        certificates = [json.loads(row[0]) for row in conn.execute("SELECT data FROM certificates ORDER BY seq")]
+        return certificates, self._metadata(conn)
+
+    def find_by_enrollment(self, enrollment_number):
+        rows = self._conn().execute(
+            "SELECT data FROM certificates WHERE enrollment_lower = ? ORDER BY seq",
+            (enrollment_number.lower(),)
+        )
+        return [json.loads(row[0]) for row in rows]
+
+    def match(self, student_name, enrollment_number):
+        """Same scoring and tie-breaking as CertificateStore.match."""
+        conn = self._conn()
+        normalized_name = normalize_string(student_name)
+        by_enrollment = conn.execute(
+            "SELECT name_norm, data FROM certificates WHERE enrollment_norm = ? ORDER BY seq",
+            (normalize_string(enrollment_number),)
+        ).fetchall()
+        for name_norm, data in by_enrollment:
+            if name_norm == normalized_name:
+                return json.loads(data), 1.0
+        if by_enrollment:
+            return json.loads(by_enrollment[0][1]), 0.9
+        row = conn.execute(
+            "SELECT data FROM certificates WHERE name_norm = ? ORDER BY seq LIMIT 1",
+            (normalized_name,)
+        ).fetchone()
+        if row:
+            return json.loads(row[0]), 0.7
+        return None, 0.0
+
+    def stats(self):
+        conn = self._conn()
+        result = {"total_certificates": conn.execute("SELECT COUNT(*) FROM certificates").fetchone()[0]}
+        for stat, column in (("branches", "branch"), ("academic_years", "academic_year"), ("degrees", "degree")):
+            result[stat] = dict(conn.execute(f"SELECT {column}, COUNT(*) FROM certificates GROUP BY {column}"))
+        return result
+
+    # --- writes ---
+
+    def _next_certificate_seq(self, conn):
+        """Bump the certificate_id sequence inside the caller's write transaction."""
+        row = conn.execute("SELECT value FROM sequences WHERE name = 'certificate_id'").fetchone()
+        if row is None:
+            # First allocation: seed from existing ids (one-time scan)
+            prefix_len = len(CERTIFICATE_ID_PREFIX)
+            row = conn.execute(
+                f"SELECT COALESCE(MAX(CAST(SUBSTR(id, {prefix_len + 1}) AS INTEGER)), 0) "
+                "FROM certificates WHERE id LIKE ?",
+                (f"{CERTIFICATE_ID_PREFIX}%",)
+            ).fetchone()
+            conn.execute("INSERT INTO sequences (name, value) VALUES ('certificate_id', ?)", (row[0],))
+        conn.execute("UPDATE sequences SET value = value + 1 WHERE name = 'certificate_id'")
+        return conn.execute("SELECT value FROM sequences WHERE name = 'certificate_id'").fetchone()[0]
+
+    def add(self, build_certificate, metadata_updates=None):
+        """
+        Allocate the next JUET### id, build the certificate with it and insert
+        it with its metadata changes in one transaction. BEGIN IMMEDIATE takes
+        the write lock up front, so concurrent workers never get the same
+        number. Returns the stored certificate, or None on failure.
+        """
+        conn = self._conn()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                certificate = build_certificate(format_certificate_id(self._next_certificate_seq(conn)))
+                self._insert(conn, certificate)
+                for key, value in (metadata_updates or {}).items():
+                    conn.execute(
+                        "INSERT INTO metadata (key, value) VALUES (?, ?) "
+                        "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                        (key, json.dumps(value))
+                    )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            return certificate
+        except sqlite3.Error as e:
+            logger.error(f"Error saving certificate: {e}")
+            return None
+
+    def is_empty(self):
+        return self._conn().execute("SELECT 1 FROM certificates LIMIT 1").fetchone() is None
+
+    def import_json(self, json_path):
+        """One-shot import of a certificates.json database. Returns the number of rows imported."""
+        with open(json_path, 'r') as f:
+            data = json.load(f)
+        conn = self._conn()
+        with conn:
+            for cert in data.get("certificates", []):
+                self._insert(conn, cert)
+            for key, value in data.get("metadata", {}).items():
+                if key == 'total_certificates':
+                    continue  # derived from the table
+                conn.execute(
+                    "INSERT INTO metadata (key, value) VALUES (?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                    (key, json.dumps(value))
+                )
+        count = len(data.get("certificates", []))
+        logger.info(f"Imported {count} certificates from {json_path} into {self.path}")
+        return count
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 3 or sys.argv[1] != 'import':
+        print("Usage: python sqlite_store.py import <certificates.json> [<certificates.db>]")
+        sys.exit(1)
+    target = sys.argv[3] if len(sys.argv) > 3 else 'certificates.db'
+    store = SQLiteCertificateStore(target)
+    if not store.is_empty():
+        print(f"❌ {target} already contains certificates - refusing to import twice")
+        sys.exit(1)
+    print(f"✅ Imported {store.import_json(sys.argv[2])} certificates into {target}")
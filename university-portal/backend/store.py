@@ -0,0 +1,245 @@
+"""
+In-memory certificate store for the university portal.
+
+certificates.json is parsed once per process and kept resident together with
+hash indexes on the normalized enrollment number and student name, so
+verification is a dictionary lookup instead of a scan. The file's inode,
+mtime and size are checked on each access and the data is reloaded only when
+the file was replaced or modified by someone else (another worker, the
+add_certificate.py script, a manual edit).
+"""
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: only in-process locking
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+CERTIFICATE_ID_PREFIX = "JUET"
+
+
+def format_certificate_id(seq):
+    return f"{CERTIFICATE_ID_PREFIX}{str(seq).zfill(3)}"
+
+
+def max_certificate_seq(certificates):
+    """Highest numeric JUET### suffix; only used once to seed the persisted counter."""
+    max_id = 0
+    for cert in certificates:
+        cert_id = cert.get('id', '')
+        if cert_id.startswith(CERTIFICATE_ID_PREFIX):
+            try:
+                max_id = max(max_id, int(cert_id[len(CERTIFICATE_ID_PREFIX):]))
+            except ValueError:
+                continue
+    return max_id
+
+
+def normalize_string(s):
+    """Normalize string by removing extra spaces, special chars, and lowercasing"""
+    # Convert to lowercase and strip
+    s = (s or "").lower().strip()
+    # Remove multiple spaces
+    s = re.sub(r'\s+', ' ', s)
+    # Remove common special characters that might cause mismatch
+    s = re.sub(r'[^a-z0-9\s]', '', s)
+    return s
+
+
+def create_store(json_path, on_reload=None):
+    """
+    The store STORAGE_BACKEND selects: 'json' (default), a CertificateStore
+    over json_path, or 'sqlite', a SQLiteCertificateStore at SQLITE_DB_FILE
+    that imports json_path once while empty. on_reload only applies to JSON.
+    """
+    if os.environ.get('STORAGE_BACKEND', 'json').lower() == 'sqlite':
+        from sqlite_store import SQLiteCertificateStore
+        sqlite_path = os.environ.get('SQLITE_DB_FILE', '/tmp/certificates.db')
+        sqlite_store = SQLiteCertificateStore(sqlite_path)
+        # One-shot import of the existing JSON database into a fresh SQLite file
+        if sqlite_store.is_empty() and os.path.exists(json_path):
+            try:
+                sqlite_store.import_json(json_path)
+            except Exception as e:
+                logger.error(f"Could not import {json_path} into SQLite: {e}")
+        logger.info(f"Using SQLite storage: {sqlite_path}")
+        return sqlite_store
+    return CertificateStore(json_path, on_reload=on_reload)
+
+
+class CertificateStore:
+    def __init__(self, path, on_reload=None):
+        self.path = path
+        # Called after the file changed underneath us (edited, replaced) and was re-read
+        self._on_reload = on_reload
+        self._lock = threading.RLock()
+        self._signature = None
+        self._certificates = []
+        self._metadata = {}
+        self._by_enrollment = {}
+        self._by_name = {}
+        self._stats = {}
+        self._lock_path = f"{path}.lock"
+
+    # --- loading / indexing ---
+
+    def _file_signature(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _ensure_fresh(self):
+        signature = self._file_signature()
+        if signature == self._signature:
+            return
+        with self._lock:
+            signature = self._file_signature()
+            if signature != self._signature:
+                self._load(signature)
+
+    def _load(self, signature):
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading certificates: {e}")
+            data = {"certificates": [], "metadata": {}}
+        certificates = data.get("certificates", [])
+        by_enrollment, by_name = {}, {}
+        stats = {"branches": {}, "academic_years": {}, "degrees": {}}
+        for cert in certificates:
+            self._index(cert, by_enrollment, by_name, stats)
+        # Swap in fully built structures; lock-free readers never see a partial index
+        self._certificates = certificates
+        self._metadata = data.get("metadata", {})
+        self._by_enrollment, self._by_name, self._stats = by_enrollment, by_name, stats
+        reloaded = self._signature is not None
+        self._signature = signature
+        logger.info(f"Loaded {len(certificates)} certificates from {self.path}")
+        if reloaded and self._on_reload:
+            self._on_reload()
+
+    @staticmethod
+    def _index(cert, by_enrollment, by_name, stats):
+        by_enrollment.setdefault(normalize_string(cert.get("enrollment_number", "")), []).append(cert)
+        by_name.setdefault(normalize_string(cert.get("student_name", "")), []).append(cert)
+        for stat, field in (("branches", "branch"), ("academic_years", "academic_year"), ("degrees", "degree")):
+            value = cert.get(field, "Unknown")
+            stats[stat][value] = stats[stat].get(value, 0) + 1
+
+    # --- reads ---
+
+    def all(self):
+        """Return (certificates, metadata). Callers must not mutate the result."""
+        self._ensure_fresh()
+        return self._certificates, self._metadata
+
+    def find_by_enrollment(self, enrollment_number):
+        self._ensure_fresh()
+        candidates = self._by_enrollment.get(normalize_string(enrollment_number), [])
+        # The endpoint has always matched case-insensitively, not fully normalized
+        wanted = enrollment_number.lower()
+        return [c for c in candidates if c.get("enrollment_number", "").lower() == wanted]
+
+    def match(self, student_name, enrollment_number):
+        """
+        Find the best matching certificate and its confidence score:
+        enrollment + name -> 1.0, enrollment only -> 0.9, name only -> 0.7.
+        Ties go to the earliest record, as with the original linear scan.
+        """
+        self._ensure_fresh()
+        normalized_name = normalize_string(student_name)
+        by_enrollment = self._by_enrollment.get(normalize_string(enrollment_number), [])
+        for cert in by_enrollment:
+            if normalize_string(cert.get("student_name", "")) == normalized_name:
+                return cert, 1.0
+        if by_enrollment:
+            return by_enrollment[0], 0.9
+        by_name = self._by_name.get(normalized_name, [])
+        if by_name:
+            return by_name[0], 0.7
+        return None, 0.0
+
+    def stats(self):
+        self._ensure_fresh()
+        # add() updates the counters in place under the lock; copy them under it too
+        with self._lock:
+            return {
+                "total_certificates": len(self._certificates),
+                "branches": dict(self._stats["branches"]),
+                "academic_years": dict(self._stats["academic_years"]),
+                "degrees": dict(self._stats["degrees"]),
+            }
+
+    # --- writes ---
+
+    @contextmanager
+    def _write_lock(self):
+        """
+        Serialize read-modify-write of the file across threads and, via flock
+        on a sidecar lock file, across worker processes.
+        """
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self._lock_path, 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def add(self, build_certificate, metadata_updates=None):
+        """
+        Append a new certificate, update indexes and persist, all in one file
+        write. build_certificate is called with the certificate's JUET### id,
+        the next value of the counter persisted in the metadata block, while
+        the write lock is held. Returns the stored certificate, or None if it
+        could not be saved.
+        """
+        with self._write_lock():
+            self._ensure_fresh()
+            metadata = dict(self._metadata)
+            last_seq = metadata.get('last_certificate_seq')
+            if last_seq is None:
+                last_seq = max_certificate_seq(self._certificates)
+            certificate = build_certificate(format_certificate_id(last_seq + 1))
+            metadata.update(metadata_updates or {})
+            metadata['last_certificate_seq'] = last_seq + 1
+            metadata['total_certificates'] = len(self._certificates) + 1
+            data = {"certificates": self._certificates + [certificate], "metadata": metadata}
+            if not self._write(data):
+                return None
+            self._certificates.append(certificate)
+            self._metadata = metadata
+            self._index(certificate, self._by_enrollment, self._by_name, self._stats)
+            # Our own write must not trigger a full reload
+            self._signature = self._file_signature()
+            return certificate
+
+    def _write(self, data):
+        """Write via a temp file + rename so readers never see a partial file."""
+        tmp = None
+        try:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp, self.path)
+            return True
+        except Exception as e:
+            logger.error(f"Error saving certificates: {e}")
+            if tmp and os.path.exists(tmp):
+                os.unlink(tmp)
+            return False